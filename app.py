@@ -1,12 +1,31 @@
+import csv
+import io
+import json
 import math
 import os
+import time
 from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
-from flask import Flask, jsonify, request, render_template, session, redirect, url_for
+from flask import Flask, Response, g, jsonify, request, render_template, session, redirect, url_for
+from flask.ctx import RequestContext
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
-from supabase import create_client
-from functools import wraps
+from functools import cache, wraps
+from markupsafe import Markup
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from broadcast import RankingBroadcaster
+from cache import AvatarCache, ResponseCache, SharedCounter, default_path
+from metrics import COUNT_BUCKETS, Metrics, current_request, start_request
+from minesweeper import LEVELS as MINESWEEPER_LEVELS, SEED_MAX, GameStore as MinesweeperGames
+from passwords import HasherBusy, PasswordHasher
+from querylog import QueryLog, parse_budgets
+from ranking import AuthorRanking
+from sachunsung import STAGES as SACHUNSUNG_STAGES, BoardPool
+from search import query_terms, term_weights
+from sessions import ServerSessionInterface
+from timefmt import cursor_time, fmt_date_yyyymmdd_many, fmt_dt, fmt_dt_many, to_utc_iso
+from storage import EXPORT_TABLES, RECORD_TABLES, add_query_observer, create_store, gather, timestop_distance
+from writebehind import RecordQueue
 
 _script_dir = os.path.dirname(os.path.abspath(__file__))
 app = Flask(
@@ -18,93 +37,261 @@ app = Flask(
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production")
 CORS(app, supports_credentials=True)
 
-# Admin 계정 (admin/admin123)
+# 세션 (SESSION_BACKEND=server 이면 쿠키에는 세션 id 만, 내용은 워커 공유 SQLite 파일에)
+if os.environ.get("SESSION_BACKEND") == "server":
+    app.session_interface = ServerSessionInterface(
+        os.environ.get("SESSION_STORE_PATH") or default_path("sessions"),
+        ttl=float(os.environ.get("SESSION_TTL", str(7 * 86400))),
+    )
+
+# ──────────────────────────────────────────────
+# 계측 (모든 워커 합계: 관리자 /api/metrics, 요청별: Server-Timing 헤더)
+# ──────────────────────────────────────────────
+
+_metrics = Metrics(
+    os.environ.get("METRICS_PATH") or default_path("metrics"),
+    flush_interval=float(os.environ.get("METRICS_FLUSH_INTERVAL", "1.0")),
+)
+_metrics.counter("http_requests_total", "HTTP 요청 수")
+_metrics.histogram("http_request_duration_seconds", "HTTP 요청 처리 시간")
+_metrics.histogram("db_queries_per_request", "요청당 DB 왕복 수", COUNT_BUCKETS)
+_metrics.histogram("db_time_per_request_seconds", "요청당 DB 대기 시간 합계")
+_metrics.counter("db_queries_total", "DB 왕복 수 (테이블/종류별)")
+_metrics.histogram("password_hash_wait_seconds", "비밀번호 해시/검증 대기 시간")
+_metrics.counter("password_hash_rejected_total", "해시 대기열이 가득 차서 거절한 요청 수")
+_metrics.counter("response_cache_requests_total", "GET 응답 캐시 결과 (not_modified/hit/miss)")
+
+
+def _observe_query(event):
+    _metrics.inc("db_queries_total", {"table": event["table"] or "", "op": event["op"]})
+    stats = current_request()
+    if stats:
+        stats.add_db(event["duration"])
+
+
+def _observe_hash(event, seconds):
+    if event == "busy":
+        _metrics.inc("password_hash_rejected_total")
+        return
+    _metrics.observe("password_hash_wait_seconds", seconds)
+    stats = current_request()
+    if stats:
+        stats.add_hash(seconds)
+
+
+add_query_observer(_observe_query)
+
+
+@app.before_request
+def _start_metrics():
+    start_request()
+
+
+@app.after_request
+def _finish_metrics(resp):
+    stats = current_request()
+    if stats is None:
+        return resp
+    labels = {
+        "route": request.url_rule.rule if request.url_rule else "unmatched",
+        "method": request.method,
+    }
+    _metrics.inc("http_requests_total", {**labels, "status": resp.status_code})
+    _metrics.observe("http_request_duration_seconds", time.perf_counter() - stats.start, labels)
+    _metrics.observe("db_queries_per_request", stats.db_calls, labels)
+    _metrics.observe("db_time_per_request_seconds", stats.db_time, labels)
+    resp.headers["Server-Timing"] = stats.server_timing()
+    try:
+        _metrics.maybe_flush()
+    except Exception:
+        # 계측 실패로 이미 처리된 요청을 500 으로 바꾸지 않는다
+        app.logger.warning("metrics flush failed", exc_info=True)
+    return resp
+
+
+# 개발용 쿼리 로그/N+1 탐지 (QUERY_DEBUG=1). QUERY_BUDGET="GET /api/posts=2,*=10",
+# QUERY_BUDGET_STRICT=1 이면 상한을 넘은 요청을 500 으로 바꾼다.
+_query_log = None
+if os.environ.get("QUERY_DEBUG") == "1":
+    _query_log = QueryLog(
+        parse_budgets(os.environ.get("QUERY_BUDGET")),
+        repeat_threshold=int(os.environ.get("QUERY_REPEAT_THRESHOLD", "3")),
+        strict=os.environ.get("QUERY_BUDGET_STRICT") == "1",
+    )
+    add_query_observer(_query_log.record)
+
+    @app.before_request
+    def _start_query_log():
+        _query_log.start()
+
+    @app.after_request
+    def _finish_query_log(resp):
+        rule = request.url_rule.rule if request.url_rule else request.path
+        report = _query_log.finish(f"{request.method} {rule}")
+        if report and report["over_budget"] is not None and _query_log.strict:
+            resp = jsonify({
+                "error": "쿼리 상한 초과",
+                "endpoint": report["endpoint"],
+                "queries": report["queries"],
+                "budget": report["over_budget"],
+            })
+            resp.status_code = 500
+        return resp
+
+
+# Admin 계정 (admin/admin123). ADMIN_PASSWORD_HASH 에 미리 만든 해시
+# (`python passwords.py <비밀번호>`)를 주면 기동 시 해시를 계산하지 않는다.
 _ADMIN_USERNAME = "admin"
-_ADMIN_PASSWORD_HASH = generate_password_hash(os.environ.get("ADMIN_PASSWORD", "admin123"))
 
-# Supabase (환경변수: SUPABASE_URL, SUPABASE_KEY)
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_KEY")
-supabase = create_client(supabase_url, supabase_key) if supabase_url and supabase_key else None
+# 저장소 (환경변수: STORAGE_BACKEND=supabase|sqlite, SUPABASE_URL, SUPABASE_KEY, SQLITE_PATH)
+db = create_store(_script_dir)
+
+# 레벨/경험치 랭킹 인덱스 (워커별, AUTHOR_RANKING_TTL 초마다 전체 재적재)
+_author_ranking = AuthorRanking(ttl=float(os.environ.get("AUTHOR_RANKING_TTL", "60")))
+
+# 아바타 캐시 (워커 공유 파일, AVATAR_CACHE_SIZE=0 이면 비활성화)
+_avatar_cache = AvatarCache(
+    os.environ.get("AVATAR_CACHE_PATH") or default_path("avatar-cache"),
+    maxsize=int(os.environ.get("AVATAR_CACHE_SIZE", "10000")),
+    ttl=float(os.environ.get("AVATAR_CACHE_TTL", "300")),
+)
+
+
+# 비밀번호 해시 (PASSWORD_HASH_METHOD 예: scrypt, pbkdf2:sha256:600000)
+_hasher = PasswordHasher(
+    method=os.environ.get("PASSWORD_HASH_METHOD") or None,
+    workers=int(os.environ.get("PASSWORD_HASH_WORKERS", "2")),
+    max_pending=int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "16")),
+    observer=_observe_hash,
+)
+
+
+@cache
+def _admin_password_hash():
+    """ADMIN_PASSWORD_HASH 가 없으면 첫 관리자 로그인 때 ADMIN_PASSWORD 를 해시."""
+    return os.environ.get("ADMIN_PASSWORD_HASH") or _hasher.hash(
+        os.environ.get("ADMIN_PASSWORD", "admin123")
+    )
+
+
+@app.errorhandler(HasherBusy)
+def _hasher_busy(e):
+    return jsonify({"error": "요청이 많습니다. 잠시 후 다시 시도하세요."}), 503, {"Retry-After": "1"}
+
+
+def _ranking_unavailable(e):
+    """랭킹 조회 실패. 빈 목록(200)으로 답하면 응답 캐시에 남아 다음 기록 저장 때까지 나가므로 503."""
+    app.logger.error("%s %s failed", request.method, request.path, exc_info=e)
+    return jsonify({"error": "랭킹을 불러오지 못했습니다."}), 503, {"Retry-After": "5"}
 
 
 def _post_error(e):
+    if isinstance(e, HasherBusy):
+        return _hasher_busy(e)
+    if isinstance(e, Exception):
+        app.logger.error("%s %s failed", request.method, request.path, exc_info=e)
     return jsonify({"error": str(e) or "오류가 발생했습니다."}), 500
 
 
-def _fmt_dt(dt_str):
-    """created_at (UTC) -> 한국시간(KST) YYYY-MM-DD HH:mm:ss"""
-    if not dt_str:
-        return ""
-    try:
-        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        kst = dt.astimezone(ZoneInfo("Asia/Seoul"))
-        return kst.strftime("%Y-%m-%d %H:%M:%S")
-    except Exception:
-        return str(dt_str)
+# 게시글 총 개수 (쓰기 시 증감, POSTS_TOTAL_TTL 초마다 백그라운드 재집계)
+_counters = SharedCounter(
+    os.environ.get("COUNTER_CACHE_PATH") or default_path("counters"),
+    ttl=float(os.environ.get("POSTS_TOTAL_TTL", "300")),
+)
+
+# GET 응답 캐시 (테이블 버전 기반 ETag, RESPONSE_CACHE_SIZE=0 이면 본문 보관 안 함).
+# 다른 인스턴스/DB 직접 변경은 RESPONSE_CACHE_TTL 초 안에 반영된다
+_response_cache = ResponseCache(
+    os.environ.get("RESPONSE_CACHE_PATH") or default_path("response-versions"),
+    maxsize=int(os.environ.get("RESPONSE_CACHE_SIZE", "512")),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "60")),
+)
+
+# 사천성 보드 풀 (단계별 SACHUNSUNG_POOL_SIZE 개를 워커 공유 파일에 미리 만들어 둠,
+# 0 이면 요청마다 생성. 생성은 SACHUNSUNG_POOL_WORKERS 개 프로세스에서)
+_sachunsung_boards = BoardPool(
+    os.environ.get("SACHUNSUNG_POOL_PATH") or default_path("sachunsung-boards"),
+    size=int(os.environ.get("SACHUNSUNG_POOL_SIZE", "4")),
+    workers=int(os.environ.get("SACHUNSUNG_POOL_WORKERS", "1")),
+)
+
+# 지뢰찾기 판 (서버가 내준 시드와 클릭 기록, 마지막 클릭 뒤 MINESWEEPER_GAME_TTL 초 보관)
+_minesweeper_games = MinesweeperGames(
+    os.environ.get("MINESWEEPER_GAMES_PATH") or default_path("minesweeper-games"),
+    app.secret_key,
+    ttl=float(os.environ.get("MINESWEEPER_GAME_TTL", "3600")),
+)
+
+# 게임 기록 write-behind (RECORD_WRITE_BEHIND=1 이면 기록을 모아서 bulk insert)
+_record_queue = None
+if db and os.environ.get("RECORD_WRITE_BEHIND") == "1":
+    _record_queue = RecordQueue(
+        db.insert_records,
+        os.environ.get("RECORD_JOURNAL_DIR") or default_path("record-journal"),
+        max_batch=int(os.environ.get("RECORD_BATCH_SIZE", "100")),
+        max_delay=float(os.environ.get("RECORD_BATCH_DELAY", "1.0")),
+        on_flush=lambda game: _response_cache.bump(RECORD_TABLES[game]),
+    )
 
 
 # ──────────────────────────────────────────────
 # 아바타 헬퍼
 # ──────────────────────────────────────────────
 
+_AVATAR_DEFAULTS = {"level": 1, "exp": 0, "stat_points": 0, "str": 5, "con": 5, "dex": 5}
+
+
 def _get_avatar(user_id):
-    """avatars 조회. 없으면 기본값 반환."""
-    res = supabase.table("avatars").select("*").eq("user_id", user_id).execute()
-    if res.data:
-        return res.data[0]
-    return {"level": 1, "exp": 0, "stat_points": 0, "str": 5, "con": 5, "dex": 5}
+    """avatars 조회 (캐시 우선). 없으면 기본값 반환.
+
+    /api/batch 안에서는 하위 요청들이 g.batch_avatars 를 함께 써서 같은 아바타를 한 번만 읽는다.
+    """
+    memo = g.get("batch_avatars")
+    if memo is not None and user_id in memo:
+        return memo[user_id]
+    av = _avatar_cache.get(user_id)
+    if not av:
+        av = db.get_avatar(user_id)
+        if av:
+            _avatar_cache.put(user_id, av)
+        else:
+            av = dict(_AVATAR_DEFAULTS)
+    if memo is not None:
+        memo[user_id] = av
+    return av
 
 
 def _ensure_avatar(user_id):
     """아바타 레코드가 없으면 기본값으로 생성."""
-    res = supabase.table("avatars").select("id").eq("user_id", user_id).execute()
-    if not (res.data and len(res.data) > 0):
-        supabase.table("avatars").insert({"user_id": user_id}).execute()
-
-
-def _award_exp(user_id, exp_gained):
-    """EXP 부여 및 레벨업 처리. 반환: {leveled_up, level, exp}"""
-    avatar = _get_avatar(user_id)
-    level = avatar.get("level", 1)
-    exp = avatar.get("exp", 0) + exp_gained
-    stat_points = avatar.get("stat_points", 0)
-    leveled_up = False
-    while level < 99:
-        required = level * 100
-        if exp >= required:
-            exp -= required
-            level += 1
-            stat_points += 1
-            leveled_up = True
-        else:
-            break
-    supabase.table("avatars").update({
-        "level": level,
-        "exp": exp,
-        "stat_points": stat_points,
-        "updated_at": "now()",
-    }).eq("user_id", user_id).execute()
-    return {"leveled_up": leveled_up, "level": level, "exp": exp}
+    db.ensure_avatar(user_id)
+
 
+def _award_exp(user_id, exp_gained, game=None, record=None):
+    """EXP 부여 및 레벨업 처리 (game 이 있으면 기록 저장까지 한 번에).
 
-def _load_avatar_to_session(user_id):
-    """로그인 시 아바타 정보를 세션에 저장."""
-    _ensure_avatar(user_id)
-    av = _get_avatar(user_id)
-    session["avatar_level"] = av.get("level", 1)
-    session["avatar_exp"] = av.get("exp", 0)
-    session["avatar_stat_points"] = av.get("stat_points", 0)
-    session["avatar_str"] = av.get("str", 5)
-    session["avatar_con"] = av.get("con", 5)
-    session["avatar_dex"] = av.get("dex", 5)
+    저장소가 원자적으로 처리한 결과로 아바타 캐시를 갱신한다. 반환: {leveled_up, level, exp}
+    """
+    av = db.award_exp(user_id, exp_gained, game, record)
+    moved = _bump_ranking_tables("avatars")
+    _avatar_cache.put(user_id, av)
+    _author_ranking.update(user_id, av["level"], av["exp"], moved=moved)
+    return {"leveled_up": av["leveled_up"], "level": av["level"], "exp": av["exp"]}
 
 
-def _sync_avatar_session(user_id):
-    """EXP 획득 후 세션 갱신."""
-    _load_avatar_to_session(user_id)
+class _LazyAvatar:
+    """템플릿용 아바타 (avatar.level 등). 템플릿이 실제로 읽을 때 한 번만 조회."""
+
+    def __init__(self, user_id):
+        self._user_id = user_id
+        self._data = None
+
+    def __getattr__(self, name):
+        if self._data is None:
+            self._data = _get_avatar(self._user_id) if db and self._user_id and self._user_id > 0 else {}
+        try:
+            return self._data.get(name, _AVATAR_DEFAULTS[name])
+        except KeyError:
+            raise AttributeError(name) from None
 
 
 # ──────────────────────────────────────────────
@@ -116,12 +303,7 @@ def inject_user():
     return {
         "current_user": session.get("username"),
         "is_admin": session.get("is_admin", False),
-        "avatar_level": session.get("avatar_level", 1),
-        "avatar_exp": session.get("avatar_exp", 0),
-        "avatar_stat_points": session.get("avatar_stat_points", 0),
-        "avatar_str": session.get("avatar_str", 5),
-        "avatar_con": session.get("avatar_con", 5),
-        "avatar_dex": session.get("avatar_dex", 5),
+        "avatar": _LazyAvatar(session.get("user_id")),
     }
 
 
@@ -134,11 +316,48 @@ def _admin_required(f):
     return inner
 
 
+def _cached_response(*tables, per_user=False):
+    """GET JSON 응답을 tables 버전 기준으로 캐시하고 ETag/304 로 응답.
+    Last-Modified 는 본문을 만든 시각 (조건부 요청은 ETag 로만 판단한다).
+
+    per_user: 응답이 로그인 사용자별로 다르면 True (키에 user_id 포함).
+    """
+    def deco(f):
+        @wraps(f)
+        def inner(*args, **kwargs):
+            if request.method != "GET":
+                return f(*args, **kwargs)
+            user = session.get("user_id") if per_user else None
+            etag = _response_cache.etag(request.path, request.args, tables, user)
+            if etag in request.if_none_match:
+                _metrics.inc("response_cache_requests_total", {"result": "not_modified"})
+                resp = app.response_class(status=304)
+            else:
+                cached = _response_cache.entry(etag)
+                if cached is not None:
+                    _metrics.inc("response_cache_requests_total", {"result": "hit"})
+                    resp = app.response_class(cached[0], mimetype="application/json")
+                    resp.last_modified = cached[1]
+                else:
+                    _metrics.inc("response_cache_requests_total", {"result": "miss"})
+                    resp = app.make_response(f(*args, **kwargs))
+                    if resp.status_code != 200:
+                        # 오류 응답은 보관하지도 ETag 를 붙이지도 않는다 (다음 요청이 다시 계산)
+                        return resp
+                    _response_cache.put(etag, resp.get_data())
+                    resp.last_modified = time.time()
+            resp.set_etag(etag)
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        return inner
+    return deco
+
+
 # 로그인 없이 접근 가능한 경로 (전체 사이트 로그인 필수)
 _LOGIN_EXEMPT = frozenset([
     "/login", "/register", "/logout",
     "/api/auth/login", "/api/auth/register", "/api/auth/logout",
-    "/api/health",
+    "/api/health", "/api/metrics",
 ])
 
 
@@ -159,10 +378,50 @@ def _require_login():
 # 페이지 라우트
 # ──────────────────────────────────────────────
 
+# 첫 화면 데이터를 페이지 안에 JSON 으로 넣어 보낸다 (SSR=0 이면 브라우저가 API 로 따로 요청).
+# 값은 같은 API 의 응답 캐시(ETag 키)를 함께 쓰므로 캐시에 있으면 DB 를 거치지 않는다.
+_SSR = os.environ.get("SSR", "1") != "0"
+_SSR_POSTS_LIMIT = 15   # index.html 의 LIMIT 과 같아야 /api/posts 캐시를 같이 쓴다
+_SSR_RANKING_LIMIT = 5
+
+
+def _ssr_json(path, args, tables, build, user=None):
+    """path?args API 응답 JSON (캐시에 없으면 build() 로 만들어 넣음). <script> 안에 넣을 수 있게 이스케이프."""
+    etag = _response_cache.etag(path, MultiDict(args), tables, user)
+    body = _response_cache.get(etag)
+    if body is not None:
+        _metrics.inc("response_cache_requests_total", {"result": "hit"})
+    else:
+        _metrics.inc("response_cache_requests_total", {"result": "miss"})
+        body = app.json.response(build()).get_data()
+        _response_cache.put(etag, body)
+    text = body.decode("utf-8").strip()
+    return Markup(text.replace("<", "\\u003c").replace(">", "\\u003e")
+                  .replace("&", "\\u0026").replace("'", "\\u0027"))
+
+
 @app.route("/", strict_slashes=False)
 @app.route("/index.html", strict_slashes=False)
 def index():
-    return render_template("index.html")
+    initial_posts = initial_ranking = None
+    if _SSR and db:
+        user_id = session.get("user_id")
+        try:
+            initial_posts, initial_ranking = gather(
+                lambda: _ssr_json(
+                    "/api/posts", {"page": "1", "limit": str(_SSR_POSTS_LIMIT)}, ("posts", "avatars"),
+                    lambda: _posts_page(1, _SSR_POSTS_LIMIT),
+                ),
+                lambda: _ssr_json(
+                    "/api/ranking/authors", {"limit": str(_SSR_RANKING_LIMIT)}, ("avatars", "users"),
+                    lambda: _authors_ranking(_SSR_RANKING_LIMIT, user_id), user_id,
+                ),
+            )
+        except Exception:
+            # 실패하면 빈 페이지를 보내고 브라우저가 API 로 다시 요청한다
+            app.logger.exception("index SSR failed")
+            initial_posts = initial_ranking = None
+    return render_template("index.html", initial_posts=initial_posts, initial_ranking=initial_ranking)
 
 
 @app.route("/write", strict_slashes=False)
@@ -172,7 +431,16 @@ def write_page():
 
 @app.route("/post/<int:post_id>", strict_slashes=False)
 def post_page(post_id):
-    return render_template("post.html", post_id=post_id)
+    initial_post = None
+    if _SSR and db:
+        try:
+            initial_post = _post_detail(post_id)
+        except Exception:
+            app.logger.exception("post %s SSR failed", post_id)
+        else:
+            if initial_post is None:
+                return render_template("post.html", post_id=post_id, initial_post={"error": "Not found"}), 404
+    return render_template("post.html", post_id=post_id, initial_post=initial_post)
 
 
 @app.route("/minesweeper", strict_slashes=False)
@@ -232,20 +500,18 @@ def api_register():
         return jsonify({"error": "비밀번호가 일치하지 않습니다."}), 400
     if username == _ADMIN_USERNAME:
         return jsonify({"error": "이미 사용 중인 아이디입니다."}), 400
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     try:
-        res = supabase.table("users").select("id").eq("username", username).execute()
-        if res.data and len(res.data) > 0:
+        if db.find_user(username):
             return jsonify({"error": "이미 사용 중인 아이디입니다."}), 400
-        password_hash = generate_password_hash(password)
-        ins = supabase.table("users").insert({
-            "username": username,
-            "password_hash": password_hash,
-        }).execute()
-        new_user_id = (ins.data or [{}])[0].get("id")
+        password_hash = _hasher.hash(password)
+        new_user_id = db.create_user(username, password_hash).get("id")
         if new_user_id:
             _ensure_avatar(new_user_id)
+        moved = _bump_ranking_tables("users", "avatars")
+        if new_user_id:
+            _author_ranking.update(new_user_id, 1, 0, username, moved=moved)
         return jsonify({"ok": True}), 201
     except Exception as e:
         err = str(e).lower()
@@ -262,36 +528,47 @@ def api_login():
     if not username or not password:
         return jsonify({"error": "아이디와 비밀번호를 입력하세요."}), 400
     if username == _ADMIN_USERNAME:
-        if check_password_hash(_ADMIN_PASSWORD_HASH, password):
+        if _hasher.verify(_admin_password_hash(), password):
             session["user_id"] = -1
             session["username"] = username
             session["is_admin"] = True
             return jsonify({"ok": True, "is_admin": True})
         return jsonify({"error": "아이디 또는 비밀번호가 올바르지 않습니다."}), 401
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     try:
-        res = supabase.table("users").select("id,password_hash,is_blacklisted").eq(
-            "username", username
-        ).execute()
-        rows = res.data or []
-        if not rows:
+        row = db.find_login_user(username)
+        if not row:
             return jsonify({"error": "아이디 또는 비밀번호가 올바르지 않습니다."}), 401
-        row = rows[0]
         if row.get("is_blacklisted"):
             return jsonify({"error": "블랙리스트로 지정되어 로그인할 수 없습니다."}), 403
-        if not check_password_hash(row.get("password_hash", ""), password):
+        if not _hasher.verify(row.get("password_hash", ""), password):
             return jsonify({"error": "아이디 또는 비밀번호가 올바르지 않습니다."}), 401
         user_id = row["id"]
+        _rehash_if_outdated(user_id, row["password_hash"], password)
         session["user_id"] = user_id
         session["username"] = username
         session["is_admin"] = False
-        _load_avatar_to_session(user_id)
+        if row["avatar"] is None:
+            _ensure_avatar(user_id)
+        else:
+            _avatar_cache.put(user_id, row["avatar"])
+        _avatar_cache.put_user_id(username, user_id)
         return jsonify({"ok": True, "is_admin": False})
     except Exception as e:
         return _post_error(e)
 
 
+def _rehash_if_outdated(user_id, stored, password):
+    """로그인 성공 시 저장된 해시가 현재 PASSWORD_HASH_METHOD 와 다르면 다시 해시해서 저장.
+    실패해도 로그인은 진행 (다음 로그인 때 다시 시도)."""
+    try:
+        if _hasher.needs_rehash(stored):
+            db.set_password_hash(user_id, _hasher.hash(password))
+    except Exception:
+        app.logger.warning("password rehash failed for user %s", user_id, exc_info=True)
+
+
 @app.route("/logout", strict_slashes=False)
 @app.route("/api/auth/logout", methods=["POST"], strict_slashes=False)
 def api_logout():
@@ -305,26 +582,47 @@ def api_logout():
 # 관리자 API
 # ──────────────────────────────────────────────
 
+_BULK_BLACKLIST_MAX = 500
+
+
 @app.route("/api/admin/members", methods=["GET"], strict_slashes=False)
 def api_admin_members():
+    """회원 목록 (가입일 역순). ?q=<아이디 앞부분>&blacklisted=1|0&limit=N
+    &before=<created_at,id>&from=<첫 행 번호> (키셋)"""
     if not session.get("is_admin"):
         return jsonify({"error": "권한이 없습니다."}), 403
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     try:
-        res = supabase.table("users").select(
-            "id,username,is_blacklisted,created_at"
-        ).neq("username", _ADMIN_USERNAME).order("created_at", desc=True).execute()
+        limit = max(1, min(200, int(request.args.get("limit", 50))))
+        first_number = max(1, int(request.args.get("from", 1)))
+    except ValueError:
+        return jsonify({"error": "잘못된 요청입니다."}), 400
+    before = request.args.get("before")
+    if before:
+        try:
+            before = _parse_cursor(before)
+        except ValueError:
+            return jsonify({"error": "잘못된 커서입니다."}), 400
+    prefix = (request.args.get("q") or "").strip() or None
+    blacklisted = request.args.get("blacklisted")
+    blacklisted = None if blacklisted in (None, "") else blacklisted in ("1", "true")
+    try:
+        rows = db.list_members(_ADMIN_USERNAME, limit, before=before, prefix=prefix, blacklisted=blacklisted)
+        created = fmt_dt_many(row.get("created_at") for row in rows)
         members = []
-        for i, row in enumerate(res.data or []):
+        for i, row in enumerate(rows):
             members.append({
                 "id": row["id"],
-                "number": i + 1,
+                "number": first_number + i,
                 "username": row.get("username", ""),
                 "is_blacklisted": row.get("is_blacklisted", False),
-                "created_at": _fmt_dt(row.get("created_at")),
+                "created_at": created[i],
             })
-        return jsonify({"members": members})
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = f"{rows[-1]['created_at']},{rows[-1]['id']}"
+        return jsonify({"members": members, "next_cursor": next_cursor})
     except Exception as e:
         return _post_error(e)
 
@@ -334,18 +632,198 @@ def api_admin_blacklist(member_id):
     if not session.get("is_admin"):
         return jsonify({"error": "권한이 없습니다."}), 403
     data = request.get_json() or {}
-    blacklist = data.get("blacklist", True)
-    if not supabase:
+    return _set_blacklisted([member_id], data.get("blacklist", True))
+
+
+@app.route("/api/admin/members/blacklist", methods=["PUT"], strict_slashes=False)
+def api_admin_blacklist_bulk():
+    """여러 회원 일괄 지정/해제. body: {"ids": [1, 2, ...], "blacklist": true}"""
+    if not session.get("is_admin"):
+        return jsonify({"error": "권한이 없습니다."}), 403
+    data = request.get_json() or {}
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return jsonify({"error": "ids 는 회원 id 목록이어야 합니다."}), 400
+    if len(ids) > _BULK_BLACKLIST_MAX:
+        return jsonify({"error": f"한 번에 {_BULK_BLACKLIST_MAX}명까지 변경할 수 있습니다."}), 400
+    return _set_blacklisted(ids, data.get("blacklist", True))
+
+
+def _set_blacklisted(member_ids, blacklist):
+    if not db:
         return _post_error("DB 미설정")
     try:
-        supabase.table("users").update({"is_blacklisted": bool(blacklist)}).eq(
-            "id", member_id
-        ).neq("username", _ADMIN_USERNAME).execute()
-        return jsonify({"ok": True})
+        updated = db.set_blacklisted(member_ids, blacklist, _ADMIN_USERNAME)
+        _response_cache.bump("users")
+        if blacklist:
+            _revoke_sessions(updated)
+        return jsonify({"ok": True, "updated": updated})
     except Exception as e:
         return _post_error(e)
 
 
+def _revoke_sessions(user_ids):
+    """서버 세션 사용 시 해당 사용자들을 즉시 로그아웃 (쿠키 세션은 회수 불가)."""
+    revoke = getattr(app.session_interface, "revoke_users", None)
+    if revoke:
+        revoke(user_ids)
+
+
+@app.route("/api/admin/cache", methods=["GET"], strict_slashes=False)
+def api_admin_cache():
+    """아바타 캐시 적중/실패 통계"""
+    if not session.get("is_admin"):
+        return jsonify({"error": "권한이 없습니다."}), 403
+    return jsonify({"avatar": _avatar_cache.stats()})
+
+
+@app.route("/api/metrics", methods=["GET"], strict_slashes=False)
+def api_metrics():
+    """Prometheus 텍스트 형식 계측값 (관리자 세션 또는 Authorization: Bearer $METRICS_TOKEN)"""
+    token = os.environ.get("METRICS_TOKEN")
+    if not session.get("is_admin") and not (token and request.headers.get("Authorization") == f"Bearer {token}"):
+        return jsonify({"error": "권한이 없습니다."}), 403
+    avatar = _avatar_cache.stats()
+    extra = []
+    if avatar["enabled"]:
+        extra = [
+            ("avatar_cache_hits_total", "counter", "아바타 캐시 적중 수", avatar["hits"]),
+            ("avatar_cache_misses_total", "counter", "아바타 캐시 실패 수", avatar["misses"]),
+            ("avatar_cache_size", "gauge", "아바타 캐시 항목 수", avatar["size"]),
+        ]
+    return app.response_class(_metrics.render(extra), mimetype="text/plain; version=0.0.4")
+
+
+_EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "1000"))
+
+
+@app.route("/api/admin/export/<kind>", methods=["GET"], strict_slashes=False)
+def api_admin_export(kind):
+    """members/posts/minesweeper/sachunsung/timestop 전체를 id 순으로 스트리밍.
+
+    ?format=csv|ndjson (기본 ndjson), ?since=&until= (created_at 범위, 시간대 없으면 KST),
+    ?after=<id> 이어받기: 받은 마지막 행의 id 를 넘기면 그 다음부터 (CSV 머리글 생략).
+    행은 EXPORT_CHUNK_SIZE 개씩 읽어서 바로 내보내므로 메모리는 청크 하나 분량만 쓴다.
+    """
+    if not session.get("is_admin"):
+        return jsonify({"error": "권한이 없습니다."}), 403
+    if kind not in EXPORT_TABLES:
+        return jsonify({"error": "알 수 없는 내보내기 대상입니다."}), 404
+    if not db:
+        return _post_error("DB 미설정")
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format 은 csv 또는 ndjson 입니다."}), 400
+    try:
+        after = int(request.args.get("after", 0))
+        since = to_utc_iso(request.args["since"]) if request.args.get("since") else None
+        until = to_utc_iso(request.args["until"]) if request.args.get("until") else None
+    except ValueError:
+        return jsonify({"error": "잘못된 요청입니다."}), 400
+    table, columns = EXPORT_TABLES[kind]
+    fields = columns.split(",")
+    header = "after" not in request.args
+
+    def chunks():
+        if fmt == "csv" and header:
+            yield ",".join(fields) + "\r\n"
+        last_id = after
+        while True:
+            rows = db.export_rows(table, columns, last_id, _EXPORT_CHUNK_SIZE, since, until)
+            if not rows:
+                return
+            last_id = rows[-1]["id"]
+            if fmt == "ndjson":
+                yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            else:
+                buf = io.StringIO()
+                csv.DictWriter(buf, fields, extrasaction="ignore").writerows(rows)
+                yield buf.getvalue()
+            if len(rows) < _EXPORT_CHUNK_SIZE:
+                return
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(chunks(), mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename={kind}.{fmt}",
+        "Cache-Control": "no-store",
+        "X-Accel-Buffering": "no",
+    })
+
+
+# ──────────────────────────────────────────────
+# 묶음 요청 API
+# ──────────────────────────────────────────────
+
+_BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "10"))
+# 스트림/내보내기는 한 응답에 담을 수 없고, batch 안의 batch 는 허용하지 않는다
+# 묶을 수 있는 GET API (엔드포인트 이름). 세션/상태를 바꾸지 않는 조회만 둔다:
+# 하위 요청은 gather 스레드에서 부모 세션을 같이 쓰기 때문 (게임 보드 발급, 스트림 등은 제외)
+_BATCH_ENDPOINTS = frozenset([
+    "health",
+    "posts_collection",
+    "posts_search",
+    "post_by_id",
+    "ranking_authors",
+    "api_avatar_me",
+    "api_avatar_user",
+    "api_minesweeper_ranking",
+    "api_sachunsung_ranking",
+    "api_timestop_ranking",
+])
+# 하위 요청에 넘기지 않는 헤더 (본문 관련, 조건부 요청)
+_BATCH_DROP_HEADERS = frozenset(["content-type", "content-length", "if-none-match", "if-modified-since"])
+
+
+@app.route("/api/batch", methods=["POST"], strict_slashes=False)
+def api_batch():
+    """여러 GET API 를 한 번에. body: {"requests": ["/api/posts?page=2", "/api/ranking/authors?limit=5"]}
+
+    _BATCH_ENDPOINTS 에 있는 조회 API 만 묶을 수 있다.
+
+    하위 요청은 이 요청에서 연 세션과 로그인 확인을 그대로 쓰고 (before_request 훅을 다시
+    돌지 않음) gather() 로 동시에 처리한다. 반환: {"responses": [{"status", "body"}, ...]} (요청 순서)
+    """
+    paths = (request.get_json(silent=True) or {}).get("requests")
+    if not isinstance(paths, list) or not paths or not all(isinstance(p, str) for p in paths):
+        return jsonify({"error": "requests 는 경로 문자열 목록이어야 합니다."}), 400
+    if len(paths) > _BATCH_MAX_REQUESTS:
+        return jsonify({"error": f"한 번에 {_BATCH_MAX_REQUESTS}개까지 요청할 수 있습니다."}), 400
+    adapter = app.url_map.bind_to_environ(request.environ)
+    for path in paths:
+        try:
+            endpoint, _ = adapter.match(path.partition("?")[0], method="GET")
+        except HTTPException:
+            endpoint = None
+        if endpoint not in _BATCH_ENDPOINTS:
+            return jsonify({"error": f"묶을 수 없는 경로입니다: {path}"}), 400
+    parent = session._get_current_object()
+    headers = [(k, v) for k, v in request.headers if k.lower() not in _BATCH_DROP_HEADERS]
+    base_url = request.host_url
+    g.batch_avatars = {}
+    responses = gather(*[
+        (lambda p=path: _batch_dispatch(p, parent, headers, base_url)) for path in paths
+    ])
+    return jsonify({"responses": responses})
+
+
+def _batch_dispatch(path, parent_session, headers, base_url):
+    """하위 GET 요청 하나를 뷰 함수로 바로 처리 (훅/세션 저장 없음)."""
+    path, _, query = path.partition("?")
+    environ = EnvironBuilder(
+        path=path, base_url=base_url, query_string=query, method="GET", headers=headers,
+    ).get_environ()
+    with RequestContext(app, environ, session=parent_session):
+        try:
+            resp = app.make_response(app.dispatch_request())
+        except HTTPException as e:
+            return {"status": e.code, "body": {"error": e.description}}
+        except Exception as e:
+            app.logger.error("batch GET %s failed", path, exc_info=e)
+            return {"status": 500, "body": {"error": "오류가 발생했습니다."}}
+        body = resp.get_json(silent=True) if resp.is_json else resp.get_data(as_text=True)
+        return {"status": resp.status_code, "body": body}
+
+
 # ──────────────────────────────────────────────
 # 아바타 API
 # ──────────────────────────────────────────────
@@ -356,7 +834,7 @@ def api_avatar_me():
     user_id = session.get("user_id")
     if not user_id or user_id < 0:
         return jsonify({"error": "로그인이 필요합니다."}), 401
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     try:
         av = _get_avatar(user_id)
@@ -379,14 +857,16 @@ def api_avatar_me():
 @app.route("/api/avatar/<username>", methods=["GET"], strict_slashes=False)
 def api_avatar_user(username):
     """특정 사용자 아바타 JSON (공개)"""
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     try:
-        res = supabase.table("users").select("id").eq("username", username).execute()
-        rows = res.data or []
-        if not rows:
-            return jsonify({"error": "사용자를 찾을 수 없습니다."}), 404
-        uid = rows[0]["id"]
+        uid = _avatar_cache.get_user_id(username)
+        if uid is None:
+            user = db.find_user(username)
+            if not user:
+                return jsonify({"error": "사용자를 찾을 수 없습니다."}), 404
+            uid = user["id"]
+            _avatar_cache.put_user_id(username, uid)
         av = _get_avatar(uid)
         level = av.get("level", 1)
         con = av.get("con", 5)
@@ -411,7 +891,7 @@ def api_avatar_stat():
     user_id = session.get("user_id")
     if not user_id or user_id < 0:
         return jsonify({"error": "로그인이 필요합니다."}), 401
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     data = request.get_json() or {}
     stat = data.get("stat", "").lower()
@@ -430,12 +910,11 @@ def api_avatar_stat():
             return jsonify({"error": f"스탯 포인트가 부족합니다. (보유: {available})"}), 400
         new_stat = av.get(stat, 5) + amount
         new_points = available - amount
-        supabase.table("avatars").update({
+        db.update_avatar(user_id, {
             stat: new_stat,
             "stat_points": new_points,
-            "updated_at": "now()",
-        }).eq("user_id", user_id).execute()
-        _sync_avatar_session(user_id)
+        })
+        _avatar_cache.update(user_id, {stat: new_stat, "stat_points": new_points})
         con = av.get("con", 5) if stat != "con" else new_stat
         return jsonify({
             "ok": True,
@@ -451,71 +930,165 @@ def api_avatar_stat():
 # 지뢰찾기
 # ──────────────────────────────────────────────
 
-def _fmt_date_yyyymmdd(dt_str):
-    """created_at -> yyyymmdd"""
-    if not dt_str:
-        return ""
-    try:
-        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        kst = dt.astimezone(ZoneInfo("Asia/Seoul"))
-        return kst.strftime("%Y%m%d")
-    except Exception:
-        return str(dt_str)[:10].replace("-", "") if dt_str else ""
+def _save_game_record(game, payload, exp_gained):
+    """게임 기록 저장 + 회원이면 EXP 부여. write-behind 모드면 기록은 큐로 보낸다."""
+    user_id = session.get("user_id")
+    member = bool(user_id and user_id > 0)
+    if member:
+        payload["user_id"] = user_id
+    record_game = game
+    if _record_queue:
+        payload["created_at"] = datetime.now(timezone.utc).isoformat()
+        _record_queue.enqueue(game, payload)
+        record_game = None
+    elif not member:
+        db.insert_record(game, payload)
+        record_game = None
+    result = {"ok": True}
+    if member:
+        award = _award_exp(user_id, exp_gained, record_game, payload if record_game else None)
+        result["exp_gained"] = exp_gained
+        result["leveled_up"] = award["leveled_up"]
+        result["level"] = award["level"]
+    # 기록이 저장된 뒤에 버전을 올려야 다른 요청이 옛 랭킹을 새 버전으로 캐시하지 않는다
+    _response_cache.bump(RECORD_TABLES[game])
+    _ranking_broadcaster.notify(game)
+    return result
+
+
+def _with_pending(game, rows, limit, orders):
+    """랭킹 rows 에 아직 저장 전인 기록을 합쳐 다시 정렬. orders: [(key, desc)]"""
+    pending = _record_queue.pending(game) if _record_queue else []
+    if not pending:
+        return rows
+    seen = {(r.get("username"), r.get("created_at")) for r in rows}
+    merged = rows + [p for p in pending if (p.get("username"), p.get("created_at")) not in seen]
+    for key, desc in reversed(orders):
+        merged.sort(key=key, reverse=desc)
+    return merged[:limit]
+
+
+def _minesweeper_ranking():
+    """1순위 단계(높을수록), 2순위 클리어일(최신일수록) 상위 5개"""
+    ranking = []
+    rows = _with_pending("minesweeper", db.minesweeper_top(5), 5, [
+        (lambda r: r.get("level", 1), True),
+        (lambda r: r.get("created_at") or "", True),
+    ])
+    dates = fmt_date_yyyymmdd_many(row.get("created_at") for row in rows)
+    for i, row in enumerate(rows):
+        ranking.append({
+            "rank": i + 1,
+            "level": row.get("level", 1),
+            "username": row.get("username", ""),
+            "success_date": dates[i],
+        })
+    return ranking
 
 
 @app.route("/api/minesweeper/ranking", methods=["GET"], strict_slashes=False)
+@_cached_response("minesweeper_records")
 def api_minesweeper_ranking():
-    """1순위 단계(높을수록), 2순위 클리어일(최신일수록) 상위 5개"""
-    if not supabase:
+    if not db:
         return jsonify({"ranking": []})
     try:
-        res = supabase.table("minesweeper_records").select(
-            "id,username,level,created_at"
-        ).order("level", desc=True).order("created_at", desc=True).limit(5).execute()
-        ranking = []
-        for i, row in enumerate((res.data or [])):
-            ranking.append({
-                "rank": i + 1,
-                "level": row.get("level", 1),
-                "username": row.get("username", ""),
-                "success_date": _fmt_date_yyyymmdd(row.get("created_at")),
-            })
-        return jsonify({"ranking": ranking})
-    except Exception:
-        return jsonify({"ranking": []})
+        return jsonify({"ranking": _minesweeper_ranking()})
+    except Exception as e:
+        return _ranking_unavailable(e)
+
+
+@app.route("/api/minesweeper/board", methods=["GET"], strict_slashes=False)
+def api_minesweeper_board():
+    """?level=1~6&row=&col= (첫 클릭 칸) -> 새 판의 시드와 크기 (보드는 내주지 않는다).
+
+    칸은 /api/minesweeper/reveal 로 하나씩 열고, 판은 서버에 남겨 두었다가 이기면 한 번만
+    기록할 수 있다.
+    """
+    username = session.get("username")
+    if not username:
+        return jsonify({"error": "로그인이 필요합니다."}), 401
+    level = request.args.get("level", type=int)
+    if level not in MINESWEEPER_LEVELS:
+        return jsonify({"error": "잘못된 레벨입니다."}), 400
+    rows, cols, bombs = MINESWEEPER_LEVELS[level]
+    row = request.args.get("row", type=int)
+    col = request.args.get("col", type=int)
+    if row is None or col is None or not (0 <= row < rows and 0 <= col < cols):
+        return jsonify({"error": "첫 클릭 칸이 올바르지 않습니다."}), 400
+    # 최대 HP 는 판을 시작할 때의 CON 으로 정한다 (minesweeper.html 의 AVATAR_CON 과 같음)
+    max_hp = _LazyAvatar(session.get("user_id")).con * 10
+    try:
+        seed = _minesweeper_games.start(username, level, (row, col), max_hp)
+    except Exception as e:
+        return _post_error(e)
+    resp = jsonify({"level": level, "seed": seed, "rows": rows, "cols": cols, "bombs": bombs, "max_hp": max_hp})
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+
+_MINESWEEPER_MAX_CELLS = max(rows * cols for rows, cols, _ in MINESWEEPER_LEVELS.values())
+
+
+def _minesweeper_seed(data):
+    seed = data.get("seed")
+    if isinstance(seed, int) and not isinstance(seed, bool) and 0 <= seed < SEED_MAX:
+        return seed
+    return None
+
+
+@app.route("/api/minesweeper/reveal", methods=["POST"], strict_slashes=False)
+def api_minesweeper_reveal():
+    """{"seed", "row", "col"[, "flags": [[r, c], ...]]} -> 칸을 연 결과
+    {"opened": [[r, c, 값], ...], "hp", "result"[, "mines"]}.
+
+    값은 주변 지뢰 수, -1 은 밟은 지뢰. result 는 "won" / "lost" / null (진행 중).
+    flags 는 지금 깃발을 꽂은 칸으로, 주변을 이어서 열 때 건너뛴다.
+    """
+    username = session.get("username")
+    if not username:
+        return jsonify({"error": "로그인이 필요합니다."}), 401
+    data = request.get_json(silent=True) or {}
+    seed = _minesweeper_seed(data)
+    flags = data.get("flags") or []
+    try:
+        cell = (int(data["row"]), int(data["col"]))
+        if not isinstance(flags, list) or len(flags) > _MINESWEEPER_MAX_CELLS:
+            raise ValueError("flags")
+        flags = {(int(r), int(c)) for r, c in flags}
+    except (KeyError, TypeError, ValueError):
+        cell = None
+    if seed is None or cell is None:
+        return jsonify({"error": "잘못된 요청입니다."}), 400
+    try:
+        result = _minesweeper_games.reveal(seed, username, cell, flags)
+    except Exception as e:
+        return _post_error(e)
+    if result is None:
+        return jsonify({"error": "없거나 만료된 판입니다."}), 404
+    return jsonify(result)
 
 
 @app.route("/api/minesweeper/record", methods=["POST"], strict_slashes=False)
 def api_minesweeper_record():
-    """승리 기록 저장 (로그인 필수)"""
+    """승리 기록 저장 (로그인 필수). {"seed"}: 서버에서 이긴 판만, 판마다 한 번만 인정한다."""
     username = session.get("username")
     if not username:
         return jsonify({"error": "로그인이 필요합니다."}), 401
-    data = request.get_json() or {}
-    level = int(data.get("level", 1))
-    if level not in (1, 2, 3, 4, 5, 6):
-        level = 1
-    if not supabase:
+    seed = _minesweeper_seed(request.get_json(silent=True) or {})
+    if not db:
         return _post_error("DB 미설정")
     try:
-        user_id = session.get("user_id")
+        level = _minesweeper_games.claim(seed, username) if seed is not None else None
+    except Exception as e:
+        return _post_error(e)
+    if level is None:
+        return jsonify({"error": "확인할 수 없는 기록입니다."}), 400
+    try:
         payload = {"username": username, "level": level}
-        if user_id and user_id > 0:
-            payload["user_id"] = user_id
-        supabase.table("minesweeper_records").insert(payload).execute()
-
-        result = {"ok": True}
-        if user_id and user_id > 0:
-            exp_gained = level * 50
-            award = _award_exp(user_id, exp_gained)
-            _sync_avatar_session(user_id)
-            result["exp_gained"] = exp_gained
-            result["leveled_up"] = award["leveled_up"]
-            result["level"] = award["level"]
-        return jsonify(result)
+        exp_gained = level * 50
+        return jsonify(_save_game_record("minesweeper", payload, exp_gained))
     except Exception as e:
+        _minesweeper_games.unclaim(seed)
         return _post_error(e)
 
 
@@ -523,27 +1096,50 @@ def api_minesweeper_record():
 # 사천성
 # ──────────────────────────────────────────────
 
+def _sachunsung_ranking():
+    """1순위 난이도(단계) 높은 순, 2순위 클리어 타임 짧은 순, 상위 5개"""
+    ranking = []
+    rows = _with_pending("sachunsung", db.sachunsung_top(5), 5, [
+        (lambda r: r.get("stage", 1), True),
+        (lambda r: float(r.get("clear_time_sec", 0)), False),
+    ])
+    dates = fmt_date_yyyymmdd_many(row.get("created_at") for row in rows)
+    for i, row in enumerate(rows):
+        ranking.append({
+            "rank": i + 1,
+            "stage": row.get("stage", 1),
+            "username": row.get("username", ""),
+            "clear_time_sec": float(row.get("clear_time_sec", 0)),
+            "reg_date": dates[i],
+        })
+    return ranking
+
+
 @app.route("/api/sachunsung/ranking", methods=["GET"], strict_slashes=False)
+@_cached_response("sachunsung_records")
 def api_sachunsung_ranking():
-    """1순위 난이도(단계) 높은 순, 2순위 클리어 타임 짧은 순, 상위 5개"""
-    if not supabase:
+    if not db:
         return jsonify({"ranking": []})
     try:
-        res = supabase.table("sachunsung_records").select(
-            "id,username,stage,clear_time_sec,created_at"
-        ).order("stage", desc=True).order("clear_time_sec", desc=False).limit(5).execute()
-        ranking = []
-        for i, row in enumerate((res.data or [])):
-            ranking.append({
-                "rank": i + 1,
-                "stage": row.get("stage", 1),
-                "username": row.get("username", ""),
-                "clear_time_sec": float(row.get("clear_time_sec", 0)),
-                "reg_date": _fmt_date_yyyymmdd(row.get("created_at")),
-            })
-        return jsonify({"ranking": ranking})
-    except Exception:
-        return jsonify({"ranking": []})
+        return jsonify({"ranking": _sachunsung_ranking()})
+    except Exception as e:
+        return _ranking_unavailable(e)
+
+
+@app.route("/api/sachunsung/board", methods=["GET"], strict_slashes=False)
+def api_sachunsung_board():
+    """끝까지 풀 수 있는 새 보드 (?stage=1~5). 미리 만들어 둔 풀에서 꺼낸다."""
+    stage = request.args.get("stage", 1, type=int)
+    if stage not in SACHUNSUNG_STAGES:
+        return jsonify({"error": "잘못된 단계입니다."}), 400
+    try:
+        board = _sachunsung_boards.take(stage)
+    except Exception as e:
+        return _post_error(e)
+    rows, cols = SACHUNSUNG_STAGES[stage]
+    resp = jsonify({"stage": stage, "rows": rows, "cols": cols, "board": board})
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
 
 
 @app.route("/api/sachunsung/record", methods=["POST"], strict_slashes=False)
@@ -561,24 +1157,12 @@ def api_sachunsung_record():
     except (TypeError, ValueError):
         clear_time_sec = 0.0
     clear_time_sec = max(0.0, round(clear_time_sec, 2))
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     try:
-        user_id = session.get("user_id")
         payload = {"username": username, "stage": stage, "clear_time_sec": clear_time_sec}
-        if user_id and user_id > 0:
-            payload["user_id"] = user_id
-        supabase.table("sachunsung_records").insert(payload).execute()
-
-        result = {"ok": True}
-        if user_id and user_id > 0:
-            exp_gained = stage * 30
-            award = _award_exp(user_id, exp_gained)
-            _sync_avatar_session(user_id)
-            result["exp_gained"] = exp_gained
-            result["leveled_up"] = award["leveled_up"]
-            result["level"] = award["level"]
-        return jsonify(result)
+        exp_gained = stage * 30
+        return jsonify(_save_game_record("sachunsung", payload, exp_gained))
     except Exception as e:
         return _post_error(e)
 
@@ -587,28 +1171,30 @@ def api_sachunsung_record():
 # 타임스탑
 # ──────────────────────────────────────────────
 
+def _timestop_ranking():
+    """10.00초에 가까울수록 상위, 상위 5개"""
+    ranking = []
+    rows = _with_pending("timestop", db.timestop_top(5), 5, [(timestop_distance, False)])
+    dates = fmt_date_yyyymmdd_many(row.get("created_at") for row in rows)
+    for i, row in enumerate(rows):
+        ranking.append({
+            "rank": i + 1,
+            "username": row.get("username", ""),
+            "stop_time": f"{float(row.get('stop_time', 0)):.2f}",
+            "reg_date": dates[i],
+        })
+    return ranking
+
+
 @app.route("/api/timestop/ranking", methods=["GET"], strict_slashes=False)
+@_cached_response("timestop_records")
 def api_timestop_ranking():
-    """10.00초에 가까울수록 상위, 상위 5개"""
-    if not supabase:
+    if not db:
         return jsonify({"ranking": []})
     try:
-        res = supabase.table("timestop_records").select(
-            "username,stop_time,created_at"
-        ).execute()
-        rows = res.data or []
-        rows.sort(key=lambda r: abs(float(r.get("stop_time", 0)) - 10.0))
-        ranking = []
-        for i, row in enumerate(rows[:5]):
-            ranking.append({
-                "rank": i + 1,
-                "username": row.get("username", ""),
-                "stop_time": f"{float(row.get('stop_time', 0)):.2f}",
-                "reg_date": _fmt_date_yyyymmdd(row.get("created_at")),
-            })
-        return jsonify({"ranking": ranking})
-    except Exception:
-        return jsonify({"ranking": []})
+        return jsonify({"ranking": _timestop_ranking()})
+    except Exception as e:
+        return _ranking_unavailable(e)
 
 
 @app.route("/api/timestop/record", methods=["POST"], strict_slashes=False)
@@ -623,26 +1209,71 @@ def api_timestop_record():
     except (TypeError, ValueError):
         stop_time = 0.0
     stop_time = max(0.0, min(30.0, round(stop_time, 2)))
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     try:
-        user_id = session.get("user_id")
         payload = {"username": username, "stop_time": stop_time}
-        if user_id and user_id > 0:
-            payload["user_id"] = user_id
-        supabase.table("timestop_records").insert(payload).execute()
+        exp_gained = max(10, 100 - math.floor(abs(stop_time - 10) * 5))
+        return jsonify(_save_game_record("timestop", payload, exp_gained))
+    except Exception as e:
+        return _post_error(e)
 
-        result = {"ok": True}
-        if user_id and user_id > 0:
-            exp_gained = max(10, 100 - math.floor(abs(stop_time - 10) * 5))
-            award = _award_exp(user_id, exp_gained)
-            _sync_avatar_session(user_id)
-            result["exp_gained"] = exp_gained
-            result["leveled_up"] = award["leveled_up"]
-            result["level"] = award["level"]
-        return jsonify(result)
+
+# ──────────────────────────────────────────────
+# 랭킹 스트림 (SSE)
+# ──────────────────────────────────────────────
+
+_RANKINGS = {
+    "minesweeper": _minesweeper_ranking,
+    "sachunsung": _sachunsung_ranking,
+    "timestop": _timestop_ranking,
+}
+
+# 워커별 브로드캐스터 (SSE_MAX_CLIENTS: 워커당 동시 구독 수, 스트림 하나가 스레드 하나를 점유)
+_ranking_broadcaster = RankingBroadcaster(
+    lambda game: _RANKINGS[game](),
+    lambda games: _response_cache.versions([RECORD_TABLES[g] for g in games]),
+    _RANKINGS,
+    poll_interval=float(os.environ.get("SSE_POLL_INTERVAL", "1.0")),
+    max_subscribers=int(os.environ.get("SSE_MAX_CLIENTS", "16")),
+)
+
+
+@app.route("/api/stream/rankings", methods=["GET"], strict_slashes=False)
+def api_stream_rankings():
+    """게임 랭킹 상위 5개 변경 스트림. ?games=minesweeper,timestop (기본: 전체)
+
+    접속 직후 현재 랭킹을, 이후에는 상위 목록이 바뀔 때만 `event: ranking` 으로 보낸다.
+    """
+    if not db:
+        return _post_error("DB 미설정")
+    games = [g for g in request.args.get("games", "").split(",") if g in _RANKINGS] or list(_RANKINGS)
+    try:
+        sub = _ranking_broadcaster.subscribe(games)
     except Exception as e:
         return _post_error(e)
+    if sub is None:
+        return jsonify({"error": "요청이 많습니다. 잠시 후 다시 시도하세요."}), 503, {"Retry-After": "5"}
+    keepalive = float(os.environ.get("SSE_KEEPALIVE", "15"))
+    max_age = float(os.environ.get("SSE_MAX_AGE", "300"))
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            for event in sub.events(keepalive, max_age):
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                game, ranking = event
+                data = json.dumps({"game": game, "ranking": ranking}, ensure_ascii=False)
+                yield f"event: ranking\ndata: {data}\n\n"
+        finally:
+            _ranking_broadcaster.unsubscribe(sub)
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
 
 
 # ──────────────────────────────────────────────
@@ -656,98 +1287,175 @@ def health():
 
 @app.route("/api/db-check")
 def db_check():
-    """Supabase 연결 테스트"""
-    if not supabase:
+    """저장소 연결 테스트"""
+    if not db:
         return jsonify({"ok": False, "error": "SUPABASE_URL/SUPABASE_KEY 미설정"}), 500
     try:
-        supabase.table("health").select("1").limit(1).execute()
-        return jsonify({"ok": True, "message": "Supabase 연결 정상"})
+        return jsonify({"ok": True, "message": db.ping()})
     except Exception as e:
-        err = str(e).lower()
-        if any(x in err for x in [
-            "relation", "does not exist", "42p01", "not find",
-            "schema cache", "rgrst205", "could not find"
-        ]):
-            return jsonify({"ok": True, "message": "Supabase 연결됨 (health 테이블 없음)"})
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
+# 레벨/경험치 랭킹이 의존하는 테이블. 인덱스는 이 버전들로 적재 시점을 기억한다.
+_RANKING_TABLES = ("avatars", "users")
+
+
+def _ranking_version():
+    return tuple(_response_cache.versions(_RANKING_TABLES))
+
+
+def _bump_ranking_tables(*tables):
+    """tables 버전을 올린다. 반환: 랭킹 버전 (올리기 전, 올린 뒤) — AuthorRanking.update 의 moved"""
+    bumped = _response_cache.bump(*tables)
+    current = dict(zip(_RANKING_TABLES, _ranking_version()))
+    current.update(bumped)
+    return (tuple(current[t] - (t in bumped) for t in _RANKING_TABLES),
+            tuple(current[t] for t in _RANKING_TABLES))
+
+
+def _load_author_ranking(version=None):
+    """avatars 전체와 username을 읽어 랭킹 인덱스를 재구성."""
+    _author_ranking.load(db.author_rows(), version)
+
+
 @app.route("/api/ranking/authors", methods=["GET"], strict_slashes=False)
+@_cached_response("avatars", "users", per_user=True)
 def ranking_authors():
     """레벨/경험치 랭킹. 게시글 작성 여부와 무관하게 avatars 기준. 1순위 LEVEL 높은 순, 2순위 경험치 많은 순."""
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     try:
         limit = max(1, min(20, int(request.args.get("limit", 5))))
-        av_res = supabase.table("avatars").select("user_id,level,exp").order(
-            "level", desc=True
-        ).order("exp", desc=True).execute()
-        rows = [(av["user_id"], av.get("level", 1), av.get("exp", 0)) for av in (av_res.data or [])]
-        if not rows:
-            return jsonify({"ranking": []})
-        user_ids = list({r[0] for r in rows[:limit]})
-        users_res = supabase.table("users").select("id,username").in_("id", user_ids).execute()
-        username_map = {u["id"]: u.get("username", "") for u in (users_res.data or [])}
-        rank = 0
-        prev = (None, None)
-        ranking = []
-        for uid, lv, exp in rows[:limit]:
-            if (lv, exp) != prev:
-                rank += 1
-                prev = (lv, exp)
-            ranking.append({
-                "rank": rank,
-                "username": username_map.get(uid, ""),
-                "level": lv,
-                "exp": exp,
-            })
-        return jsonify({"ranking": ranking})
+        return jsonify(_authors_ranking(limit, session.get("user_id")))
     except Exception as e:
         return _post_error(e)
 
 
+def _authors_ranking(limit, user_id):
+    # 다른 워커의 EXP 변경으로 공유 버전이 바뀌었으면 다시 적재한다. 그러지 않으면 옛 인덱스로
+    # 만든 본문이 새 버전의 ETag 로 캐시되어 다음 쓰기 때까지 그대로 나간다.
+    version = _ranking_version()
+    if _author_ranking.is_stale(version):
+        _load_author_ranking(version)
+    result = {"ranking": _author_ranking.top(limit)}
+    if user_id and user_id > 0:
+        result["me"] = _author_ranking.rank_of(user_id)
+    return result
+
+
+def _posts_total():
+    return _counters.get("posts_total", db.count_posts)
+
+
+def _parse_cursor(value):
+    """"<created_at>,<id>" -> (정규화한 UTC created_at, id). 잘못된 커서면 ValueError."""
+    created_at, _, row_id = value.rpartition(",")
+    return cursor_time(created_at), int(row_id)
+
+
 @app.route("/api/posts", methods=["GET", "POST"], strict_slashes=False)
+@_cached_response("posts", "avatars")
 def posts_collection():
-    if not supabase:
+    """게시글 목록. ?page=N 또는 ?before=<created_at,id>&from=<첫 행 번호> (키셋)"""
+    if not db:
         return _post_error("DB 미설정")
     if request.method == "POST":
         return _create_post()
     try:
-        page = max(1, int(request.args.get("page", 1)))
         limit = max(1, min(50, int(request.args.get("limit", 15))))
-        offset = (page - 1) * limit
+        page = max(1, int(request.args.get("page", 1)))
+        first_number = request.args.get("from")
+        first_number = None if first_number is None else int(first_number)
+    except ValueError:
+        return jsonify({"error": "잘못된 요청입니다."}), 400
+    before = request.args.get("before")
+    if before:
+        try:
+            created_at, before_id = _parse_cursor(before)
+        except ValueError:
+            return jsonify({"error": "잘못된 커서입니다."}), 400
+    try:
+        if before:
+            total, rows = gather(_posts_total, lambda: db.list_posts_before(created_at, before_id, limit))
+            return jsonify(_posts_list(rows, total, total if first_number is None else first_number, limit))
+        return jsonify(_posts_page(page, limit))
+    except Exception as e:
+        return _post_error(e)
 
-        res = supabase.table("posts").select("id,author,title,created_at,user_id", count="exact").order(
-            "created_at", desc=True
-        ).range(offset, offset + limit - 1).execute()
 
-        total = getattr(res, "count", None) or len(res.data or [])
+def _posts_page(page, limit):
+    offset = (page - 1) * limit
+    total, rows = gather(_posts_total, lambda: db.list_posts(offset, limit))
+    return _posts_list(rows, total, total - offset, limit)
 
-        user_ids = list({row["user_id"] for row in (res.data or []) if row.get("user_id")})
-        level_map = {}
-        if user_ids:
-            av_res = supabase.table("avatars").select("user_id,level").in_("user_id", user_ids).execute()
-            for av in (av_res.data or []):
-                level_map[av["user_id"]] = av.get("level", 1)
 
+def _posts_list(rows, total, first_number, limit):
+    level_map = db.avatar_levels({row["user_id"] for row in rows if row.get("user_id")})
+
+    created = fmt_dt_many(row.get("created_at") for row in rows)
+    posts = []
+    for i, row in enumerate(rows):
+        uid = row.get("user_id")
+        posts.append({
+            "id": row["id"],
+            "number": first_number - i,
+            "author": row.get("author", ""),
+            "author_level": level_map.get(uid, 1) if uid else None,
+            "title": row.get("title", ""),
+            "created_at": created[i],
+        })
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = f"{rows[-1]['created_at']},{rows[-1]['id']}"
+    return {"posts": posts, "total": total, "next_cursor": next_cursor}
+
+
+def _index_post(post_id, title, content):
+    """검색 색인 갱신. 실패해도 글 저장은 그대로 두고 기록만 남긴다 (search.py --reindex 로 복구)."""
+    if not post_id:
+        return
+    try:
+        db.index_post(post_id, term_weights(title, content))
+    except Exception:
+        app.logger.exception("post %s indexing failed", post_id)
+
+
+@app.route("/api/posts/search", methods=["GET"], strict_slashes=False)
+@_cached_response("posts", "avatars")
+def posts_search():
+    """게시글 검색 (제목/본문 2-gram 색인). ?q=검색어&page=N&limit=N, 점수 순"""
+    if not db:
+        return _post_error("DB 미설정")
+    q = (request.args.get("q") or "").strip()[:100]
+    terms = query_terms(q)
+    if not terms:
+        return jsonify({"error": "검색어를 입력하세요."}), 400
+    try:
+        limit = max(1, min(50, int(request.args.get("limit", 15))))
+        page = max(1, int(request.args.get("page", 1)))
+    except ValueError:
+        return jsonify({"error": "잘못된 요청입니다."}), 400
+    try:
+        rows, total = db.search_posts(terms, limit, (page - 1) * limit)
+        level_map = db.avatar_levels({row["user_id"] for row in rows if row.get("user_id")})
+        created = fmt_dt_many(row.get("created_at") for row in rows)
         posts = []
-        for i, row in enumerate(res.data or []):
+        for i, row in enumerate(rows):
             uid = row.get("user_id")
             posts.append({
                 "id": row["id"],
-                "number": total - offset - i,
                 "author": row.get("author", ""),
                 "author_level": level_map.get(uid, 1) if uid else None,
                 "title": row.get("title", ""),
-                "created_at": _fmt_dt(row.get("created_at")),
+                "created_at": created[i],
             })
-        return jsonify({"posts": posts, "total": total})
+        return jsonify({"posts": posts, "total": total, "page": page, "query": q})
     except Exception as e:
         return _post_error(e)
 
 
 def _create_post():
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     data = request.get_json() or {}
     logged_user = session.get("username")
@@ -762,7 +1470,7 @@ def _create_post():
     else:
         if not author or not password or not title:
             return jsonify({"error": "글쓴이, 비밀번호, 제목은 필수입니다."}), 400
-        password_hash = generate_password_hash(password)
+        password_hash = _hasher.hash(password)
         user_id = None
     if not title:
         return jsonify({"error": "제목은 필수입니다."}), 400
@@ -775,62 +1483,65 @@ def _create_post():
         }
         if user_id is not None:
             payload["user_id"] = user_id
-        ins = supabase.table("posts").insert(payload).execute()
-        row = (ins.data or [{}])[0]
+        row = db.create_post(payload)
+        _counters.add("posts_total", 1)
+        _index_post(row.get("id"), title, content)
+        _response_cache.bump("posts")
 
         if user_id and user_id > 0:
             _award_exp(user_id, 10)
-            _sync_avatar_session(user_id)
 
-        return jsonify({"id": row.get("id"), "created_at": _fmt_dt(row.get("created_at"))}), 201
+        return jsonify({"id": row.get("id"), "created_at": fmt_dt(row.get("created_at"))}), 201
     except Exception as e:
         return _post_error(e)
 
 
 @app.route("/api/posts/<int:post_id>", methods=["GET", "PUT", "DELETE"], strict_slashes=False)
 def post_by_id(post_id):
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     if request.method == "PUT":
         return _update_post(post_id)
     if request.method == "DELETE":
         return _delete_post(post_id)
     try:
-        res = supabase.table("posts").select("id,author,title,content,created_at,user_id").eq(
-            "id", post_id
-        ).execute()
-        rows = res.data or []
-        if not rows:
+        post = _post_detail(post_id)
+        if not post:
             return jsonify({"error": "Not found"}), 404
-        row = rows[0]
-        uid = row.get("user_id")
-        author_level = None
-        if uid:
-            av = _get_avatar(uid)
-            author_level = av.get("level", 1)
-        return jsonify({
-            "id": row["id"],
-            "author": row.get("author", ""),
-            "author_level": author_level,
-            "title": row.get("title", ""),
-            "content": row.get("content", ""),
-            "created_at": _fmt_dt(row.get("created_at")),
-            "user_id": uid,
-        })
+        return jsonify(post)
     except Exception as e:
         return _post_error(e)
 
 
+def _post_detail(post_id):
+    row = db.get_post(post_id, "id,author,title,content,created_at,user_id")
+    if not row:
+        return None
+    uid = row.get("user_id")
+    author_level = None
+    if uid:
+        av = _get_avatar(uid)
+        author_level = av.get("level", 1)
+    return {
+        "id": row["id"],
+        "author": row.get("author", ""),
+        "author_level": author_level,
+        "title": row.get("title", ""),
+        "content": row.get("content", ""),
+        "created_at": fmt_dt(row.get("created_at")),
+        "user_id": uid,
+    }
+
+
 def _get_password_hash(post_id):
-    res = supabase.table("posts").select("password_hash").eq("id", post_id).execute()
-    rows = res.data or []
-    if not rows:
+    row = db.get_post(post_id, "password_hash")
+    if not row:
         return None
-    return rows[0].get("password_hash")
+    return row.get("password_hash")
 
 
 def _update_post(post_id):
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     data = request.get_json() or {}
     password = data.get("password") or ""
@@ -839,43 +1550,37 @@ def _update_post(post_id):
     if not title:
         return jsonify({"error": "제목은 필수입니다."}), 400
     try:
-        res = supabase.table("posts").select("author,password_hash,user_id").eq(
-            "id", post_id
-        ).execute()
-        rows = res.data or []
-        if not rows:
+        row = db.get_post(post_id, "author,password_hash,user_id")
+        if not row:
             return jsonify({"error": "Not found"}), 404
-        row = rows[0]
         author = row.get("author", "")
         logged_user = session.get("username")
         if logged_user and author == logged_user:
             pass
         else:
             stored = row.get("password_hash")
-            if not stored or not check_password_hash(stored, password):
+            if not _hasher.verify(stored, password):
                 return jsonify({"error": "비밀번호가 일치하지 않습니다."}), 403
-        supabase.table("posts").update({
+        db.update_post(post_id, {
             "title": title,
             "content": content,
-        }).eq("id", post_id).execute()
+        })
+        _index_post(post_id, title, content)
+        _response_cache.bump("posts")
         return jsonify({"ok": True})
     except Exception as e:
         return _post_error(e)
 
 
 def _delete_post(post_id):
-    if not supabase:
+    if not db:
         return _post_error("DB 미설정")
     data = request.get_json() or {}
     password = data.get("password") or ""
     try:
-        res = supabase.table("posts").select("author,password_hash").eq(
-            "id", post_id
-        ).execute()
-        rows = res.data or []
-        if not rows:
+        row = db.get_post(post_id, "author,password_hash")
+        if not row:
             return jsonify({"error": "Not found"}), 404
-        row = rows[0]
         author = row.get("author", "")
         logged_user = session.get("username")
         is_admin = session.get("is_admin", False)
@@ -885,14 +1590,37 @@ def _delete_post(post_id):
             pass
         else:
             stored = row.get("password_hash")
-            if not stored or not check_password_hash(stored, password):
+            if not _hasher.verify(stored, password):
                 return jsonify({"error": "비밀번호가 일치하지 않습니다."}), 403
-        supabase.table("posts").delete().eq("id", post_id).execute()
+        db.delete_post(post_id)  # 검색 색인(post_terms)은 ON DELETE CASCADE 로 함께 삭제
+        _counters.add("posts_total", -1)
+        _response_cache.bump("posts")
         return jsonify({"ok": True})
     except Exception as e:
         return _post_error(e)
 
 
+def init_worker():
+    """워커 기동 직후(gunicorn post_worker_init) 워커별 DB 연결을 미리 열고
+    사천성 보드 풀을 채우기 시작한다. 이전 프로세스가 남긴 기록 journal 도 다시 저장한다.
+
+    --preload 로 마스터에서 앱을 import 해도 연결은 fork 이후 워커마다 만들어진다.
+    """
+    _sachunsung_boards.start()
+    if not db:
+        return
+    try:
+        db.ping()
+    except Exception:
+        app.logger.warning("DB warm-up failed", exc_info=True)
+        return
+    if _record_queue:
+        try:
+            _record_queue.replay_journal()
+        except Exception:
+            app.logger.warning("record journal replay failed", exc_info=True)
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5001))
     print(f"\n  TestSvr API: http://127.0.0.1:{port}/api/health\n  Ctrl+C 로 종료\n")
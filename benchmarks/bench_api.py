@@ -0,0 +1,229 @@
+"""Flask API 부하/벤치마크.
+
+실제 Supabase 없이 fake_supabase.FakeSupabase 위에서 app 을 띄우고
+시나리오별 요청을 여러 스레드로 보내 엔드포인트별 p50/p99 지연, 초당 요청 수,
+요청당 DB 왕복 수를 출력한다.
+
+    python benchmarks/bench_api.py --latency-ms 5 --users 1000 --posts 5000
+    python benchmarks/bench_api.py --scenario login --check
+
+--check 를 주면 요청당 평균 DB 왕복이 DB_CALL_BUDGET 을 넘는 엔드포인트가
+있을 때 종료 코드 1을 반환한다.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 실행마다 빈 공유 캐시에서 시작
+_tmp_dir = tempfile.mkdtemp(prefix="testsvr-bench-")
+os.environ.setdefault("AVATAR_CACHE_PATH", os.path.join(_tmp_dir, "avatar-cache.db"))
+os.environ.setdefault("COUNTER_CACHE_PATH", os.path.join(_tmp_dir, "counters.db"))
+os.environ.setdefault("RESPONSE_CACHE_PATH", os.path.join(_tmp_dir, "response-versions.db"))
+os.environ.setdefault("METRICS_PATH", os.path.join(_tmp_dir, "metrics.db"))
+os.environ.setdefault("MINESWEEPER_GAMES_PATH", os.path.join(_tmp_dir, "minesweeper-games.db"))
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import app as app_module  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+from storage import SupabaseStore  # noqa: E402
+
+PASSWORD = "bench-pass"
+
+# 엔드포인트별 요청당 DB 왕복 상한
+DB_CALL_BUDGET = {
+    "GET /": 4,   # SSR: /api/posts 1페이지 + /api/ranking/authors (응답 캐시 적중 시 0)
+    "GET /api/posts": 2,
+    "GET /api/ranking/authors": 2,
+    "GET /api/minesweeper/board": 1,   # 최대 HP 용 아바타 (아바타 캐시 적중 시 0)
+    "POST /api/minesweeper/reveal": 0,
+    "POST /api/minesweeper/record": 1,
+    "POST /api/sachunsung/record": 1,
+    "POST /api/timestop/record": 1,
+    "GET /api/minesweeper/ranking": 1,
+    "GET /api/sachunsung/ranking": 1,
+    "GET /api/timestop/ranking": 2,
+    "POST /api/auth/login": 1,
+}
+
+
+def seed(fake, users, posts, records):
+    rnd = random.Random(0)
+    password_hash = generate_password_hash(PASSWORD)
+    fake.seed("users", ({"username": f"user{i}", "password_hash": password_hash}
+                        for i in range(users)))
+    fake.seed("avatars", ({"user_id": i + 1, "level": rnd.randint(1, 30), "exp": rnd.randint(0, 2000)}
+                          for i in range(users)))
+    fake.seed("posts", ({"author": f"user{i % users}", "title": f"제목 {i}", "content": "본문",
+                         "user_id": i % users + 1} for i in range(posts)))
+    fake.seed("minesweeper_records", ({"username": f"user{i % users}", "user_id": i % users + 1,
+                                       "level": rnd.randint(1, 6)} for i in range(records)))
+    fake.seed("sachunsung_records", ({"username": f"user{i % users}", "user_id": i % users + 1,
+                                      "stage": rnd.randint(1, 5),
+                                      "clear_time_sec": round(rnd.uniform(30, 600), 2)}
+                                     for i in range(records)))
+    fake.seed("timestop_records", ({"username": f"user{i % users}", "user_id": i % users + 1,
+                                    "stop_time": round(rnd.uniform(0, 30), 2)} for i in range(records)))
+
+
+def _index_page(client, rnd):
+    return [
+        ("GET /", lambda: client.get("/")),
+        ("GET /api/posts", lambda: client.get(f"/api/posts?page={rnd.randint(1, 5)}&limit=15")),
+        ("GET /api/ranking/authors", lambda: client.get("/api/ranking/authors?limit=5")),
+    ]
+
+
+def _minesweeper_game(client, rnd):
+    """새 판을 받아 안전한 칸을 모두 열고 (서버가 칸마다 판정) 기록 저장"""
+    level = rnd.randint(1, 6)
+    game = {}
+
+    def board():
+        res = client.get(f"/api/minesweeper/board?level={level}&row=0&col=0")
+        game["seed"] = res.get_json()["seed"]
+        return res
+
+    def play():
+        # 벤치마크는 서버와 같은 비밀 키로 보드를 알고 안전한 칸만 누른다
+        grid = app_module._minesweeper_games.grid(level, game["seed"], (0, 0))
+        opened = set()
+        for r, c in [(0, 0)] + [(r, c) for r, row in enumerate(grid) for c, v in enumerate(row) if v >= 0]:
+            if (r, c) in opened:
+                continue
+            res = client.post("/api/minesweeper/reveal", json={"seed": game["seed"], "row": r, "col": c})
+            opened.update((r, c) for r, c, _ in res.get_json()["opened"])
+        return res
+
+    return [
+        ("GET /api/minesweeper/board", board),
+        ("POST /api/minesweeper/reveal", play),   # 한 판을 끝까지 연 시간
+        ("POST /api/minesweeper/record", lambda: client.post("/api/minesweeper/record", json=game)),
+        ("GET /api/minesweeper/ranking", lambda: client.get("/api/minesweeper/ranking")),
+    ]
+
+
+def _game_finish(client, rnd):
+    game = rnd.choice(["minesweeper", "sachunsung", "timestop"])
+    if game == "minesweeper":
+        return _minesweeper_game(client, rnd)
+    body = {
+        "sachunsung": {"stage": rnd.randint(1, 5), "clear_time_sec": rnd.uniform(30, 600)},
+        "timestop": {"stop_time": rnd.uniform(0, 30)},
+    }[game]
+    return [
+        (f"POST /api/{game}/record", lambda: client.post(f"/api/{game}/record", json=body)),
+        (f"GET /api/{game}/ranking", lambda: client.get(f"/api/{game}/ranking")),
+    ]
+
+
+def _login(client, rnd, users):
+    username = f"user{rnd.randrange(users)}"
+    return [
+        ("POST /api/auth/login",
+         lambda: client.post("/api/auth/login", json={"username": username, "password": PASSWORD})),
+    ]
+
+
+SCENARIOS = {
+    "index": lambda client, rnd, users: _index_page(client, rnd),
+    "game": lambda client, rnd, users: _game_finish(client, rnd),
+    "login": _login,
+}
+
+
+def run(fake, scenario_names, requests_per_worker, concurrency, users):
+    samples = defaultdict(list)   # endpoint -> [(seconds, db_calls, status)]
+    lock = threading.Lock()
+
+    def worker(n):
+        fake.start_context()
+        rnd = random.Random(n)
+        client = app_module.app.test_client()
+        client.post("/api/auth/login", json={"username": f"user{n % users}", "password": PASSWORD})
+        local = defaultdict(list)
+        for _ in range(requests_per_worker):
+            scenario = SCENARIOS[rnd.choice(scenario_names)]
+            for name, call in scenario(client, rnd, users):
+                before = fake.context_calls
+                start = time.perf_counter()
+                res = call()
+                local[name].append((time.perf_counter() - start, fake.context_calls - before, res.status_code))
+        with lock:
+            for name, items in local.items():
+                samples[name].extend(items)
+
+    # 워밍업: 워커별 인덱스/공유 카운터 최초 적재는 측정에서 제외
+    warm = app_module.app.test_client()
+    warm.post("/api/auth/login", json={"username": "user0", "password": PASSWORD})
+    for name in scenario_names:
+        for _, call in SCENARIOS[name](warm, random.Random(-1), users):
+            call()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def report(samples, elapsed):
+    total = sum(len(v) for v in samples.values())
+    print(f"\n총 {total}건 / {elapsed:.2f}s = {total / elapsed:.1f} req/s\n")
+    print(f"{'endpoint':<32} {'n':>6} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8} {'db/req':>7} {'errors':>6}")
+    over_budget = []
+    for name in sorted(samples):
+        items = samples[name]
+        secs = [s for s, _, _ in items]
+        calls = statistics.mean(c for _, c, _ in items)
+        errors = sum(1 for _, _, status in items if status >= 500)
+        print(f"{name:<32} {len(items):>6} {_pct(secs, 50) * 1000:>8.2f} {_pct(secs, 99) * 1000:>8.2f} "
+              f"{len(items) / elapsed:>8.1f} {calls:>7.2f} {errors:>6}")
+        budget = DB_CALL_BUDGET.get(name)
+        if budget is not None and calls > budget:
+            over_budget.append((name, calls, budget))
+    return over_budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=["all", *SCENARIOS], default="all")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="DB 왕복당 지연")
+    parser.add_argument("--requests", type=int, default=50, help="워커당 시나리오 반복 수")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--check", action="store_true", help="DB 왕복 상한 초과 시 실패")
+    args = parser.parse_args()
+
+    fake = FakeSupabase(latency=args.latency_ms / 1000)
+    seed(fake, args.users, args.posts, args.records)
+    app_module.db = SupabaseStore(fake)
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    samples, elapsed = run(fake, names, args.requests, args.concurrency, args.users)
+    over_budget = report(samples, elapsed)
+    for name, calls, budget in over_budget:
+        print(f"DB 왕복 초과: {name} {calls:.2f} > {budget}")
+    if args.check and over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
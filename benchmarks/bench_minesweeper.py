@@ -0,0 +1,48 @@
+"""지뢰찾기 보드 생성/검증 벤치마크.
+
+레벨별로 시드 N개(기본 2,000)의 보드를
+
+- NumPy 로 한 번에 (minesweeper.boards)
+- 한 개씩 파이썬으로 (NumPy 가 없을 때의 경로)
+
+만드는 시간과 두 결과가 같은지, 이긴 판 하나를 replay 로 검증하는 시간을 잰다.
+
+    python benchmarks/bench_minesweeper.py [시드 수]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import minesweeper  # noqa: E402
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    if minesweeper.np is None:
+        sys.exit("numpy 가 설치되어 있지 않음 (pip install numpy)")
+    print(f"{'level':>5} {'numpy ms':>9} {'us/board':>9} {'python ms':>10} {'us/board':>9} {'replay us':>10}")
+    for level, (rows, cols, _) in minesweeper.LEVELS.items():
+        first = (rows // 2, cols // 2)
+        seeds = list(range(n))
+        t0 = time.perf_counter()
+        mines, counts = minesweeper.boards(level, seeds, first)
+        np_s = time.perf_counter() - t0
+        sample = seeds[:max(1, n // 10)]
+        t0 = time.perf_counter()
+        py = [minesweeper._board_py(level, seed, first) for seed in sample]
+        py_s = (time.perf_counter() - t0) / len(sample) * n
+        for k, (m, c) in enumerate(py):
+            assert mines[k].tolist() == m and counts[k].tolist() == c, (level, k)
+        grid = minesweeper.board(level, 0, first)
+        clicks = [first] + [(r, c) for r in range(rows) for c in range(cols) if grid[r][c] >= 0]
+        t0 = time.perf_counter()
+        assert minesweeper.replay(grid, clicks, 50)
+        replay_s = time.perf_counter() - t0
+        print(f"{level:>5} {np_s * 1000:>9.1f} {np_s / n * 1e6:>9.1f} {py_s * 1000:>10.1f} "
+              f"{py_s / n * 1e6:>9.1f} {replay_s * 1e6:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
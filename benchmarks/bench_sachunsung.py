@@ -0,0 +1,105 @@
+"""사천성 보드 엔진 벤치마크.
+
+단계별로
+
+- 보드 생성(generate) 시간과 solve 로 끝까지 풀리는지
+- 지울 수 있는 쌍 세기: 브라우저의 예전 방식(모든 칸 쌍 x 칸 단위 경로 검사)과
+  Board.movable (타입별 두 칸 x 비트마스크 경로 검사)의 시간과 결과 일치
+- 무작위로 채운 보드(예전 initBoard)를 solve 가 푸는 비율
+
+을 잰다.
+
+    python benchmarks/bench_sachunsung.py [반복 수]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sachunsung import STAGES, Board, generate, solve  # noqa: E402
+
+
+def naive_count(grid):
+    """static/js/sachunsung.js 의 예전 countConnectablePairs 를 그대로 옮긴 것"""
+    rows, cols = len(grid), len(grid[0])
+
+    def empty(r, c):
+        return grid[r][c] == 0
+
+    def row_clear(r, a, b, skip=None):
+        return all(c == skip or empty(r, c) for c in range(min(a, b) + 1, max(a, b)))
+
+    def col_clear(c, a, b, skip=None):
+        return all(r == skip or empty(r, c) for r in range(min(a, b) + 1, max(a, b)))
+
+    def connect(r1, c1, r2, c2):
+        if r1 == r2 and row_clear(r1, c1, c2) or c1 == c2 and col_clear(c1, r1, r2):
+            return True
+        if empty(r1, c2) and row_clear(r1, c1, c2) and col_clear(c2, r1, r2):
+            return True
+        if empty(r2, c1) and col_clear(c1, r1, r2) and row_clear(r2, c1, c2):
+            return True
+        for c in range(cols):
+            if c in (c1, c2) or not empty(r1, c) or not empty(r2, c):
+                continue
+            if row_clear(r1, c1, c) and col_clear(c, r1, r2) and \
+                    row_clear(r2, c, c2, c1 if r1 == r2 else None):
+                return True
+        for r in range(rows):
+            if r in (r1, r2) or not empty(r, c1) or not empty(r, c2):
+                continue
+            if col_clear(c1, r1, r) and row_clear(r, c1, c2) and \
+                    col_clear(c2, r, r2, r1 if c1 == c2 else None):
+                return True
+        return False
+
+    cells = [(r, c) for r in range(rows) for c in range(cols) if grid[r][c]]
+    return sum(
+        1 for i, (r1, c1) in enumerate(cells) for r2, c2 in cells[i + 1:]
+        if grid[r1][c1] == grid[r2][c2] and connect(r1, c1, r2, c2)
+    )
+
+
+def half_cleared(grid, seed):
+    """solve 순서대로 절반쯤 지운 보드 (게임 중간 상황)"""
+    order = solve(grid, seed)
+    g = [row[:] for row in grid]
+    for (r1, c1), (r2, c2) in order[:len(order) // 2]:
+        g[r1][c1] = g[r2][c2] = 0
+    return g
+
+
+def best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, result
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'stage':>5} {'gen ms':>7} {'solve ms':>9} {'naive count ms':>15} {'movable ms':>11} "
+          f"{'random solvable':>16}")
+    for stage, (rows, cols) in STAGES.items():
+        gen_ms, grid = best_ms(lambda: generate(stage, seed=stage), repeat)
+        solve_ms, order = best_ms(lambda: solve(grid), 1)
+        assert order is not None and len(order) == rows * cols // 2, stage
+        mid = half_cleared(grid, stage)
+        naive_ms, expected = best_ms(lambda: naive_count(mid), 1)
+        fast_ms, movable = best_ms(lambda: Board(mid).movable(), repeat)
+        assert len(movable) == expected, (stage, len(movable), expected)
+        solved = 0
+        for i in range(repeat):
+            types = list(range(1, rows * cols // 2 + 1)) * 2
+            random.Random(i).shuffle(types)
+            solved += solve([types[r * cols:(r + 1) * cols] for r in range(rows)], attempts=3) is not None
+        print(f"{stage:>5} {gen_ms:>7.1f} {solve_ms:>9.1f} {naive_ms:>15.1f} {fast_ms:>11.2f} "
+              f"{f'{solved}/{repeat}':>16}")
+
+
+if __name__ == "__main__":
+    main()
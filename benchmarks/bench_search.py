@@ -0,0 +1,82 @@
+"""게시글 검색 벤치마크 (SQLite).
+
+임시 SQLite 에 글 N개(기본 20,000, Zipf 분포의 한글 단어)를 넣고 색인한 뒤, 2-gram 색인 검색
+(SQLiteStore.search_posts)과 색인 없이 제목/본문을 LIKE 로 훑는 방식의 지연을
+비교한다. 색인 결과가 LIKE 결과를 모두 포함하는지도 확인한다.
+
+    python benchmarks/bench_search.py [글 수]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import search  # noqa: E402
+from storage import SQLiteStore  # noqa: E402
+
+REPEAT = 20
+VOCAB = 5000
+
+
+def vocabulary(rnd):
+    """한글 2~3음절 단어 VOCAB 개 (앞쪽일수록 자주 쓰이는 Zipf 분포로 뽑는다)."""
+    words = set()
+    while len(words) < VOCAB:
+        words.add("".join(chr(0xAC00 + rnd.randrange(11172)) for _ in range(rnd.choice((2, 3)))))
+    return sorted(words)
+
+
+def seed(store, n):
+    rnd = random.Random(n)
+    words = vocabulary(rnd)
+    weights = [1 / (i + 1) for i in range(len(words))]
+    conn = store._conn()
+    with conn:
+        conn.executemany(
+            "INSERT INTO posts (author, title, content) VALUES (?, ?, ?)",
+            [("bench", " ".join(rnd.choices(words, weights, k=4)),
+              " ".join(rnd.choices(words, weights, k=80))) for _ in range(n)],
+        )
+    search.reindex(store, chunk=2000)
+    # 흔한 단어 / 중간 / 드문 단어, 두 단어 조합
+    return [words[0], words[20], words[500], words[3000], f"{words[5]} {words[200]}"]
+
+
+def like_scan(store, query):
+    words = query.split()
+    where = " AND ".join("(title LIKE ? OR content LIKE ?)" for _ in words)
+    params = [p for w in words for p in (f"%{w}%", f"%{w}%")]
+    return {r[0] for r in store._conn().execute(f"SELECT id FROM posts WHERE {where}", params)}
+
+
+def timed(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(os.path.join(tmp, "search.db"))
+        t0 = time.perf_counter()
+        queries = seed(store, n)
+        print(f"{n} posts seeded + indexed in {time.perf_counter() - t0:.1f}s")
+        print(f"{'query':>16} {'hits':>6} {'index ms':>9} {'LIKE ms':>8}")
+        for q in queries:
+            terms = search.query_terms(q)
+            idx_ms, (rows, total) = timed(lambda: store.search_posts(terms, 15, 0))
+            like_ms, ids = timed(lambda: like_scan(store, q))
+            assert {r["id"] for r in rows} <= ids or not ids, q
+            assert total >= len(ids), (q, total, len(ids))
+            print(f"{q:>16} {total:>6} {idx_ms:>9.2f} {like_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
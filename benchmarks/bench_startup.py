@@ -0,0 +1,111 @@
+"""기동 시간 벤치마크 (import -> 첫 요청 응답).
+
+새 파이썬 프로세스에서 app 을 import 하고 첫 요청을 보내기까지의 시간을 잰다.
+
+- ADMIN_PASSWORD 만 설정 / ADMIN_PASSWORD_HASH 로 미리 계산한 해시 설정
+- preload: 부모가 app 을 한 번 import 한 뒤 fork 한 자식들이 각자 첫 요청을
+  처리하는 시간 (gunicorn --preload 와 같은 구조). 자식의 DB 연결이 부모와
+  다른지(fork 이후 새로 만들었는지)도 확인한다.
+
+저장소는 임시 폴더의 SQLite 를 쓴다.
+
+    python benchmarks/bench_startup.py [반복 수]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app as app_module
+t_import = time.perf_counter()
+client = app_module.app.test_client()
+assert client.get("/api/health").status_code == 200
+t_first = time.perf_counter()
+res = client.post("/api/auth/login", json={"username": "admin", "password": "admin123"})
+assert res.status_code == 200, res.get_json()
+t_admin = time.perf_counter()
+print(json.dumps({"import": t_import - t0, "first": t_first - t_import, "admin": t_admin - t_first}))
+"""
+
+_PRELOAD = r"""
+import json, os, sys, time
+sys.path.insert(0, sys.argv[1])
+import app as app_module
+app_module.db.ping()
+parent_conn = id(app_module.db._conn())
+results = []
+for _ in range(int(sys.argv[2])):
+    r, w = os.pipe()
+    t0 = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        app_module.init_worker()
+        ok = app_module.app.test_client().get("/api/health").status_code == 200
+        fresh = id(app_module.db._conn()) != parent_conn
+        os.write(w, json.dumps({"first": time.perf_counter() - t0, "ok": ok, "fresh": fresh}).encode())
+        os._exit(0)
+    os.close(w)
+    with os.fdopen(r) as f:
+        results.append(json.loads(f.read()))
+    os.waitpid(pid, 0)
+print(json.dumps(results))
+"""
+
+
+def _env(tmp, **extra):
+    env = dict(os.environ)
+    env.pop("ADMIN_PASSWORD_HASH", None)
+    env.update(
+        STORAGE_BACKEND="sqlite",
+        SQLITE_PATH=os.path.join(tmp, "startup.db"),
+        AVATAR_CACHE_PATH=os.path.join(tmp, "avatar-cache.db"),
+        COUNTER_CACHE_PATH=os.path.join(tmp, "counters.db"),
+        RESPONSE_CACHE_PATH=os.path.join(tmp, "response-versions.db"),
+        METRICS_PATH=os.path.join(tmp, "metrics.db"),
+        ADMIN_PASSWORD="admin123",
+        **extra,
+    )
+    return env
+
+
+def _run(script, env, *args):
+    out = subprocess.run([sys.executable, "-c", script, _root, *args], env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        admin_hash = subprocess.run(
+            [sys.executable, os.path.join(_root, "passwords.py"), "admin123"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        modes = [
+            ("ADMIN_PASSWORD", _env(tmp)),
+            ("ADMIN_PASSWORD_HASH", _env(tmp, ADMIN_PASSWORD_HASH=admin_hash)),
+        ]
+        print(f"{'mode':>20} {'import ms':>10} {'1st req ms':>11} {'admin login ms':>15}")
+        for name, env in modes:
+            runs = [_run(_CHILD, env) for _ in range(repeat)]
+            best = {k: min(r[k] for r in runs) * 1000 for k in runs[0]}
+            print(f"{name:>20} {best['import']:>10.1f} {best['first']:>11.1f} {best['admin']:>15.1f}")
+
+        if hasattr(os, "fork"):
+            results = _run(_PRELOAD, _env(tmp), str(repeat))
+            assert all(r["ok"] and r["fresh"] for r in results), results
+            best = min(r["first"] for r in results) * 1000
+            print(f"{'preload + fork':>20} {'-':>10} {best:>11.1f} {'-':>15}"
+                  "  (fork -> 첫 응답, 워커별 DB 연결 확인)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""created_at 표시 변환 벤치마크.
+
+기존 방식(행마다 ZoneInfo("Asia/Seoul") 생성 + astimezone + strftime)과
+timefmt 의 fmt_dt(고정 오프셋 + 메모이즈), fmt_dt_many(목록 일괄 변환)를
+회원 목록 크기(기본 10,000행)에서 비교한다. 결과가 같은지도 확인한다.
+
+    python benchmarks/bench_timefmt.py [행 수]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import timefmt  # noqa: E402
+
+REPEAT = 5
+
+
+def legacy_fmt_dt(dt_str):
+    if not dt_str:
+        return ""
+    try:
+        dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        kst = dt.astimezone(ZoneInfo("Asia/Seoul"))
+        return kst.strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return str(dt_str)
+
+
+def build(n, distinct):
+    """distinct 개의 서로 다른 created_at 을 n 행에 흩뿌린다."""
+    rnd = random.Random(n)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    values = [(base + timedelta(seconds=rnd.randrange(86400 * 365),
+                                microseconds=rnd.randrange(1_000_000))).isoformat()
+              for _ in range(distinct)]
+    return [rnd.choice(values) for _ in range(n)]
+
+
+def timed(fn, values, cold=False):
+    best = None
+    for _ in range(REPEAT):
+        if cold:
+            timefmt.fmt_dt.cache_clear()
+        start = time.perf_counter()
+        result = fn(values)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    cases = [
+        ("legacy per-row", lambda vs: [legacy_fmt_dt(v) for v in vs], False),
+        ("fmt_dt (cold)", lambda vs: [timefmt.fmt_dt(v) for v in vs], True),
+        ("fmt_dt (warm)", lambda vs: [timefmt.fmt_dt(v) for v in vs], False),
+        ("fmt_dt_many (cold)", timefmt.fmt_dt_many, True),
+        ("fmt_dt_many (warm)", timefmt.fmt_dt_many, False),
+    ]
+    print(f"{'rows':>8} {'distinct':>9} {'method':>20} {'ms':>9} {'us/row':>8}")
+    for distinct in (n, n // 10):
+        values = build(n, distinct)
+        expected = None
+        for name, fn, cold in cases:
+            ms, result = timed(fn, values, cold)
+            if expected is None:
+                expected = result
+            assert result == expected, name
+            print(f"{n:>8} {distinct:>9} {name:>20} {ms:>9.2f} {ms * 1000 / n:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""타임스탑 랭킹 조회 벤치마크.
+
+기존 방식(전체 행 조회 + Python 정렬)과 stop_time 인덱스 양방향 조회
+(storage 의 timestop_top 과 같은 쿼리)를 SQLite 인메모리 DB에서 비교한다.
+
+    python benchmarks/bench_timestop_ranking.py [최대 행 수]
+"""
+import heapq
+import itertools
+import random
+import sqlite3
+import sys
+import time
+
+TARGET = 10.0
+TOP = 5
+REPEAT = 20
+
+
+def build(n):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE timestop_records ("
+        "id INTEGER PRIMARY KEY, username TEXT, stop_time REAL, created_at TEXT)"
+    )
+    conn.execute("CREATE INDEX idx_timestop_records_stop_time ON timestop_records (stop_time)")
+    rnd = random.Random(n)
+    conn.executemany(
+        "INSERT INTO timestop_records (username, stop_time, created_at) VALUES (?, ?, ?)",
+        ((f"user{i % 5000}", round(rnd.uniform(0, 30), 2), "2026-01-01T00:00:00+00:00")
+         for i in range(n)),
+    )
+    conn.commit()
+    return conn
+
+
+def full_scan(conn):
+    rows = conn.execute("SELECT username, stop_time, created_at FROM timestop_records").fetchall()
+    rows.sort(key=lambda r: abs(r[1] - TARGET))
+    return rows[:TOP]
+
+
+def two_sided(conn):
+    above = conn.execute(
+        "SELECT username, stop_time, created_at FROM timestop_records "
+        "WHERE stop_time >= ? ORDER BY stop_time ASC LIMIT ?", (TARGET, TOP)
+    ).fetchall()
+    below = conn.execute(
+        "SELECT username, stop_time, created_at FROM timestop_records "
+        "WHERE stop_time < ? ORDER BY stop_time DESC LIMIT ?", (TARGET, TOP)
+    ).fetchall()
+    merged = heapq.merge(above, below, key=lambda r: abs(r[1] - TARGET))
+    return list(itertools.islice(merged, TOP))
+
+
+def _distances(rows):
+    return [round(abs(r[1] - TARGET), 2) for r in rows]
+
+
+def timed(fn, conn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(conn)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [n for n in (1_000, 10_000, 100_000, 1_000_000) if n <= max_rows]
+    print(f"{'rows':>10} {'full scan (ms)':>16} {'two-sided (ms)':>16}")
+    for n in sizes:
+        conn = build(n)
+        scan_ms, scan_top = timed(full_scan, conn, max(1, REPEAT * 1_000 // n))
+        idx_ms, idx_top = timed(two_sided, conn, REPEAT)
+        assert _distances(scan_top) == _distances(idx_top), (scan_top, idx_top)
+        print(f"{n:>10} {scan_ms:>16.3f} {idx_ms:>16.3f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""supabase-py 클라이언트의 인프로세스 대역.
+
+table().select().eq()...execute() 체인과 rpc() 중 앱이 쓰는 부분만 구현한다.
+execute() 한 번을 DB 왕복 1회로 보고, latency 초만큼 대기하며 컨텍스트별로
+호출 수를 센다 (storage.gather 의 풀 스레드 호출도 요청 쪽에 합산된다).
+"""
+import contextvars
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import RECORD_TABLES, apply_exp  # noqa: E402
+
+_DEFAULTS = {
+    "users": {"is_blacklisted": False},
+    "avatars": {"level": 1, "exp": 0, "stat_points": 0, "str": 5, "con": 5, "dex": 5},
+    "posts": {"password_hash": "", "content": "", "user_id": None},
+}
+
+
+# "avatars(*)" 같은 임베드 리소스 (users.id = <table>.user_id 로 조인)
+_EMBED = re.compile(r"(\w+)\(([^)]*)\)")
+
+
+_calls = contextvars.ContextVar("fake_supabase_calls", default=None)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _sort_key(value):
+    return (value is not None, value)
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._count = None
+        self._payload = None
+        self._filters = []
+        self._orders = []
+        self._limit = None
+        self._offset = 0
+
+    def select(self, columns="*", count=None):
+        self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, payload):
+        self._op = "insert"
+        self._payload = payload
+        return self
+
+    def upsert(self, payload, on_conflict="id", ignore_duplicates=False):
+        self._op = "upsert"
+        self._payload = payload
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, fields):
+        self._op = "update"
+        self._payload = fields
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    def _filter(self, pred):
+        self._filters.append(pred)
+        return self
+
+    def eq(self, col, value):
+        return self._filter(lambda r: r.get(col) == value)
+
+    def neq(self, col, value):
+        return self._filter(lambda r: r.get(col) != value)
+
+    def gt(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r[col] > value)
+
+    def gte(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r[col] >= value)
+
+    def lt(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r[col] < value)
+
+    def lte(self, col, value):
+        return self._filter(lambda r: r.get(col) is not None and r[col] <= value)
+
+    def in_(self, col, values):
+        values = set(values)
+        return self._filter(lambda r: r.get(col) in values)
+
+    def order(self, col, desc=False):
+        self._orders.append((col, desc))
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def range(self, start, end):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def _matches(self, row):
+        return all(pred(row) for pred in self._filters)
+
+    def _project(self, row):
+        embeds = _EMBED.findall(self._columns)
+        columns = [c.strip() for c in _EMBED.sub("", self._columns).split(",") if c.strip()]
+        out = dict(row) if columns == ["*"] else {c: row.get(c) for c in columns}
+        for table, _ in embeds:
+            related = [dict(r) for r in self._client.tables[table] if r.get("user_id") == row["id"]]
+            out[table] = related[0] if related else None
+        return out
+
+    def execute(self):
+        return self._client._execute(self)
+
+
+class FakeRpc:
+    def __init__(self, client, name, params):
+        self._client = client
+        self._name = name
+        self._params = params
+
+    def execute(self):
+        return self._client._execute_rpc(self._name, self._params)
+
+
+class FakeSupabase:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.tables = defaultdict(list)
+        self._next_id = defaultdict(int)
+        self._lock = threading.Lock()
+        self.total_calls = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        return FakeRpc(self, name, params)
+
+    # 호출 수
+    def start_context(self):
+        """현재 컨텍스트(스레드)에 호출 카운터를 새로 둔다."""
+        _calls.set([0])
+
+    @property
+    def context_calls(self):
+        box = _calls.get()
+        return box[0] if box else 0
+
+    def _count_call(self):
+        box = _calls.get()
+        if box is None:
+            box = [0]
+            _calls.set(box)
+        with self._lock:
+            box[0] += 1
+            self.total_calls += 1
+
+    # 데이터 적재 (호출 수/지연 없음)
+    def seed(self, table, rows):
+        with self._lock:
+            for row in rows:
+                self._insert_row(table, row)
+
+    def _insert_row(self, table, payload):
+        self._next_id[table] += 1
+        row = {**_DEFAULTS.get(table, {}), "id": self._next_id[table], "created_at": _now(), **payload}
+        self.tables[table].append(row)
+        return row
+
+    def _execute(self, q):
+        self._count_call()
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            rows = self.tables[q._table]
+            if q._op == "insert":
+                payloads = q._payload if isinstance(q._payload, list) else [q._payload]
+                return FakeResponse([dict(self._insert_row(q._table, p)) for p in payloads])
+            if q._op == "upsert":
+                key = q._on_conflict
+                existing = next((r for r in rows if r.get(key) == q._payload.get(key)), None)
+                if existing is None:
+                    return FakeResponse([dict(self._insert_row(q._table, q._payload))])
+                if not q._ignore_duplicates:
+                    existing.update(q._payload)
+                return FakeResponse([] if q._ignore_duplicates else [dict(existing)])
+            matched = [r for r in rows if q._matches(r)]
+            if q._op == "update":
+                fields = {k: (_now() if v == "now()" else v) for k, v in q._payload.items()}
+                for r in matched:
+                    r.update(fields)
+                return FakeResponse([dict(r) for r in matched])
+            if q._op == "delete":
+                self.tables[q._table] = [r for r in rows if not q._matches(r)]
+                return FakeResponse([dict(r) for r in matched])
+            for col, desc in reversed(q._orders):
+                matched.sort(key=lambda r: _sort_key(r.get(col)), reverse=desc)
+            count = len(matched) if q._count else None
+            end = None if q._limit is None else q._offset + q._limit
+            return FakeResponse([q._project(r) for r in matched[q._offset:end]], count)
+
+    def _execute_rpc(self, name, params):
+        self._count_call()
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            return FakeResponse(getattr(self, f"_rpc_{name}")(**params))
+
+    # supabase_migrations.sql 의 함수 대역 (self._lock 안에서 호출)
+    def _rpc_award_exp(self, p_user_id, p_exp, p_record_table=None, p_record=None):
+        if p_record_table:
+            assert p_record_table in RECORD_TABLES.values(), p_record_table
+            self._insert_row(p_record_table, p_record)
+        av = next((r for r in self.tables["avatars"] if r["user_id"] == p_user_id), None)
+        if av is None:
+            av = self._insert_row("avatars", {"user_id": p_user_id})
+        level, exp, stat_points, leveled_up = apply_exp(av["level"], av["exp"], av["stat_points"], p_exp)
+        av.update(level=level, exp=exp, stat_points=stat_points, updated_at=_now())
+        return [{**av, "leveled_up": leveled_up}]
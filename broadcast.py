@@ -0,0 +1,135 @@
+"""게임 랭킹 변경 푸시 (Server-Sent Events).
+
+워커마다 브로드캐스터 하나가 구독자들을 관리한다. 감시 스레드는 게임별 기록
+테이블의 공유 버전(ResponseCache)을 poll_interval 마다 확인하고, 버전이 바뀌었거나
+이 워커에서 기록이 저장된(notify) 게임만 랭킹을 한 번 다시 계산해서 상위 목록이
+실제로 달라졌을 때만 구독자 전원에게 보낸다. 구독자가 N 명이어도 계산은 한 번이다.
+"""
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class Subscriber:
+    def __init__(self, games):
+        self.games = games
+        self._cond = threading.Condition()
+        self._pending = {}   # game -> 아직 보내지 않은 최신 스냅샷
+
+    def push(self, game, snapshot):
+        with self._cond:
+            self._pending[game] = snapshot
+            self._cond.notify()
+
+    def events(self, keepalive=15.0, max_age=300.0):
+        """(game, snapshot) 을 차례로 내보낸다. keepalive 초 동안 변화가 없으면 None.
+        max_age 초가 지나면 끝낸다 (클라이언트는 재접속)."""
+        deadline = time.monotonic() + max_age
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            with self._cond:
+                if not self._pending:
+                    self._cond.wait(min(keepalive, remaining))
+                items, self._pending = self._pending, {}
+            if not items:
+                yield None
+            for game, snapshot in items.items():
+                yield game, snapshot
+
+
+class RankingBroadcaster:
+    def __init__(self, compute, versions, games, poll_interval=1.0, max_subscribers=16):
+        """compute(game): 랭킹 스냅샷 (list), versions(games): 게임별 버전 목록."""
+        self._compute = compute
+        self._versions = versions
+        self.games = list(games)
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self._cond = threading.Condition()
+        self._subscribers = set()
+        self._snapshots = {}
+        self._seen = {}
+        self._dirty = set()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # fork 이후 워커마다 자기 감시 스레드를 띄운다
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="ranking-broadcaster", daemon=True)
+            self._thread.start()
+
+    def subscribe(self, games):
+        """구독 등록 후 현재 스냅샷을 바로 넣어 둔다. 구독자가 가득 차면 None."""
+        with self._cond:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._ensure_thread()
+            if not self._subscribers:
+                # 구독자가 없는 동안은 감시하지 않았으므로 예전 스냅샷은 버린다
+                self._snapshots.clear()
+            sub = Subscriber(games)
+            self._subscribers.add(sub)
+            self._cond.notify()
+        try:
+            for game in games:
+                sub.push(game, self.snapshot(game))
+        except Exception:
+            self.unsubscribe(sub)
+            raise
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._cond:
+            self._subscribers.discard(sub)
+
+    def notify(self, game):
+        """이 워커에서 기록이 저장됨: 다음 폴링을 기다리지 않고 다시 계산."""
+        with self._cond:
+            if not self._subscribers:
+                return
+            self._dirty.add(game)
+            self._cond.notify()
+
+    def snapshot(self, game):
+        with self._cond:
+            snap = self._snapshots.get(game)
+        if snap is None:
+            snap = self._refresh(game)
+        return snap
+
+    def _refresh(self, game):
+        """다시 계산해서 바뀌었으면 구독자에게 보낸다. 반환: 최신 스냅샷."""
+        snap = self._compute(game)
+        with self._cond:
+            changed = snap != self._snapshots.get(game)
+            self._snapshots[game] = snap
+            targets = [s for s in self._subscribers if game in s.games] if changed else []
+        for sub in targets:
+            sub.push(game, snap)
+        return snap
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._subscribers:
+                    self._cond.wait()
+                if not self._dirty:
+                    self._cond.wait(self.poll_interval)
+                dirty, self._dirty = self._dirty, set()
+            try:
+                for game, version in zip(self.games, self._versions(self.games)):
+                    if self._seen.get(game) != version:
+                        self._seen[game] = version
+                        dirty.add(game)
+                for game in dirty:
+                    self._refresh(game)
+            except Exception:
+                log.exception("ranking refresh failed")
+                time.sleep(self.poll_interval)
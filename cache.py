@@ -0,0 +1,407 @@
+"""워커 간 공유 캐시.
+
+gunicorn 워커들이 같은 로컬 SQLite 파일(WAL)을 캐시 저장소로 공유한다.
+외부 서비스 없이 한 워커의 쓰기가 다른 워커의 읽기에 바로 보인다.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def _namespace():
+    """배포 구분자: CACHE_NAMESPACE, 없으면 앱 위치와 DB 주소의 해시.
+
+    같은 머신에서 도는 다른 배포(다른 DB)가 같은 캐시 파일을 나눠 쓰지 않게 한다.
+    """
+    namespace = os.environ.get("CACHE_NAMESPACE")
+    if namespace:
+        return namespace
+    key = "|".join([
+        os.path.dirname(os.path.abspath(__file__)),
+        os.environ.get("STORAGE_BACKEND", "supabase").lower(),
+        os.environ.get("SUPABASE_URL", ""),
+        os.path.abspath(os.environ["SQLITE_PATH"]) if os.environ.get("SQLITE_PATH") else "",
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+def default_path(name):
+    return os.path.join(tempfile.gettempdir(), f"testsvr-{_namespace()}-{name}.db")
+
+
+class SharedStore:
+    """프로세스/스레드별 연결을 여는 SQLite 파일 래퍼 (fork 후에도 안전)."""
+
+    def __init__(self, path, schema):
+        self.path = path
+        self._schema = schema
+        self._local = threading.local()
+        self._conn()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(self._schema)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def execute(self, sql, params=()):
+        return self._conn().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self._conn().executemany(sql, seq)
+
+
+_AVATAR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS avatar_cache (
+    user_id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_avatar_cache_used_at ON avatar_cache (used_at);
+CREATE TABLE IF NOT EXISTS username_cache (
+    username TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class AvatarCache:
+    """user_id -> 아바타 dict LRU+TTL 캐시와 username -> user_id 매핑.
+
+    maxsize 가 0 이면 비활성화(항상 miss, 쓰기 무시).
+    """
+
+    def __init__(self, path, maxsize=10000, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._store = SharedStore(path, _AVATAR_SCHEMA) if maxsize > 0 else None
+        # 읽기 경로에서는 쓰지 않는다: 적중 시각과 적중/미스 수는 메모리에 모았다가
+        # put()/stats() 때 한 트랜잭션으로 반영한다
+        self._lock = threading.Lock()
+        self._used = {}
+        self._counts = {"hits": 0, "misses": 0}
+        # 잠겨서 지우지 못한 항목: 이 워커에서는 miss 로 보고 다음 쓰기 때 다시 지운다
+        self._stale = set()
+
+    @property
+    def enabled(self):
+        return self._store is not None
+
+    def _note(self, name, user_id=None, now=None):
+        with self._lock:
+            self._counts[name] += 1
+            if user_id is not None:
+                self._used[user_id] = now
+
+    def _flush_usage(self):
+        with self._lock:
+            used, self._used = self._used, {}
+            counts, self._counts = self._counts, {"hits": 0, "misses": 0}
+            stale, self._stale = self._stale, set()
+        if not used and not any(counts.values()) and not stale:
+            return
+        try:
+            self._store.execute("BEGIN IMMEDIATE")
+            try:
+                self._store.executemany(
+                    "DELETE FROM avatar_cache WHERE user_id = ?", [(user_id,) for user_id in stale]
+                )
+                self._store.executemany(
+                    "UPDATE avatar_cache SET used_at = MAX(used_at, ?) WHERE user_id = ?",
+                    [(at, user_id) for user_id, at in used.items()],
+                )
+                self._store.executemany(
+                    "INSERT INTO cache_stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                    [(name, n) for name, n in counts.items() if n],
+                )
+                self._store.execute("COMMIT")
+            except BaseException:
+                self._store.execute("ROLLBACK")
+                raise
+        except sqlite3.OperationalError:
+            # 잠겨 있으면 다음 번에 함께 반영
+            with self._lock:
+                self._stale |= stale
+                for user_id, at in used.items():
+                    self._used[user_id] = max(at, self._used.get(user_id, at))
+                for name, n in counts.items():
+                    self._counts[name] += n
+
+    def get(self, user_id):
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            row = None if user_id in self._stale else self._store.execute(
+                "SELECT data FROM avatar_cache WHERE user_id = ? AND expires_at > ?", (user_id, now)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            row = None  # 잠긴 캐시는 miss 로 보고 DB에서 읽는다
+        if row is None:
+            self._note("misses")
+            return None
+        self._note("hits", user_id, now)
+        return json.loads(row[0])
+
+    def put(self, user_id, avatar):
+        if not self.enabled:
+            return
+        now = time.time()
+        data = {k: v for k, v in avatar.items() if k != "leveled_up"}
+        self._flush_usage()
+        try:
+            self._store.execute(
+                "INSERT OR REPLACE INTO avatar_cache (user_id, data, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (user_id, json.dumps(data, default=str), now + self.ttl, now),
+            )
+            self._evict()
+        except sqlite3.OperationalError:
+            # 새 값을 못 넣었으면 옛 값도 남기지 않는다 (다음 조회는 DB에서 적재)
+            self.invalidate(user_id)
+            return
+        with self._lock:
+            self._stale.discard(user_id)
+
+    def update(self, user_id, fields):
+        """캐시에 있는 항목만 필드 갱신 (없으면 다음 조회 때 DB에서 적재)."""
+        if not self.enabled:
+            return
+        try:
+            row = self._store.execute(
+                "SELECT data FROM avatar_cache WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row is None:
+                return
+            data = {**json.loads(row[0]), **fields}
+            self._store.execute(
+                "UPDATE avatar_cache SET data = ?, expires_at = ? WHERE user_id = ?",
+                (json.dumps(data, default=str), time.time() + self.ttl, user_id),
+            )
+        except sqlite3.OperationalError:
+            # 갱신하지 못했으면 옛 값을 남기지 않고 지운다
+            self.invalidate(user_id)
+
+    def invalidate(self, user_id):
+        """항목 삭제. 잠겨서 못 지우면 이 워커에서는 miss 로 보고 다음 쓰기 때 다시 지운다
+        (다른 워커에는 늦어도 ttl 뒤에 만료된다)."""
+        if not self.enabled:
+            return
+        try:
+            self._store.execute("DELETE FROM avatar_cache WHERE user_id = ?", (user_id,))
+        except sqlite3.OperationalError:
+            with self._lock:
+                self._stale.add(user_id)
+
+    def _evict(self):
+        size = self._store.execute("SELECT COUNT(*) FROM avatar_cache").fetchone()[0]
+        if size > self.maxsize:
+            self._store.execute(
+                "DELETE FROM avatar_cache WHERE user_id IN "
+                "(SELECT user_id FROM avatar_cache ORDER BY used_at LIMIT ?)",
+                (size - self.maxsize,),
+            )
+
+    def get_user_id(self, username):
+        if not self.enabled:
+            return None
+        try:
+            row = self._store.execute(
+                "SELECT user_id FROM username_cache WHERE username = ? AND expires_at > ?",
+                (username, time.time()),
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def put_user_id(self, username, user_id):
+        if not self.enabled:
+            return
+        try:
+            self._store.execute(
+                "INSERT OR REPLACE INTO username_cache (username, user_id, expires_at) VALUES (?, ?, ?)",
+                (username, user_id, time.time() + self.ttl),
+            )
+            size = self._store.execute("SELECT COUNT(*) FROM username_cache").fetchone()[0]
+            if size > self.maxsize:
+                self._store.execute(
+                    "DELETE FROM username_cache WHERE username IN "
+                    "(SELECT username FROM username_cache ORDER BY expires_at LIMIT ?)",
+                    (size - self.maxsize,),
+                )
+        except sqlite3.OperationalError:
+            pass
+
+    def stats(self):
+        if not self.enabled:
+            return {"enabled": False}
+        self._flush_usage()
+        counts = dict(self._store.execute("SELECT name, value FROM cache_stats").fetchall())
+        hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+        return {
+            "enabled": True,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "size": self._store.execute("SELECT COUNT(*) FROM avatar_cache").fetchone()[0],
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+_COUNTER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    refreshed_at REAL NOT NULL
+);
+"""
+
+
+class SharedCounter:
+    """워커 공유 근사 카운터.
+
+    쓰기 경로에서 add() 로 증감하고, ttl 이 지나면 loader() 로 정확한 값을
+    백그라운드 스레드에서 다시 읽는다 (그동안은 기존 값을 돌려준다).
+    """
+
+    def __init__(self, path, ttl=300.0):
+        self.ttl = ttl
+        self._store = SharedStore(path, _COUNTER_SCHEMA)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _set(self, name, value):
+        self._store.execute(
+            "INSERT OR REPLACE INTO counters (name, value, refreshed_at) VALUES (?, ?, ?)",
+            (name, value, time.time()),
+        )
+
+    def get(self, name, loader):
+        row = self._store.execute(
+            "SELECT value, refreshed_at FROM counters WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            value = loader()
+            self._set(name, value)
+            return value
+        value, refreshed_at = row
+        if time.time() - refreshed_at > self.ttl:
+            self._refresh_async(name, loader)
+        return value
+
+    def _refresh_async(self, name, loader):
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def run():
+            try:
+                self._set(name, loader())
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def add(self, name, delta):
+        self._store.execute(
+            "UPDATE counters SET value = MAX(0, value + ?) WHERE name = ?", (delta, name)
+        )
+
+
+_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+
+class ResponseCache:
+    """GET 응답 캐시.
+
+    응답이 의존하는 테이블마다 워커 공유 버전 번호를 두고, 쓰기 경로에서
+    bump() 로 올린다. ETag 는 (경로, 쿼리, 사용자, 테이블 버전, 시간 구간) 에서 계산하므로
+    If-None-Match 비교와 캐시 조회 모두 DB 를 거치지 않는다. 본문은 워커별
+    LRU(maxsize 개)에 ETag 로 보관한다.
+
+    버전은 이 호스트의 쓰기만 올리므로, 다른 인스턴스나 DB 를 직접 고친 변경은 ttl 초마다
+    바뀌는 시간 구간으로 늦어도 ttl 초 뒤에 반영된다 (본문도 ttl 초가 지나면 버린다).
+    ttl 이 0 이면 시간 구간 없이 버전만 쓴다.
+    """
+
+    def __init__(self, path, maxsize=512, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._versions = SharedStore(path, _VERSION_SCHEMA)
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bump(self, *tables):
+        """버전을 올린다. 반환: {테이블: 올린 뒤 버전}"""
+        bumped = {}
+        for name in tables:
+            bumped[name] = self._versions.execute(
+                "INSERT INTO table_versions (name, version) VALUES (?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET version = version + 1 RETURNING version",
+                (name,),
+            ).fetchone()[0]
+        return bumped
+
+    def versions(self, tables):
+        rows = self._versions.execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({','.join('?' * len(tables))})",
+            tuple(tables),
+        ).fetchall()
+        found = dict(rows)
+        return [found.get(name, 0) for name in tables]
+
+    def etag(self, path, args, tables, user=None):
+        bucket = int(time.time() // self.ttl) if self.ttl > 0 else 0
+        key = json.dumps([path, sorted(args.items(multi=True)), user, self.versions(tables), bucket])
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def entry(self, etag):
+        """(본문, 만든 시각) 또는 None"""
+        with self._lock:
+            entry = self._bodies.get(etag)
+            if entry is None:
+                return None
+            if self.ttl > 0 and time.time() - entry[1] >= self.ttl:
+                del self._bodies[etag]
+                return None
+            self._bodies.move_to_end(etag)
+            return entry
+
+    def get(self, etag):
+        entry = self.entry(etag)
+        return entry[0] if entry else None
+
+    def put(self, etag, body):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._bodies[etag] = (body, time.time())
+            self._bodies.move_to_end(etag)
+            while len(self._bodies) > self.maxsize:
+                self._bodies.popitem(last=False)
@@ -0,0 +1,26 @@
+"""gunicorn 설정 (프로젝트 폴더에서 `gunicorn app:app` 실행 시 자동 적용).
+
+기본은 gthread 워커: 워커 하나가 GUNICORN_THREADS 개 요청을 동시에 붙잡고
+DB 응답을 기다릴 수 있다. gevent 가 설치돼 있으면 GUNICORN_WORKER_CLASS=gevent
+로 워커당 수백 개의 대기 요청을 처리할 수 있다.
+"""
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", "32"))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "500"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+
+# GUNICORN_PRELOAD=1 이면 마스터에서 앱을 한 번 import 한 뒤 fork (워커 기동이 빨라짐).
+# DB 클라이언트/연결, 해시 프로세스 풀 등은 워커에서 처음 쓸 때 만들어지므로 안전하다.
+preload_app = os.environ.get("GUNICORN_PRELOAD") == "1"
+
+
+def post_worker_init(worker):
+    # 요청을 받기 전에 워커별 DB 연결을 열어 둔다
+    app_module = sys.modules.get("app")
+    if app_module is not None and hasattr(app_module, "init_worker"):
+        app_module.init_worker()
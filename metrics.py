@@ -0,0 +1,168 @@
+"""요청/DB/해시 계측과 Prometheus 텍스트 출력.
+
+워커마다 증가분을 메모리에 모았다가 flush_interval 초마다 워커 공유 SQLite
+파일(cache.SharedStore)에 더한다. /api/metrics 는 모든 워커의 합계를 보여 준다.
+요청 하나의 DB 호출 수/시간, 해시 대기 시간은 contextvar 의 RequestStats 에
+모이며 (storage.gather 의 풀 스레드 포함) Server-Timing 헤더로도 내보낸다.
+"""
+import contextvars
+import sqlite3
+import threading
+import time
+
+from cache import SharedStore
+
+# 초 단위 지연 버킷 (Prometheus 기본값과 같음)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+_METRICS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    family TEXT NOT NULL,
+    sample TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    le TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (family, sample, labels, le)
+);
+"""
+
+_current = contextvars.ContextVar("metrics_request", default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_calls = 0
+        self.db_time = 0.0
+        self.hash_time = 0.0
+        self._lock = threading.Lock()
+
+    def add_db(self, seconds):
+        with self._lock:
+            self.db_calls += 1
+            self.db_time += seconds
+
+    def add_hash(self, seconds):
+        with self._lock:
+            self.hash_time += seconds
+
+    def server_timing(self):
+        parts = [f"app;dur={(time.perf_counter() - self.start) * 1000:.1f}"]
+        if self.db_calls:
+            parts.append(f'db;dur={self.db_time * 1000:.1f};desc="{self.db_calls} queries"')
+        if self.hash_time:
+            parts.append(f"hash;dur={self.hash_time * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def start_request():
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+
+def current_request():
+    return _current.get()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items()))
+
+
+def _fmt(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metrics:
+    def __init__(self, path, flush_interval=1.0):
+        self.flush_interval = flush_interval
+        self._store = SharedStore(path, _METRICS_SCHEMA)
+        self._families = {}   # name -> (type, help, buckets)
+        self._pending = {}    # (family, sample, labels, le) -> 증가분
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def counter(self, name, help):
+        self._families[name] = ("counter", help, None)
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS):
+        self._families[name] = ("histogram", help, buckets)
+
+    def _add(self, key, value):
+        self._pending[key] = self._pending.get(key, 0.0) + value
+
+    def inc(self, name, labels=None, value=1.0):
+        with self._lock:
+            self._add((name, "", _labels(labels), ""), value)
+
+    def observe(self, name, value, labels=None):
+        buckets = self._families[name][2]
+        lbl = _labels(labels)
+        with self._lock:
+            for le in buckets:
+                if value <= le:
+                    self._add((name, "_bucket", lbl, _fmt(le)), 1)
+            self._add((name, "_bucket", lbl, "+Inf"), 1)
+            self._add((name, "_sum", lbl, ""), value)
+            self._add((name, "_count", lbl, ""), 1)
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            self._store.execute("BEGIN")
+            try:
+                self._store.executemany(
+                    "INSERT INTO metrics (family, sample, labels, le, value) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (family, sample, labels, le) DO UPDATE SET value = value + excluded.value",
+                    [(*key, value) for key, value in pending.items()],
+                )
+                self._store.execute("COMMIT")
+            except BaseException:
+                self._store.execute("ROLLBACK")
+                raise
+        except sqlite3.OperationalError:
+            # 잠겨 있으면 증가분을 되돌려 두고 다음 flush 때 함께 반영
+            with self._lock:
+                for key, value in pending.items():
+                    self._add(key, value)
+
+    def render(self, extra=()):
+        """Prometheus 텍스트 형식. extra: [(name, type, help, value)] 조회 시점에 읽는 값."""
+        self.flush()
+        rows = self._store.execute("SELECT family, sample, labels, le, value FROM metrics").fetchall()
+        by_family = {}
+        for family, sample, labels, le, value in rows:
+            by_family.setdefault(family, []).append((sample, labels, le, value))
+        sample_order = {"": 0, "_bucket": 1, "_sum": 2, "_count": 3}
+        lines = []
+        for name, (kind, help, _) in self._families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            samples = sorted(by_family.get(name, ()), key=lambda s: (
+                s[1], sample_order[s[0]], float(s[2]) if s[2] else 0.0,
+            ))
+            for sample, labels, le, value in samples:
+                if le:
+                    labels = f'{labels},le="{le}"' if labels else f'le="{le}"'
+                lines.append(f"{name}{sample}{{{labels}}} {_fmt(value)}" if labels
+                             else f"{name}{sample} {_fmt(value)}")
+        for name, kind, help, value in extra:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
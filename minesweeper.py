@@ -0,0 +1,285 @@
+"""지뢰찾기 보드 생성과 기록 검증.
+
+보드는 (레벨, 시드, 첫 클릭 칸) 으로 정해진다. 칸마다 splitmix64(시드, 칸 번호) 값을 매기고
+첫 클릭 주변 3x3 을 뺀 칸 중 값이 가장 작은 지뢰 수만큼이 지뢰다. splitmix64 는 64비트
+위의 일대일 함수라 값이 겹치지 않으므로, 같은 시드면 여러 개를 함께 만들든 NumPy 가 있든
+없든 같은 보드가 나온다.
+
+NumPy 가 있으면 boards() 가 시드 여러 개를 (시드 수, 행, 열) 배열로 한 번에 만든다. 값 계산,
+첫 클릭 주변 제외, argpartition 으로 지뢰 고르기, 8방향으로 민 배열을 더해 주변 지뢰 수
+세기까지 반복문 없이 처리한다. 없으면 같은 계산을 파이썬으로 한다.
+
+GameStore 는 서버가 내준 판을 워커 공유 SQLite 파일에 둔다. 클라이언트는 공개 시드와 크기만
+받고, 보드는 비밀 키로 시드를 HMAC 한 값으로 만들어 시드만으로는 알 수 없다. 칸을 열 때마다
+서버가 저장해 둔 연 칸에 open_cell() 로 더해 새로 열린 칸만 돌려주고 (클라이언트의 깃발
+칸은 이어서 열지 않는다), 이긴 판은 claim() 으로 한 번만 기록할 수 있다.
+"""
+import hashlib
+import hmac
+import json
+import secrets
+import time
+
+from cache import SharedStore
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성: 없으면 파이썬으로 같은 보드를 만든다
+    np = None
+
+# 레벨 -> (행, 열, 지뢰 수) (static/js/minesweeper.js 의 LEVELS 와 같아야 함)
+LEVELS = {
+    1: (10, 10, 10),
+    2: (20, 20, 20),
+    3: (30, 30, 30),
+    4: (10, 10, 20),
+    5: (20, 20, 64),
+    6: (30, 30, 145),
+}
+
+SEED_MAX = 2 ** 32          # 공개 시드 범위 [0, SEED_MAX)
+HP_PER_BOMB = 100           # 지뢰를 밟으면 줄어드는 HP (minesweeper.js 와 같음)
+
+_MASK = (1 << 64) - 1
+_DIRS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+
+
+def _mix(x):
+    """splitmix64 (x 는 64비트 이하 정수)"""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+def _np_mix(x):
+    # uint64 배열 연산은 2^64 로 감싸지므로 마스크가 필요 없다
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _safe_cells(rows, cols, first):
+    """첫 클릭 칸과 주변 8칸 (지뢰를 두지 않는 칸) 의 번호"""
+    r0, c0 = first
+    return [r * cols + c for r in range(r0 - 1, r0 + 2) for c in range(c0 - 1, c0 + 2)
+            if 0 <= r < rows and 0 <= c < cols]
+
+
+def _board_py(level, seed, first):
+    rows, cols, bombs = LEVELS[level]
+    safe = set(_safe_cells(rows, cols, first))
+    keys = sorted((_mix((seed << 16) + i), i) for i in range(rows * cols) if i not in safe)
+    mines = [[False] * cols for _ in range(rows)]
+    for _, i in keys[:bombs]:
+        mines[i // cols][i % cols] = True
+    counts = [[0] * cols for _ in range(rows)]
+    for r in range(rows):
+        for c in range(cols):
+            counts[r][c] = sum(1 for dr, dc in _DIRS
+                               if 0 <= r + dr < rows and 0 <= c + dc < cols and mines[r + dr][c + dc])
+    return mines, counts
+
+
+def boards(level, seeds, first):
+    """시드마다 보드 하나. 반환: (mines, counts)
+
+    시드는 2^48 미만 정수 (칸 번호와 합쳐도 64비트 안에 들어간다).
+
+    NumPy 가 있으면 mines 는 (시드 수, 행, 열) bool 배열, counts 는 같은 모양의 uint8 배열
+    (주변 지뢰 수). 없으면 같은 내용의 중첩 list.
+    """
+    if np is None:
+        pairs = [_board_py(level, seed, first) for seed in seeds]
+        return [m for m, _ in pairs], [c for _, c in pairs]
+    rows, cols, bombs = LEVELS[level]
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    keys = _np_mix((seeds[:, None] << np.uint64(16)) + np.arange(rows * cols, dtype=np.uint64))
+    keys[:, _safe_cells(rows, cols, first)] = np.iinfo(np.uint64).max
+    chosen = np.argpartition(keys, bombs - 1, axis=1)[:, :bombs]
+    mines = np.zeros((len(seeds), rows * cols), dtype=bool)
+    np.put_along_axis(mines, chosen, True, axis=1)
+    mines = mines.reshape(len(seeds), rows, cols)
+    # 테두리를 0 으로 두른 뒤 8방향으로 민 창을 더하면 칸마다 주변 지뢰 수가 된다
+    padded = np.pad(mines, ((0, 0), (1, 1), (1, 1))).astype(np.uint8)
+    counts = np.zeros((len(seeds), rows, cols), dtype=np.uint8)
+    for dr, dc in _DIRS:
+        counts += padded[:, 1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+    return mines, counts
+
+
+def board(level, seed, first):
+    """보드 하나: 행별 목록, 칸 값은 지뢰면 -1, 아니면 주변 지뢰 수"""
+    mines, counts = boards(level, [seed], first)
+    mines, counts = mines[0], counts[0]
+    if np is not None:
+        return np.where(mines, -1, counts.astype(np.int8)).tolist()
+    return [[-1 if m else n for m, n in zip(mrow, crow)] for mrow, crow in zip(mines, counts)]
+
+
+def open_cell(grid, opened, cell, flags=()):
+    """board() 결과에서 cell (r, c) 을 열어 opened (연 칸 set) 에 더한다. 반환: 새로 연 칸 목록
+
+    클라이언트와 같은 규칙: 지뢰면 그 칸만 열고, 주변 지뢰 수가 0 인 칸은 주변을 이어서 연다.
+    flags (깃발 칸) 는 이어서 열지 않는다. 범위 밖이거나 이미 연 칸이면 빈 목록.
+    """
+    rows, cols = len(grid), len(grid[0])
+    r, c = cell
+    if not (0 <= r < rows and 0 <= c < cols) or cell in opened:
+        return []
+    opened.add(cell)
+    new = [cell]
+    if grid[r][c] < 0:
+        return new
+    stack = [cell]
+    while stack:
+        y, x = stack.pop()
+        if grid[y][x]:
+            continue
+        for dr, dc in _DIRS:
+            q = (y + dr, x + dc)
+            if (0 <= q[0] < rows and 0 <= q[1] < cols and q not in opened and q not in flags
+                    and grid[q[0]][q[1]] >= 0):
+                opened.add(q)
+                new.append(q)
+                stack.append(q)
+    return new
+
+
+def play(grid, clicks, max_hp):
+    """board() 결과에 클릭 [(r, c), ...] 를 깃발 없이 순서대로 둔 결과. 반환: (opened, hp, result)
+
+    지뢰를 밟으면 HP 가 HP_PER_BOMB 만큼 줄어 0 이하면 진다 (남으면 그 지뢰는 깃발로 바뀐다).
+    이미 열렸거나 깃발이 된 칸을 다시 누르면 무시하고, 끝난 뒤의 클릭도 무시한다.
+    opened 는 연 칸(밟은 지뢰 포함) set, result 는 "won" / "lost" / None (진행 중).
+    """
+    safe_left = sum(1 for row in grid for v in row if v >= 0)
+    opened = set()
+    hp = max_hp
+    for r, c in clicks:
+        new = open_cell(grid, opened, (r, c))
+        if not new:
+            continue
+        if grid[r][c] < 0:
+            hp -= HP_PER_BOMB
+            if hp <= 0:
+                return opened, hp, "lost"
+            continue
+        safe_left -= len(new)
+        if safe_left == 0:
+            return opened, hp, "won"
+    return opened, hp, None
+
+
+def replay(grid, clicks, max_hp):
+    """클릭 순서대로 두었을 때 이긴 판인지"""
+    return play(grid, clicks, max_hp)[2] == "won"
+
+
+_GAMES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS minesweeper_games (
+    seed INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    first_row INTEGER NOT NULL,
+    first_col INTEGER NOT NULL,
+    max_hp INTEGER NOT NULL,
+    hp INTEGER NOT NULL,
+    opened TEXT NOT NULL DEFAULT '[]',
+    result TEXT,
+    recorded INTEGER NOT NULL DEFAULT 0,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_minesweeper_games_expires_at ON minesweeper_games (expires_at);
+"""
+
+
+class GameStore:
+    """서버가 내준 판 (공개 시드 -> 사용자, 레벨, 첫 클릭, 최대 HP, 남은 HP, 연 칸, 결과).
+
+    판은 마지막으로 칸을 연 뒤 ttl 초가 지나면 지운다. 그 전까지는 같은 시드를 다시 내주지
+    않고, 이긴 판의 기록은 한 번만 인정한다.
+    """
+
+    def __init__(self, path, secret, ttl=3600.0):
+        self.ttl = ttl
+        self._secret = secret.encode() if isinstance(secret, str) else secret
+        self._store = SharedStore(path, _GAMES_SCHEMA)
+
+    def _board_seed(self, seed):
+        """공개 시드 -> 보드 시드 (48비트 HMAC-SHA256)"""
+        digest = hmac.new(self._secret, str(seed).encode(), hashlib.sha256).digest()
+        return int.from_bytes(digest[:6], "big")
+
+    def grid(self, level, seed, first):
+        """공개 시드의 보드 (board() 와 같은 모양)"""
+        return board(level, self._board_seed(seed), first)
+
+    def start(self, username, level, first, max_hp):
+        """새 판을 만들고 공개 시드를 돌려준다."""
+        now = time.time()
+        self._store.execute("DELETE FROM minesweeper_games WHERE expires_at <= ?", (now,))
+        while True:
+            seed = secrets.randbelow(SEED_MAX)
+            cur = self._store.execute(
+                "INSERT OR IGNORE INTO minesweeper_games "
+                "(seed, username, level, first_row, first_col, max_hp, hp, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (seed, username, level, first[0], first[1], max_hp, max_hp, now + self.ttl),
+            )
+            if cur.rowcount:
+                return seed
+
+    def reveal(self, seed, username, cell, flags=()):
+        """cell (r, c) 을 연다 (flags 칸은 이어서 열지 않는다). 없는 판이면 None.
+
+        반환: {"opened": [[r, c, 값], ...] (새로 열린 칸, 값 -1 은 밟은 지뢰), "hp", "result"}
+        판이 끝났으면 "mines": [[r, c], ...] 도 넣는다.
+        """
+        now = time.time()
+        self._store.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._store.execute(
+                "SELECT level, first_row, first_col, hp, opened, result FROM minesweeper_games "
+                "WHERE seed = ? AND username = ? AND expires_at > ?",
+                (seed, username, now),
+            ).fetchone()
+            if row is None:
+                self._store.execute("COMMIT")
+                return None
+            level, first_row, first_col, hp, opened, result = row
+            grid = self.grid(level, seed, (first_row, first_col))
+            opened = {tuple(c) for c in json.loads(opened)}
+            new = open_cell(grid, opened, cell, flags) if result is None else []
+            if new:
+                if grid[cell[0]][cell[1]] < 0:
+                    hp -= HP_PER_BOMB
+                    result = "lost" if hp <= 0 else None
+                elif all(v < 0 or (r, c) in opened for r, line in enumerate(grid) for c, v in enumerate(line)):
+                    result = "won"
+                self._store.execute(
+                    "UPDATE minesweeper_games SET hp = ?, opened = ?, result = ?, expires_at = ? WHERE seed = ?",
+                    (hp, json.dumps(sorted(opened), separators=(",", ":")), result, now + self.ttl, seed),
+                )
+            self._store.execute("COMMIT")
+        except BaseException:
+            self._store.execute("ROLLBACK")
+            raise
+        out = {"opened": [[r, c, grid[r][c]] for r, c in new], "hp": hp, "result": result}
+        if result:
+            out["mines"] = [[r, c] for r, line in enumerate(grid) for c, v in enumerate(line) if v < 0]
+        return out
+
+    def claim(self, seed, username):
+        """이긴 판을 기록 처리하고 레벨을 돌려준다. 없거나 이미 기록한 판이면 None."""
+        row = self._store.execute(
+            "UPDATE minesweeper_games SET recorded = 1 "
+            "WHERE seed = ? AND username = ? AND result = 'won' AND recorded = 0 AND expires_at > ? "
+            "RETURNING level",
+            (seed, username, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def unclaim(self, seed):
+        """claim() 한 판의 기록 저장이 실패했을 때 다시 기록할 수 있게 되돌린다."""
+        self._store.execute("UPDATE minesweeper_games SET recorded = 0 WHERE seed = ?", (seed,))
@@ -0,0 +1,84 @@
+"""비밀번호 해시/검증을 요청 스레드 밖(프로세스 풀)에서 실행.
+
+PBKDF2/scrypt 는 CPU 를 오래 붙잡으므로 로그인이 몰리면 워커의 모든 스레드가
+해시 계산에 묶인다. 워커마다 작은 프로세스 풀을 두고, 대기 중인 작업이
+max_pending 개를 넘으면 HasherBusy 를 던져 호출 쪽이 503 으로 응답하게 한다.
+workers=0 이면 풀 없이 요청 스레드에서 계산한다 (대기 한도는 그대로 적용).
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """대기 중인 해시 작업이 한도를 넘음."""
+
+
+class PasswordHasher:
+    def __init__(self, method=None, workers=2, max_pending=16, observer=None):
+        """method: werkzeug 해시 방식 (예: "scrypt", "pbkdf2:sha256:600000").
+        None 이면 werkzeug 기본값.
+        observer(event, seconds): "done"(요청 스레드가 기다린 시간) / "busy"(거절) 통보.
+        """
+        self.method = method
+        self.observer = observer
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._prefix = None
+
+    def _executor(self):
+        # fork 이후 워커마다 자기 풀을 만든다
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            if self.observer:
+                self.observer("busy", 0.0)
+            raise HasherBusy()
+        start = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+            if self.observer:
+                self.observer("done", time.perf_counter() - start)
+
+    def hash(self, password):
+        if self.method:
+            return self._run(generate_password_hash, password, self.method)
+        return self._run(generate_password_hash, password)
+
+    def verify(self, stored, password):
+        if not stored:
+            return False
+        return self._run(check_password_hash, stored, password)
+
+    def needs_rehash(self, stored):
+        """저장된 해시의 방식/파라미터가 현재 설정과 다르면 True."""
+        if not stored or "$" not in stored:
+            return False
+        if self._prefix is None:
+            # "pbkdf2:sha256" 처럼 생략된 파라미터는 werkzeug 기본값으로 채워지므로
+            # 빈 문자열을 한 번 해시해서 실제 접두어를 얻는다
+            self._prefix = self.hash("").split("$", 1)[0]
+        return stored.split("$", 1)[0] != self._prefix
+
+
+if __name__ == "__main__":
+    # ADMIN_PASSWORD_HASH 용 해시 출력: python passwords.py <비밀번호>
+    import sys
+
+    print(PasswordHasher(os.environ.get("PASSWORD_HASH_METHOD") or None, workers=0).hash(sys.argv[1]))
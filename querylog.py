@@ -0,0 +1,101 @@
+"""개발용 요청별 쿼리 로그와 N+1 탐지 (QUERY_DEBUG=1).
+
+storage 의 쿼리 관찰자로 등록되어 요청 하나가 보낸 쿼리(테이블, 필터 모양,
+값, 행 수, 시간)를 모았다가 응답 직전에 로그로 남긴다. 한 요청 안에서
+
+- 모양과 값이 모두 같은 쿼리가 두 번 이상 나가면 "duplicate"
+- 모양이 같은 쿼리가 repeat_threshold 번 이상 나가면 "N+1?"
+
+로 표시한다. budgets 에 "METHOD /rule" 별 쿼리 상한을 주면 초과한 요청을
+경고하고, strict 이면 500 응답으로 바꿔 테스트/벤치마크가 실패하게 한다.
+"""
+import contextvars
+import logging
+import re
+from collections import Counter
+
+log = logging.getLogger("querylog")
+
+_queries = contextvars.ContextVar("querylog_queries", default=None)
+
+# 로그에 남기면 안 되는 값 (werkzeug 비밀번호 해시)
+_SECRET = re.compile(r"^(pbkdf2|scrypt)[^$]*\$")
+
+
+def _redact(params):
+    if isinstance(params, (list, tuple)):
+        return [_redact(p) for p in params]
+    if isinstance(params, dict):
+        return {k: _redact(v) for k, v in params.items()}
+    if isinstance(params, str) and _SECRET.match(params):
+        return "<redacted>"
+    return params
+
+
+def parse_budgets(text):
+    """"GET /api/posts=2, POST /api/auth/login=1, *=10" -> {"GET /api/posts": 2, ...}"""
+    budgets = {}
+    for item in (text or "").split(","):
+        if "=" in item:
+            key, value = item.rsplit("=", 1)
+            budgets[key.strip()] = int(value)
+    return budgets
+
+
+class QueryLog:
+    def __init__(self, budgets=None, repeat_threshold=3, strict=False):
+        """budgets: {"GET /api/posts": 2, "*": 10} ("*" 는 나머지 전체)."""
+        self.budgets = budgets or {}
+        self.repeat_threshold = repeat_threshold
+        self.strict = strict
+        if not log.handlers:
+            log.addHandler(logging.StreamHandler())
+            log.setLevel(logging.INFO)
+
+    def start(self):
+        _queries.set([])
+
+    def record(self, event):
+        queries = _queries.get()
+        if queries is not None:
+            queries.append(event)
+
+    def finish(self, endpoint):
+        """요청 종료 시 호출. 반환: 보고서 dict (budget 초과면 over_budget 에 상한)."""
+        queries = _queries.get()
+        _queries.set(None)
+        if queries is None:
+            return None
+        shapes = Counter(q["shape"] for q in queries)
+        exact = Counter((q["shape"], repr(q["params"])) for q in queries)
+        report = {
+            "endpoint": endpoint,
+            "queries": len(queries),
+            "duration": sum(q["duration"] for q in queries),
+            "duplicates": [(shape, n) for (shape, _), n in exact.items() if n > 1],
+            "repeated_shapes": [(shape, n) for shape, n in shapes.items() if n >= self.repeat_threshold],
+            "over_budget": None,
+        }
+        budget = self.budgets.get(endpoint, self.budgets.get("*"))
+        if budget is not None and len(queries) > budget:
+            report["over_budget"] = budget
+        self._log(report, queries)
+        return report
+
+    def _log(self, report, queries):
+        if not queries and not report["over_budget"]:
+            return
+        lines = [f"{report['endpoint']} -> {report['queries']} queries, {report['duration'] * 1000:.2f} ms"]
+        for i, q in enumerate(queries, 1):
+            lines.append(
+                f"  #{i} {q['backend']} {q['table']} {q['op']} rows={q['rows']} "
+                f"{q['duration'] * 1000:.2f}ms  {q['shape']}  {_redact(q['params'])!r}"
+            )
+        for shape, n in report["duplicates"]:
+            lines.append(f"  duplicate: {n}x identical  {shape}")
+        for shape, n in report["repeated_shapes"]:
+            lines.append(f"  N+1?: {n}x same shape  {shape}")
+        if report["over_budget"] is not None:
+            lines.append(f"  over budget: {report['queries']} > {report['over_budget']}")
+        flagged = report["duplicates"] or report["repeated_shapes"] or report["over_budget"] is not None
+        log.log(logging.WARNING if flagged else logging.INFO, "\n".join(lines))
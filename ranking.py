@@ -0,0 +1,111 @@
+"""레벨/경험치 랭킹 인메모리 인덱스.
+
+avatars 전체를 매 요청마다 정렬해 가져오는 대신, 워커마다 정렬된 인덱스를
+한 번 적재해 두고 EXP 변경 시 해당 사용자만 갱신한다. 인덱스는 적재할 때의
+공유 테이블 버전(version)을 기억하므로, 다른 워커에서 변경이 일어나 버전이
+달라지면 다음 조회 때 다시 적재한다 (ttl 초마다도 다시 적재).
+"""
+import bisect
+import threading
+import time
+
+
+class AuthorRanking:
+    """(level, exp) 내림차순 정렬 인덱스. 동점은 dense rank(1, 1, 2 ...)."""
+
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self.version = None  # 적재한 데이터의 공유 테이블 버전
+        self._entries = {}   # user_id -> (level, exp, username)
+        self._order = []     # 정렬 키 (-level, -exp, user_id)
+        self._tiers = []     # 서로 다른 (-level, -exp) 정렬 목록
+        self._tier_counts = {}
+
+    def is_stale(self, version=None):
+        """version: 지금 공유 테이블 버전 (주면 적재한 버전과 다를 때도 True)."""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            return True
+        return version is not None and version != self.version
+
+    def load(self, rows, version=None):
+        """rows: (user_id, level, exp, username) 반복자로 전체 인덱스 재구성.
+
+        version 은 rows 를 읽기 전에 얻은 버전이어야 한다 (읽는 사이 바뀌면 다음에 다시 적재).
+        """
+        entries = {uid: (lv, exp, name or "") for uid, lv, exp, name in rows}
+        order = sorted((-lv, -exp, uid) for uid, (lv, exp, _) in entries.items())
+        counts = {}
+        for neg_lv, neg_exp, _ in order:
+            counts[(neg_lv, neg_exp)] = counts.get((neg_lv, neg_exp), 0) + 1
+        with self._lock:
+            self._entries = entries
+            self._order = order
+            self._tiers = sorted(counts)
+            self._tier_counts = counts
+            self._loaded_at = time.monotonic()
+            self.version = version
+
+    def update(self, user_id, level, exp, username=None, moved=None):
+        """한 사용자의 level/exp 반영. username 이 None 이면 기존 값 유지.
+
+        moved: 이 변경으로 바뀐 버전 (이전, 이후). 인덱스가 이전 버전이었으면 이후 버전으로
+        따라가고, 아니면(다른 워커 변경을 놓침) 버전을 그대로 두어 다음 조회 때 다시 적재한다.
+        """
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            if moved is not None and self.version == moved[0]:
+                self.version = moved[1]
+            old = self._entries.get(user_id)
+            if old is not None:
+                if username is None:
+                    username = old[2]
+                self._remove(user_id, old[0], old[1])
+            self._entries[user_id] = (level, exp, username or "")
+            bisect.insort(self._order, (-level, -exp, user_id))
+            tier = (-level, -exp)
+            if tier not in self._tier_counts:
+                bisect.insort(self._tiers, tier)
+                self._tier_counts[tier] = 0
+            self._tier_counts[tier] += 1
+
+    def _remove(self, user_id, level, exp):
+        key = (-level, -exp, user_id)
+        i = bisect.bisect_left(self._order, key)
+        if i < len(self._order) and self._order[i] == key:
+            del self._order[i]
+        tier = (-level, -exp)
+        self._tier_counts[tier] -= 1
+        if self._tier_counts[tier] == 0:
+            del self._tier_counts[tier]
+            del self._tiers[bisect.bisect_left(self._tiers, tier)]
+
+    def top(self, limit):
+        """상위 limit명 [{rank, username, level, exp}]"""
+        with self._lock:
+            ranking = []
+            rank = 0
+            prev = None
+            for neg_lv, neg_exp, uid in self._order[:limit]:
+                if (neg_lv, neg_exp) != prev:
+                    rank += 1
+                    prev = (neg_lv, neg_exp)
+                ranking.append({
+                    "rank": rank,
+                    "username": self._entries[uid][2],
+                    "level": -neg_lv,
+                    "exp": -neg_exp,
+                })
+            return ranking
+
+    def rank_of(self, user_id):
+        """사용자의 dense rank 와 level/exp. 인덱스에 없으면 None."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            level, exp, _ = entry
+            rank = bisect.bisect_left(self._tiers, (-level, -exp)) + 1
+            return {"rank": rank, "level": level, "exp": exp}
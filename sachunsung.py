@@ -0,0 +1,357 @@
+"""사천성 보드 엔진과 미리 만들어 둔 보드 풀.
+
+보드는 타입(1..쌍 수, 0 = 빈칸)의 2차원 목록이고 각 타입은 정확히 두 칸에 있다.
+두 칸은 보드 안의 빈칸만 지나는 최대 2번 꺾인 선으로 이어지면 지울 수 있다
+(static/js/sachunsung.js 와 같은 규칙). 행/열마다 차지한 칸을 비트마스크로 들고 있어서
+구간이 비었는지는 AND 한 번, 한 칸에서 직선으로 닿는 범위는 비트 연산 몇 번이면 된다.
+
+무작위로 채운 보드는 끝까지 풀리지 않는 경우가 많아서 생성은 거꾸로 한다. 빈 보드에서
+행 우선으로 첫 빈칸을 잡고, 지금 보드에서 그 칸과 이어지는 빈칸 하나를 골라 같은 타입을
+놓는다. 나중에 놓은 쌍부터 지우면 놓을 때와 같은 보드에서 지우는 셈이므로 항상 풀린다.
+짝 없는 빈칸이 갇히지 않도록 놓은 뒤 빈칸 덩어리가 모두 짝수 칸이 되는 자리만 고른다.
+
+BoardPool 은 단계별로 size 개씩 워커 공유 SQLite 파일에 채워 두고, 모자라면 백그라운드
+스레드가 프로세스 풀에서 만든다.
+
+    python sachunsung.py [단계]    # 보드 하나를 만들어 출력하고 solve 로 확인
+"""
+import json
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import SharedStore
+
+log = logging.getLogger(__name__)
+
+# 단계 -> (행, 열). 쌍 수 = 행 * 열 / 2 (static/js/sachunsung.js 의 STAGES 와 같아야 함)
+STAGES = {1: (6, 10), 2: (10, 17), 3: (14, 20), 4: (15, 26), 5: (20, 25)}
+
+
+def _span(bits, i, n):
+    """bits 에서 i 를 포함하는 빈 구간 [lo, hi]. i 자신은 빈칸으로 본다."""
+    lo = (bits & ((1 << i) - 1)).bit_length()
+    high = bits >> (i + 1)
+    hi = i + (high & -high).bit_length() - 1 if high else n - 1
+    return lo, hi
+
+
+def _clear(bits, a, b):
+    """bits 의 a..b 구간(양끝 포함)이 모두 비었는지"""
+    if a > b:
+        a, b = b, a
+    return not bits & ((1 << (b + 1)) - (1 << a))
+
+
+class Board:
+    """grid[r][c] = 타입 (0 = 빈칸). row_bits[r] / col_bits[c] 는 차지한 칸의 비트마스크."""
+
+    def __init__(self, grid):
+        self.grid = [list(row) for row in grid]
+        self.rows = len(self.grid)
+        self.cols = len(self.grid[0]) if self.grid else 0
+        self.row_bits = [0] * self.rows
+        self.col_bits = [0] * self.cols
+        for r, row in enumerate(self.grid):
+            for c, t in enumerate(row):
+                if t:
+                    self.row_bits[r] |= 1 << c
+                    self.col_bits[c] |= 1 << r
+
+    @classmethod
+    def empty(cls, rows, cols):
+        return cls([[0] * cols for _ in range(rows)])
+
+    def put(self, r, c, t):
+        self.grid[r][c] = t
+        self.row_bits[r] |= 1 << c
+        self.col_bits[c] |= 1 << r
+
+    def remove(self, r, c):
+        self.grid[r][c] = 0
+        self.row_bits[r] &= ~(1 << c)
+        self.col_bits[c] &= ~(1 << r)
+
+    def pairs(self):
+        """남은 타입 -> 두 칸 ((r1, c1), (r2, c2))"""
+        out = {}
+        for r, row in enumerate(self.grid):
+            for c, t in enumerate(row):
+                if t:
+                    out.setdefault(t, []).append((r, c))
+        return {t: tuple(cells) for t, cells in out.items()}
+
+    def _path(self, r1, c1, r2, c2):
+        """두 칸 사이에 빈칸만 지나는 2번 이하 꺾인 경로가 있는지 (두 칸은 비어 있다고 봄)"""
+        rb, cb = self.row_bits, self.col_bits
+        # 가로-세로-가로: 꺾는 열은 두 칸에서 각각 가로로 닿는 범위의 교집합 안에 있다
+        lo1, hi1 = _span(rb[r1], c1, self.cols)
+        lo2, hi2 = _span(rb[r2], c2, self.cols)
+        for x in range(max(lo1, lo2), min(hi1, hi2) + 1):
+            if _clear(cb[x], r1, r2):
+                return True
+        # 세로-가로-세로
+        lo1, hi1 = _span(cb[c1], r1, self.rows)
+        lo2, hi2 = _span(cb[c2], r2, self.rows)
+        for y in range(max(lo1, lo2), min(hi1, hi2) + 1):
+            if _clear(rb[y], c1, c2):
+                return True
+        return False
+
+    def can_connect(self, r1, c1, r2, c2):
+        """같은 타입의 두 칸을 지울 수 있는지"""
+        t = self.grid[r1][c1]
+        if not t or t != self.grid[r2][c2] or (r1, c1) == (r2, c2):
+            return False
+        # 두 칸 자신은 경로를 막지 않으므로 비트만 잠시 지우고 본다
+        rb, cb = self.row_bits, self.col_bits
+        saved = rb[r1], rb[r2], cb[c1], cb[c2]
+        rb[r1] &= ~(1 << c1)
+        rb[r2] &= ~(1 << c2)
+        cb[c1] &= ~(1 << r1)
+        cb[c2] &= ~(1 << r2)
+        try:
+            return self._path(r1, c1, r2, c2)
+        finally:
+            rb[r1], rb[r2], cb[c1], cb[c2] = saved
+
+    def movable(self, pairs=None):
+        """지금 지울 수 있는 타입 목록 (pairs: self.pairs() 를 이미 갖고 있으면 넘긴다)"""
+        pairs = self.pairs() if pairs is None else pairs
+        return [t for t, (a, b) in pairs.items() if self.can_connect(*a, *b)]
+
+    def reachable(self, r, c):
+        """빈칸 (r, c) 에서 2번 이하 꺾어 닿는 빈칸 목록 (자기 자신 제외)"""
+        rb, cb, rows, cols = self.row_bits, self.col_bits, self.rows, self.cols
+        row_hits = [0] * rows
+        col_hits = [0] * cols
+        lo, hi = _span(rb[r], c, cols)
+        for x in range(lo, hi + 1):
+            ylo, yhi = _span(cb[x], r, rows)
+            for y in range(ylo, yhi + 1):
+                a, b = _span(rb[y], x, cols)
+                row_hits[y] |= (1 << (b + 1)) - (1 << a)
+        lo, hi = _span(cb[c], r, rows)
+        for y in range(lo, hi + 1):
+            xlo, xhi = _span(rb[y], c, cols)
+            for x in range(xlo, xhi + 1):
+                a, b = _span(cb[x], y, rows)
+                col_hits[x] |= (1 << (b + 1)) - (1 << a)
+        for x, bits in enumerate(col_hits):
+            y = 0
+            while bits:
+                if bits & 1:
+                    row_hits[y] |= 1 << x
+                bits >>= 1
+                y += 1
+        row_hits[r] &= ~(1 << c)
+        return [(y, x) for y, bits in enumerate(row_hits) for x in range(cols) if bits >> x & 1]
+
+
+def _even_regions(board, cells):
+    """cells 이웃의 빈칸 덩어리(상하좌우 연결)가 모두 짝수 칸인지"""
+    grid, rows, cols = board.grid, board.rows, board.cols
+    seen = set()
+    for r, c in cells:
+        for start in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            y, x = start
+            if not (0 <= y < rows and 0 <= x < cols) or grid[y][x] or start in seen:
+                continue
+            seen.add(start)
+            stack, size = [start], 0
+            while stack:
+                y, x = stack.pop()
+                size += 1
+                for q in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                    if 0 <= q[0] < rows and 0 <= q[1] < cols and not grid[q[0]][q[1]] and q not in seen:
+                        seen.add(q)
+                        stack.append(q)
+            if size % 2:
+                return False
+    return True
+
+
+def _build(rows, cols, rng):
+    """거꾸로 채우기 한 번. 막히면 None."""
+    board = Board.empty(rows, cols)
+    types = list(range(1, rows * cols // 2 + 1))
+    rng.shuffle(types)
+    i = 0
+    for t in types:
+        while board.grid[i // cols][i % cols]:
+            i += 1
+        r, c = divmod(i, cols)
+        candidates = board.reachable(r, c)
+        rng.shuffle(candidates)
+        board.put(r, c, t)
+        for y, x in candidates:
+            board.put(y, x, t)
+            if _even_regions(board, ((r, c), (y, x))):
+                break
+            board.remove(y, x)
+        else:
+            return None
+    return board.grid
+
+
+def generate(stage, seed=None):
+    """끝까지 풀 수 있는 stage 단계 보드 (grid)"""
+    rows, cols = STAGES[stage]
+    rng = random.Random(seed)
+    while True:
+        grid = _build(rows, cols, rng)
+        if grid is not None:
+            break
+    # 행 우선으로 채운 티가 나지 않게 상하/좌우를 무작위로 뒤집는다 (연결 규칙은 대칭)
+    if rng.random() < 0.5:
+        grid.reverse()
+    if rng.random() < 0.5:
+        for row in grid:
+            row.reverse()
+    return grid
+
+
+def solve(grid, seed=0, attempts=20):
+    """모두 지우는 순서 [((r1, c1), (r2, c2)), ...]. 못 찾으면 None.
+
+    지울 수 있는 쌍 중 하나를 무작위로 골라 지우기를 반복하고, 막히면 처음부터 다시 한다.
+    None 이 풀 수 없다는 뜻은 아니다.
+    """
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        board = Board(grid)
+        left = board.pairs()
+        order = []
+        while left:
+            movable = board.movable(left)
+            if not movable:
+                break
+            a, b = left.pop(rng.choice(movable))
+            board.remove(*a)
+            board.remove(*b)
+            order.append((a, b))
+        else:
+            return order
+    return None
+
+
+def _generate_json(stage):
+    return json.dumps(generate(stage), separators=(",", ":"))
+
+
+_POOL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sachunsung_boards (
+    id INTEGER PRIMARY KEY,
+    stage INTEGER NOT NULL,
+    grid TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sachunsung_boards_stage ON sachunsung_boards (stage, id);
+"""
+
+
+class BoardPool:
+    """단계별로 미리 만든 보드를 워커 공유 SQLite 파일에 채워 두고 하나씩 꺼내 준다."""
+
+    def __init__(self, path, size=4, workers=1, interval=5.0):
+        """size: 단계별로 채워 둘 보드 수 (0 이면 풀 없이 요청마다 만든다).
+        workers: 생성 프로세스 수 (0 이면 호출한 스레드에서 만든다).
+        interval: 채우는 스레드가 꺼내 간 것이 없어도 수를 다시 확인하는 주기 (초).
+        """
+        self.size = size
+        self.workers = workers
+        self.interval = interval
+        self._store = SharedStore(path, _POOL_SCHEMA) if size > 0 else None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._pool = None
+        self._pool_pid = None
+
+    def start(self):
+        """채우는 스레드를 띄운다 (fork 이후 워커마다 하나)."""
+        if self._store is None:
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="sachunsung-boards", daemon=True)
+                self._thread.start()
+
+    def take(self, stage):
+        """stage 단계 보드 하나 (grid). 풀이 비었으면 바로 만든다."""
+        if self._store is not None:
+            self.start()
+            row = self._store.execute(
+                "DELETE FROM sachunsung_boards WHERE id = "
+                "(SELECT id FROM sachunsung_boards WHERE stage = ? ORDER BY id LIMIT 1) RETURNING grid",
+                (stage,),
+            ).fetchone()
+            self._wake.set()
+            if row:
+                return json.loads(row[0])
+        return json.loads(self._map([stage])[0])
+
+    def counts(self):
+        """단계 -> 채워 둔 보드 수"""
+        if self._store is None:
+            return {stage: 0 for stage in STAGES}
+        have = dict(self._store.execute("SELECT stage, COUNT(*) FROM sachunsung_boards GROUP BY stage"))
+        return {stage: have.get(stage, 0) for stage in STAGES}
+
+    def _executor(self):
+        # fork 이후 워커마다 자기 풀을 만든다
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _map(self, stages):
+        if self.workers <= 0:
+            return [_generate_json(stage) for stage in stages]
+        return list(self._executor().map(_generate_json, stages))
+
+    def fill(self):
+        """모자란 만큼 만들어 넣는다. 단계마다 하나씩 돌아가며 채운다. 반환: 넣은 수"""
+        counts = self.counts()
+        missing = [stage for i in range(self.size) for stage in STAGES if counts[stage] <= i]
+        added = 0
+        # 여러 워커가 함께 채워도 size 를 넘지 않게 넣을 때 다시 센다
+        for i in range(0, len(missing), max(1, self.workers)):
+            chunk = missing[i:i + max(1, self.workers)]
+            for stage, grid in zip(chunk, self._map(chunk)):
+                cur = self._store.execute(
+                    "INSERT INTO sachunsung_boards (stage, grid) SELECT ?, ? "
+                    "WHERE (SELECT COUNT(*) FROM sachunsung_boards WHERE stage = ?) < ?",
+                    (stage, grid, stage, self.size),
+                )
+                added += cur.rowcount
+        return added
+
+    def _run(self):
+        while True:
+            try:
+                self.fill()
+            except Exception:
+                log.warning("sachunsung board refill failed", exc_info=True)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    stage = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    t0 = time.perf_counter()
+    board = generate(stage)
+    t1 = time.perf_counter()
+    order = solve(board)
+    t2 = time.perf_counter()
+    for row in board:
+        print(" ".join(f"{t:3d}" for t in row))
+    print(f"generate {(t1 - t0) * 1000:.1f} ms, solve {(t2 - t1) * 1000:.1f} ms "
+          f"({'solved' if order else 'not solved'}), movable now: {len(Board(board).movable())}")
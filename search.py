@@ -0,0 +1,73 @@
+"""게시글 검색용 n-gram 색인어.
+
+한국어는 조사가 붙고 띄어쓰기가 들쭉날쭉해서 단어 단위로 색인하면 "서버가" 로
+"서버" 를 찾지 못한다. 그래서 NFKC 정규화 + 소문자화한 글을 단어(\\w+)로 나눈 뒤
+글자 2-gram 을 색인어로 쓴다 (한 글자 단어는 그 글자 자체). 검색어도 같은 방식으로
+나누고 색인어를 모두 가진 글만 찾으므로 부분 문자열 검색과 거의 같다.
+
+색인은 저장소의 post_terms (색인어, 글 id, 가중치) 테이블이고 글 작성/수정 시
+index_post 로 갱신된다 (삭제는 ON DELETE CASCADE). 기존 글은 한 번 채워 넣는다:
+
+    python search.py --reindex
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+
+TITLE_WEIGHT = 3.0
+MAX_QUERY_TERMS = 16
+
+_WORD = re.compile(r"\w+")
+
+
+def terms(text):
+    """글 -> 색인어 목록 (중복 포함)"""
+    out = []
+    for word in _WORD.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if len(word) == 1:
+            out.append(word)
+        else:
+            out.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return out
+
+
+def term_weights(title, content):
+    """색인어 -> 가중치. 제목에 있으면 TITLE_WEIGHT, 본문은 1 + ln(나온 횟수)."""
+    weights = {t: TITLE_WEIGHT for t in set(terms(title))}
+    for t, n in Counter(terms(content)).items():
+        weights[t] = weights.get(t, 0.0) + 1.0 + math.log(n)
+    return weights
+
+
+def query_terms(query):
+    """검색어 -> 중복 없는 색인어 (최대 MAX_QUERY_TERMS 개)"""
+    return list(dict.fromkeys(terms(query)))[:MAX_QUERY_TERMS]
+
+
+def reindex(store, chunk=500):
+    """모든 글의 색인을 다시 만든다. 반환: 색인한 글 수"""
+    count = after = 0
+    while True:
+        rows = store.export_rows("posts", "id,title,content", after, chunk)
+        for row in rows:
+            store.index_post(row["id"], term_weights(row.get("title"), row.get("content")))
+        count += len(rows)
+        if len(rows) < chunk:
+            return count
+        after = rows[-1]["id"]
+
+
+if __name__ == "__main__":
+    # 기존 글 색인: python search.py --reindex (저장소 환경변수는 app 과 같음)
+    import os
+    import sys
+
+    from storage import create_store
+
+    if sys.argv[1:] != ["--reindex"]:
+        sys.exit("usage: python search.py --reindex")
+    db = create_store(os.path.dirname(os.path.abspath(__file__)))
+    if db is None:
+        sys.exit("저장소 미설정")
+    print(f"{reindex(db)} posts indexed")
@@ -0,0 +1,105 @@
+"""서버 쪽 세션 저장소 (SESSION_BACKEND=server).
+
+쿠키에는 임의의 세션 id 만 담고, 세션 내용은 워커들이 공유하는 로컬 SQLite
+파일(cache.SharedStore)에 둔다. 내용이 바뀐 요청에서만 저장/쿠키 발급을 하고,
+사용자별로 세션을 지울 수 있다 (revoke_user, 블랙리스트 지정 시).
+"""
+import json
+import random
+import secrets
+import time
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from cache import SharedStore
+
+_SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    sid TEXT PRIMARY KEY,
+    user_id INTEGER,
+    data TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at);
+"""
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, expires_at=0.0):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.loaded_user_id = self.get("user_id")
+        self.modified = False
+
+
+class ServerSessionInterface(SessionInterface):
+    """ttl: 마지막 저장 이후 서버 쪽 세션 유지 시간(초). 절반이 지나면 만료를 연장한다."""
+
+    def __init__(self, path, ttl=7 * 86400):
+        self.ttl = ttl
+        self._store = SharedStore(path, _SESSION_SCHEMA)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            row = self._store.execute(
+                "SELECT data, expires_at FROM sessions WHERE sid = ? AND expires_at > ?",
+                (sid, time.time()),
+            ).fetchone()
+            if row:
+                return ServerSession(json.loads(row[0]), sid, row[1])
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if session.sid is not None:
+                self._delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        now = time.time()
+        if not session.modified and session.expires_at - now > self.ttl / 2:
+            return
+        if session.sid is None or session.get("user_id") != session.loaded_user_id:
+            # 로그인 등으로 사용자가 바뀌면 세션 id 를 새로 발급 (세션 고정 방지)
+            if session.sid is not None:
+                self._delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+        self._store.execute(
+            "INSERT OR REPLACE INTO sessions (sid, user_id, data, expires_at) VALUES (?, ?, ?, ?)",
+            (session.sid, session.get("user_id"), json.dumps(dict(session)), now + self.ttl),
+        )
+        if random.random() < 0.01:
+            self._store.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+    def _delete(self, sid):
+        self._store.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def revoke_user(self, user_id):
+        """해당 사용자의 모든 세션 삭제 (다음 요청부터 로그아웃 상태)."""
+        self.revoke_users([user_id])
+
+    def revoke_users(self, user_ids):
+        ids = list(user_ids)
+        if ids:
+            self._store.execute(
+                f"DELETE FROM sessions WHERE user_id IN ({', '.join('?' * len(ids))})", ids
+            )
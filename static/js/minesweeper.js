@@ -41,10 +41,12 @@ let state = {
   rows: 10,
   cols: 10,
   bombCount: 3,
-  grid: [],           // 2D: true=폭탄
+  grid: [],           // 2D: true=폭탄 (밟았거나 판이 끝나 서버가 알려 준 칸)
+  counts: [],         // 2D: 주변 폭탄 수 (열린 칸)
+  seed: null,         // 서버가 내준 판의 시드 (첫 클릭 때 받음)
+  queue: null,        // 서버에 보낼 칸 열기를 순서대로 잇는 Promise
   revealed: [],       // 2D: true=열림
   flagged: [],        // 2D: true=플래그
-  firstClick: true,
   gameOver: false,
   won: false,
   bombHitRow: -1,
@@ -62,33 +64,8 @@ function isInBounds(r, c) {
   return r >= 0 && r < state.rows && c >= 0 && c < state.cols;
 }
 
-function placeBombs(firstRow, firstCol) {
-  const exclude = new Set();
-  for (const [dr, dc] of DIRS) {
-    exclude.add(`${firstRow + dr},${firstCol + dc}`);
-  }
-  exclude.add(`${firstRow},${firstCol}`);
-
-  let placed = 0;
-  const total = state.rows * state.cols;
-  while (placed < state.bombCount) {
-    const r = Math.floor(Math.random() * state.rows);
-    const c = Math.floor(Math.random() * state.cols);
-    const key = `${r},${c}`;
-    if (!exclude.has(key) && !state.grid[r][c]) {
-      state.grid[r][c] = true;
-      placed++;
-    }
-  }
-}
-
 function getAdjacentBombCount(row, col) {
-  let count = 0;
-  for (const [dr, dc] of DIRS) {
-    const r = row + dr, c = col + dc;
-    if (isInBounds(r, c) && state.grid[r][c]) count++;
-  }
-  return count;
+  return state.counts[row][col];
 }
 
 function renderCell(r, c) {
@@ -221,49 +198,48 @@ function updateCellUI(r, c) {
   }
 }
 
-function reveal(row, col) {
-  if (!isInBounds(row, col) || state.revealed[row][col] || state.flagged[row][col] || state.gameOver) return;
-
-  if (state.firstClick) {
-    state.firstClick = false;
-    placeBombs(row, col);
-  }
-
-  if (state.grid[row][col]) {
-    state.hp -= 100;
-    if (state.hp > 0) {
-      // HP가 남아 있으면 폭탄을 깃발 처리하고 계속 진행
-      state.flagged[row][col] = true;
-      updateCellUI(row, col);
-      updateBombCountDisplay();
-      updateHpDisplay();
-      showHpDamage(state.hp, state.maxHp);
-      return;
+/** 서버가 알려 준 칸 열기 결과를 반영 */
+function applyReveal(data) {
+  let hit = null;
+  for (const [r, c, v] of data.opened) {
+    if (v < 0) {
+      hit = [r, c];
+      state.grid[r][c] = true;
+      continue;
     }
+    state.counts[r][c] = v;
+    state.revealed[r][c] = true;
+    state.flagged[r][c] = false;
+    updateCellUI(r, c);
+  }
+  state.hp = Math.max(data.hp, 0);
+  if (hit && data.result !== "lost") {
+    // HP가 남아 있으면 폭탄을 깃발 처리하고 계속 진행
+    state.flagged[hit[0]][hit[1]] = true;
+    updateCellUI(hit[0], hit[1]);
+    showHpDamage(state.hp, state.maxHp);
+  }
+  updateBombCountDisplay();
+  updateHpDisplay();
+  if (!data.result) return;
+
+  state.gameOver = true;
+  state.won = data.result === "won";
+  for (const [r, c] of data.mines) state.grid[r][c] = true;
+  if (!state.won && hit) {
+    state.bombHitRow = hit[0];
+    state.bombHitCol = hit[1];
+  }
+  revealAllBombs();
+  if (state.won) {
+    saveMinesweeperRecord(state.seed, function() {
+      if (typeof loadRanking === "function") loadRanking();
+    });
+    alert("축하합니다! 승리했습니다!");
+  } else {
     // HP 소진 → 게임 오버
-    state.hp = 0;
-    state.gameOver = true;
-    state.won = false;
-    state.bombHitRow = row;
-    state.bombHitCol = col;
-    revealAllBombs();
-    updateCellUI(row, col);
-    updateHpDisplay();
     alert("게임 오버! HP가 모두 소진되었습니다.");
-    return;
   }
-
-  state.revealed[row][col] = true;
-  updateCellUI(row, col);
-
-  const count = getAdjacentBombCount(row, col);
-  if (count === 0) {
-    for (const [dr, dc] of DIRS) {
-      reveal(row + dr, col + dc);
-    }
-  }
-
-  checkWin();
 }
 
 function revealAllBombs() {
@@ -342,46 +318,76 @@ function hideLongPressPopup() {
 }
 
 function onCellClick(row, col) {
-  if (state.gameOver) return;
-  reveal(row, col);
+  if (state.gameOver || state.revealed[row][col] || state.flagged[row][col]) return;
+  const game = state;
+  // 보드는 서버에만 있으므로 칸 열기를 순서대로 보내고 응답대로 그린다
+  game.queue = game.queue.then(function() {
+    if (game !== state || game.gameOver) return;
+    const ready = game.seed === null ? loadBoard(game, row, col) : Promise.resolve();
+    return ready.then(function() { return openCell(game, row, col); });
+  }).catch(function(err) {
+    if (game !== state || game.gameOver) return;
+    game.gameOver = true;
+    alert("서버와 통신하지 못해 이 판을 계속할 수 없습니다. 다시 시작해 주세요.\n" + err.message);
+  });
 }
 
-function checkWin() {
-  if (state.gameOver) return;
-  const safeCount = state.rows * state.cols - state.bombCount;
-  let revealedCount = 0;
-  for (let r = 0; r < state.rows; r++) {
-    for (let c = 0; c < state.cols; c++) {
-      if (state.revealed[r][c] && !state.grid[r][c]) revealedCount++;
-    }
+/** JSON 요청. 실패하면 서버가 보낸 error 메시지로 reject */
+function requestJson(url, body) {
+  const opts = { credentials: "include" };
+  if (body) {
+    opts.method = "POST";
+    opts.headers = { "Content-Type": "application/json" };
+    opts.body = JSON.stringify(body);
   }
-  if (revealedCount === safeCount) {
-    state.gameOver = true;
-    state.won = true;
-    revealAllBombs();
-    saveMinesweeperRecord(state.level, function() {
-      if (typeof loadRanking === "function") loadRanking();
+  return fetch(url, opts).then(function(res) {
+    return res.json().catch(function() { return {}; }).then(function(data) {
+      if (!res.ok) throw new Error(data.error || `서버 오류 (${res.status})`);
+      return data;
     });
-    alert("축하합니다! 승리했습니다!");
+  });
+}
+
+/** 첫 클릭 칸 주변을 비워 둔 새 판을 서버에 만든다 (보드는 받지 않고 시드와 최대 HP 만) */
+function loadBoard(game, row, col) {
+  return requestJson(`/api/minesweeper/board?level=${game.level}&row=${row}&col=${col}`).then(function(data) {
+    game.seed = data.seed;
+    game.hp = game.maxHp = data.max_hp;
+    if (game === state) updateHpDisplay();
+  });
+}
+
+/** 사용자가 연 칸을 서버에서 연다 */
+function openCell(game, row, col) {
+  if (game !== state || game.gameOver || game.revealed[row][col] || game.flagged[row][col]) return;
+  // 깃발 칸은 서버가 주변을 이어서 열 때 건너뛴다
+  const flags = [];
+  for (let r = 0; r < game.rows; r++) {
+    for (let c = 0; c < game.cols; c++) {
+      if (game.flagged[r][c] && !game.revealed[r][c]) flags.push([r, c]);
+    }
   }
+  const body = { seed: game.seed, row: row, col: col, flags: flags };
+  return requestJson("/api/minesweeper/reveal", body).then(function(data) {
+    if (game === state) applyReveal(data);
+  });
 }
 
-function saveMinesweeperRecord(level, onDone) {
-  fetch("/api/minesweeper/record", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    credentials: "include",
-    body: JSON.stringify({ level: level })
-  })
-    .then(function() { if (onDone) onDone(); })
-    .catch(function() { if (onDone) onDone(); });
+function saveMinesweeperRecord(seed, onDone) {
+  requestJson("/api/minesweeper/record", { seed: seed })
+    .catch(function(err) { alert("기록을 저장하지 못했습니다: " + err.message); })
+    .then(function() { if (onDone) onDone(); });
 }
 
+var rankingStream = null;
+
 function loadRanking() {
-  const tbody = document.getElementById("rankingBody");
-  if (!tbody) return;
+  // 스트림이 연결돼 있으면 랭킹이 바뀔 때 서버가 보내 준다
+  if (rankingStream && rankingStream.readyState === EventSource.OPEN) return;
+  if (!document.getElementById("rankingBody")) return;
   fetch("/api/minesweeper/ranking", { credentials: "include" })
     .then(function(r) {
+      if (!r.ok) throw new Error(r.status);
       return r.text().then(function(t) {
         try {
           return t ? JSON.parse(t) : {};
@@ -391,24 +397,48 @@ function loadRanking() {
       });
     })
     .then(function(data) {
-      const list = Array.isArray(data.ranking) ? data.ranking : [];
-      if (list.length === 0) {
-        tbody.innerHTML = "<tr><td colspan=\"4\" class=\"text-muted text-center\">기록이 없습니다.</td></tr>";
-      } else {
-        tbody.innerHTML = list.map(function(r) {
-          var rank = Number(r.rank) || 0;
-          var level = Number(r.level) || 1;
-          var username = escapeHtmlRank(r.username != null ? String(r.username) : "");
-          var date = r.success_date != null ? String(r.success_date) : "";
-          return "<tr><td>" + rank + "</td><td>" + level + "단계</td><td>" + username + "</td><td>" + date + "</td></tr>";
-        }).join("");
-      }
+      renderRanking(Array.isArray(data.ranking) ? data.ranking : []);
     })
     .catch(function() {
-      tbody.innerHTML = "<tr><td colspan=\"4\" class=\"text-muted text-center\">로드 실패</td></tr>";
+      document.getElementById("rankingBody").innerHTML = "<tr><td colspan=\"4\" class=\"text-muted text-center\">로드 실패</td></tr>";
     });
 }
 
+function renderRanking(list) {
+  const tbody = document.getElementById("rankingBody");
+  if (!tbody) return;
+  if (list.length === 0) {
+    tbody.innerHTML = "<tr><td colspan=\"4\" class=\"text-muted text-center\">기록이 없습니다.</td></tr>";
+  } else {
+    tbody.innerHTML = list.map(function(r) {
+      var rank = Number(r.rank) || 0;
+      var level = Number(r.level) || 1;
+      var username = escapeHtmlRank(r.username != null ? String(r.username) : "");
+      var date = r.success_date != null ? String(r.success_date) : "";
+      return "<tr><td>" + rank + "</td><td>" + level + "단계</td><td>" + username + "</td><td>" + date + "</td></tr>";
+    }).join("");
+  }
+}
+
+function watchRanking() {
+  if (!window.EventSource) {
+    loadRanking();
+    return;
+  }
+  rankingStream = new EventSource("/api/stream/rankings?games=minesweeper");
+  rankingStream.addEventListener("ranking", function(e) {
+    var data = JSON.parse(e.data);
+    renderRanking(Array.isArray(data.ranking) ? data.ranking : []);
+  });
+  rankingStream.onerror = function() {
+    // 재접속을 포기한 경우(503 등)에만 일반 조회로 전환
+    if (rankingStream.readyState === EventSource.CLOSED) {
+      rankingStream = null;
+      loadRanking();
+    }
+  };
+}
+
 function escapeHtmlRank(s) {
   if (s == null || s === undefined) return "";
   var div = document.createElement("div");
@@ -480,7 +510,9 @@ function startGame(level) {
     grid: Array(cfg.rows).fill(null).map(() => Array(cfg.cols).fill(false)),
     revealed: Array(cfg.rows).fill(null).map(() => Array(cfg.cols).fill(false)),
     flagged: Array(cfg.rows).fill(null).map(() => Array(cfg.cols).fill(false)),
-    firstClick: true,
+    counts: Array(cfg.rows).fill(null).map(() => Array(cfg.cols).fill(0)),
+    seed: null,
+    queue: Promise.resolve(),
     gameOver: false,
     won: false,
     bombHitRow: -1,
@@ -505,7 +537,7 @@ function startGame(level) {
 
 document.addEventListener("DOMContentLoaded", function() {
   startGame(1);
-  loadRanking();
+  watchRanking();
 
   var popup = document.getElementById("longPressPopup");
   var popupFlagBtn = document.getElementById("popupFlagBtn");
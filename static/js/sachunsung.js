@@ -78,6 +78,7 @@
     selected: null, // { r, c, type } or null
     gameStarted: false,
     gameOver: false,
+    boardToken: 0,  // 보드 요청 순번 (늦게 온 이전 응답은 버림)
     startTime: 0,
     timerId: null
   };
@@ -184,21 +185,19 @@
     return countConnectablePairs() > 0;
   }
 
-  /** 맞출 수 있는 조건을 만족하는 쌍의 총 개수 */
+  /** 맞출 수 있는 조건을 만족하는 쌍의 총 개수. 타입마다 정확히 두 칸이므로 그 두 칸만 확인 */
   function countConnectablePairs() {
     var count = 0;
-    var r1, c1, r2, c2, t1, t2;
-    for (r1 = 0; r1 < state.rows; r1++) {
-      for (c1 = 0; c1 < state.cols; c1++) {
-        t1 = getType(r1, c1);
-        if (t1 === 0) continue;
-        for (r2 = 0; r2 < state.rows; r2++) {
-          for (c2 = 0; c2 < state.cols; c2++) {
-            if (r1 === r2 && c1 === c2) continue;
-            if (r1 > r2 || (r1 === r2 && c1 >= c2)) continue;
-            t2 = getType(r2, c2);
-            if (t1 === t2 && canConnect(r1, c1, r2, c2)) count++;
-          }
+    var first = {};
+    for (var r = 0; r < state.rows; r++) {
+      for (var c = 0; c < state.cols; c++) {
+        var t = state.board[r][c];
+        if (t === 0) continue;
+        var p = first[t];
+        if (!p) {
+          first[t] = { r: r, c: c };
+        } else if (canConnect(p.r, p.c, r, c)) {
+          count++;
         }
       }
     }
@@ -233,17 +232,22 @@
     }
   }
 
+  function emptyBoard(rows, cols) {
+    var board = [];
+    for (var r = 0; r < rows; r++) {
+      board[r] = [];
+      for (var c = 0; c < cols; c++) board[r][c] = 0;
+    }
+    return board;
+  }
+
   function initBoard() {
     var cfg = getConfig();
     state.rows = cfg.rows;
     state.cols = cfg.cols;
     state.pairs = cfg.pairs;
-    state.board = [];
+    state.board = emptyBoard(state.rows, state.cols);
     var r, c;
-    for (r = 0; r < state.rows; r++) {
-      state.board[r] = [];
-      for (c = 0; c < state.cols; c++) state.board[r][c] = 0;
-    }
     var total = state.pairs * 2;
     var positions = [];
     for (r = 0; r < state.rows; r++) {
@@ -438,31 +442,62 @@
       .catch(function() { return {}; });
   }
 
+  var rankingStream = null;
+
   function loadRanking() {
+    // 스트림이 연결돼 있으면 랭킹이 바뀔 때 서버가 보내 준다
+    if (rankingStream && rankingStream.readyState === EventSource.OPEN) return;
     var tbody = document.getElementById("rankingBody");
     if (!tbody) return;
     fetch("/api/sachunsung/ranking", { credentials: "include" })
-      .then(function(r) { return r.json(); })
+      .then(function(r) {
+        if (!r.ok) throw new Error(r.status);
+        return r.json();
+      })
       .then(function(data) {
-        var list = Array.isArray(data.ranking) ? data.ranking : [];
-        if (list.length === 0) {
-          tbody.innerHTML = "<tr><td colspan=\"5\" class=\"text-muted text-center\">기록이 없습니다.</td></tr>";
-        } else {
-          tbody.innerHTML = list.map(function(row) {
-            var rank = row.rank || 0;
-            var stage = row.stage || 1;
-            var username = escapeHtml(String(row.username || ""));
-            var timeStr = row.clear_time_sec != null ? formatTime(Number(row.clear_time_sec)) : "-";
-            var regDate = row.reg_date != null ? String(row.reg_date) : "";
-            return "<tr><td>" + rank + "</td><td>" + stage + "단계</td><td>" + username + "</td><td>" + timeStr + "</td><td>" + regDate + "</td></tr>";
-          }).join("");
-        }
+        renderRanking(Array.isArray(data.ranking) ? data.ranking : []);
       })
       .catch(function() {
         tbody.innerHTML = "<tr><td colspan=\"5\" class=\"text-muted text-center\">로드 실패</td></tr>";
       });
   }
 
+  function renderRanking(list) {
+    var tbody = document.getElementById("rankingBody");
+    if (!tbody) return;
+    if (list.length === 0) {
+      tbody.innerHTML = "<tr><td colspan=\"5\" class=\"text-muted text-center\">기록이 없습니다.</td></tr>";
+    } else {
+      tbody.innerHTML = list.map(function(row) {
+        var rank = row.rank || 0;
+        var stage = row.stage || 1;
+        var username = escapeHtml(String(row.username || ""));
+        var timeStr = row.clear_time_sec != null ? formatTime(Number(row.clear_time_sec)) : "-";
+        var regDate = row.reg_date != null ? String(row.reg_date) : "";
+        return "<tr><td>" + rank + "</td><td>" + stage + "단계</td><td>" + username + "</td><td>" + timeStr + "</td><td>" + regDate + "</td></tr>";
+      }).join("");
+    }
+  }
+
+  function watchRanking() {
+    if (!window.EventSource) {
+      loadRanking();
+      return;
+    }
+    rankingStream = new EventSource("/api/stream/rankings?games=sachunsung");
+    rankingStream.addEventListener("ranking", function(e) {
+      var data = JSON.parse(e.data);
+      renderRanking(Array.isArray(data.ranking) ? data.ranking : []);
+    });
+    rankingStream.onerror = function() {
+      // 재접속을 포기한 경우(503 등)에만 일반 조회로 전환
+      if (rankingStream.readyState === EventSource.CLOSED) {
+        rankingStream = null;
+        loadRanking();
+      }
+    };
+  }
+
   function escapeHtml(s) {
     if (s == null) return "";
     var div = document.createElement("div");
@@ -478,14 +513,37 @@
     document.getElementById("timerDisplay").textContent = "00:00.0";
     document.getElementById("startBtn").style.display = "";
     document.getElementById("restartBtn").style.display = "none";
-    initBoard();
+    // 보드를 받는 동안에는 빈 판을 보여 준다 (이전 보드를 누르거나 섞지 못하게)
+    state.board = emptyBoard(state.rows, state.cols);
     renderBoard();
-    var maxShuffle = 50;
-    while (!hasAnyConnectablePair() && maxShuffle-- > 0) {
-      shuffleBoard();
+    var startBtn = document.getElementById("startBtn");
+    var stage = state.stage;
+    var token = ++state.boardToken;
+    startBtn.disabled = true;
+    loadBoard(stage).then(function(data) {
+      if (token !== state.boardToken) return;  // 그새 단계를 바꾸거나 다시 시작함
+      if (data) {
+        state.rows = data.rows;
+        state.cols = data.cols;
+        state.pairs = data.rows * data.cols / 2;
+        state.board = data.board;
+      } else {
+        initBoard();
+        var maxShuffle = 50;
+        while (!hasAnyConnectablePair() && maxShuffle-- > 0) shuffleBoard();
+      }
       renderBoard();
-    }
-    updateConnectableCountDisplay();
+      updateConnectableCountDisplay();
+      startBtn.disabled = false;
+    });
+  }
+
+  /** 서버가 미리 만들어 둔 끝까지 풀 수 있는 보드. 실패하면 null (브라우저에서 무작위로 만든다) */
+  function loadBoard(stage) {
+    return fetch("/api/sachunsung/board?stage=" + stage, { credentials: "include" })
+      .then(function(res) { return res.ok ? res.json() : null; })
+      .then(function(data) { return data && data.board && data.board.length ? data : null; })
+      .catch(function() { return null; });
   }
 
   function setStage(stage) {
@@ -502,7 +560,7 @@
   }
 
   document.addEventListener("DOMContentLoaded", function() {
-    loadRanking();
+    watchRanking();
     setStage(1);
 
     var boardEl = document.getElementById("sachunsung-board");
@@ -84,36 +84,60 @@ function onStop() {
   }
 }
 
+let rankingStream = null;
+
 function loadRanking() {
+  // 스트림이 연결돼 있으면 랭킹이 바뀔 때 서버가 보내 준다
+  if (rankingStream && rankingStream.readyState === EventSource.OPEN) return;
   rankingBody.innerHTML = '<tr><td colspan="4" class="text-muted text-center">로딩 중...</td></tr>';
   fetch("/api/timestop/ranking", { credentials: "include" })
-    .then((r) => r.json())
-    .then((data) => {
-      const ranking = data.ranking || [];
-      if (ranking.length === 0) {
-        rankingBody.innerHTML = '<tr><td colspan="4" class="text-muted text-center">기록이 없습니다.</td></tr>';
-      } else {
-        rankingBody.innerHTML = ranking
-          .map(
-            (r) =>
-              "<tr><td>" +
-              r.rank +
-              "</td><td>" +
-              escapeHtml(r.username) +
-              "</td><td>" +
-              r.stop_time +
-              "초</td><td>" +
-              escapeHtml(r.reg_date) +
-              "</td></tr>"
-          )
-          .join("");
-      }
+    .then((r) => {
+      if (!r.ok) throw new Error(r.status);
+      return r.json();
     })
+    .then((data) => renderRanking(data.ranking || []))
     .catch(() => {
       rankingBody.innerHTML = '<tr><td colspan="4" class="text-danger text-center">랭킹 로드 실패</td></tr>';
     });
 }
 
+function renderRanking(ranking) {
+  if (ranking.length === 0) {
+    rankingBody.innerHTML = '<tr><td colspan="4" class="text-muted text-center">기록이 없습니다.</td></tr>';
+  } else {
+    rankingBody.innerHTML = ranking
+      .map(
+        (r) =>
+          "<tr><td>" +
+          r.rank +
+          "</td><td>" +
+          escapeHtml(r.username) +
+          "</td><td>" +
+          r.stop_time +
+          "초</td><td>" +
+          escapeHtml(r.reg_date) +
+          "</td></tr>"
+      )
+      .join("");
+  }
+}
+
+function watchRanking() {
+  if (!window.EventSource) {
+    loadRanking();
+    return;
+  }
+  rankingStream = new EventSource("/api/stream/rankings?games=timestop");
+  rankingStream.addEventListener("ranking", (e) => renderRanking(JSON.parse(e.data).ranking || []));
+  rankingStream.onerror = () => {
+    // 재접속을 포기한 경우(503 등)에만 일반 조회로 전환
+    if (rankingStream.readyState === EventSource.CLOSED) {
+      rankingStream = null;
+      loadRanking();
+    }
+  };
+}
+
 function escapeHtml(s) {
   if (s == null) return "";
   const div = document.createElement("div");
@@ -124,4 +148,4 @@ function escapeHtml(s) {
 startBtn.addEventListener("click", onStart);
 stopBtn.addEventListener("click", onStop);
 
-loadRanking();
+watchRanking();
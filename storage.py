@@ -0,0 +1,906 @@
+"""저장소 계층.
+
+라우트는 테이블 단위 쿼리 대신 이 모듈의 메서드만 호출한다.
+STORAGE_BACKEND 환경변수로 백엔드를 고른다.
+
+- supabase (기본): SUPABASE_URL, SUPABASE_KEY
+- sqlite: SQLITE_PATH (기본: 앱 폴더의 testsvr.db), 내장 SQLite(WAL)
+
+서로 독립적인 조회는 gather() 로 스레드 풀(DB_FANOUT_THREADS)에서 동시에 보낸다.
+add_query_observer() 로 등록한 함수는 DB 왕복마다 쿼리 정보를 받는다 (계측/디버그).
+"""
+import contextvars
+import heapq
+import itertools
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from timefmt import cursor_time
+
+TIMESTOP_TARGET = 10.0
+
+RECORD_TABLES = {
+    "minesweeper": "minesweeper_records",
+    "sachunsung": "sachunsung_records",
+    "timestop": "timestop_records",
+}
+
+_MEMBER_COLUMNS = "id,username,is_blacklisted,created_at"
+_POST_LIST_COLUMNS = "id,author,title,created_at,user_id"
+
+# 내보내기 대상: 이름 -> (테이블, 컬럼). 비밀번호 해시는 내보내지 않는다.
+EXPORT_TABLES = {
+    "members": ("users", _MEMBER_COLUMNS),
+    "posts": ("posts", "id,author,title,content,user_id,created_at"),
+    "minesweeper": ("minesweeper_records", "id,user_id,username,level,created_at"),
+    "sachunsung": ("sachunsung_records", "id,user_id,username,stage,clear_time_sec,created_at"),
+    "timestop": ("timestop_records", "id,user_id,username,stop_time,created_at"),
+}
+
+
+def _like_prefix(prefix):
+    """LIKE 'prefix%' 패턴 (%, _ 이스케이프)"""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _glob_prefix(prefix):
+    """GLOB 'prefix*' 패턴 (*, ?, [ 는 [] 로 감싸 글자 그대로)"""
+    return "".join(f"[{c}]" if c in "*?[" else c for c in prefix) + "*"
+
+
+MAX_LEVEL = 99
+
+
+def apply_exp(level, exp, stat_points, exp_gained):
+    """레벨업 규칙 (레벨 * 100 EXP 마다 1레벨, 스탯 포인트 +1).
+
+    Postgres award_exp 함수(supabase_migrations.sql)와 같은 규칙이다.
+    반환: (level, exp, stat_points, leveled_up)
+    """
+    exp += exp_gained
+    leveled_up = False
+    while level < MAX_LEVEL and exp >= level * 100:
+        exp -= level * 100
+        level += 1
+        stat_points += 1
+        leveled_up = True
+    return level, exp, stat_points, leveled_up
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_pool_thread = threading.local()
+
+
+def _mark_pool_thread():
+    _pool_thread.active = True
+
+
+def _fanout_pool():
+    # fork 이전에 만든 풀은 자식 프로세스에서 쓸 수 없으므로 pid 별로 만든다
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(
+                max_workers=int(os.environ.get("DB_FANOUT_THREADS", "8")),
+                thread_name_prefix="db-fanout",
+                initializer=_mark_pool_thread,
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def gather(*calls):
+    """독립적인 호출들을 동시에 실행하고 결과를 같은 순서로 반환.
+
+    첫 번째 호출은 현재 스레드에서, 나머지는 풀에서 실행한다. contextvars 는
+    호출마다 복사해 넘기므로 요청 단위 계측 값이 풀 스레드에서도 이어진다.
+    풀 스레드 안에서 다시 부르면 (예: /api/batch 의 하위 요청) 풀이 가득 찬 채로
+    서로를 기다릴 수 있으므로 차례로 실행한다.
+    """
+    if len(calls) <= 1 or getattr(_pool_thread, "active", False):
+        return [call() for call in calls]
+    pool = _fanout_pool()
+    futures = [pool.submit(contextvars.copy_context().run, call) for call in calls[1:]]
+    first = calls[0]()
+    return [first] + [f.result() for f in futures]
+
+
+def timestop_distance(row):
+    return abs(float(row.get("stop_time", 0)) - TIMESTOP_TARGET)
+
+
+def _group_by_columns(rows):
+    """bulk insert 용: 컬럼 구성이 같은 행끼리 묶는다."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    return groups.values()
+
+
+def _merge_timestop(above, below, limit):
+    """10초 이상(오름차순) / 미만(내림차순) 두 목록을 거리 기준으로 병합.
+
+    각 목록은 10초에서 멀어지는 순서이므로 merge 후 앞에서 limit개를 자르면
+    전체 정렬 결과의 상위 limit개와 같다.
+    """
+    merged = heapq.merge(above, below, key=timestop_distance)
+    return list(itertools.islice(merged, limit))
+
+
+# ──────────────────────────────────────────────
+# 쿼리 관찰 (계측/디버그)
+# ──────────────────────────────────────────────
+
+_observers = []
+
+
+def add_query_observer(fn):
+    """fn(event): DB 왕복 1회마다 호출 (요청 스레드 또는 gather 풀 스레드에서).
+
+    event: {"backend", "table", "op", "shape", "params", "rows", "duration"}
+    shape 는 값이 빠진 쿼리 모양(같은 모양 반복 탐지용), params 는 값 목록.
+    """
+    _observers.append(fn)
+
+
+def _emit(backend, table, op, shape, params, rows, duration):
+    event = {
+        "backend": backend, "table": table, "op": op, "shape": shape,
+        "params": params, "rows": rows, "duration": duration,
+    }
+    for fn in _observers:
+        fn(event)
+
+
+_FILTER_METHODS = frozenset(["select", "eq", "neq", "gt", "gte", "lt", "lte", "in_", "like", "ilike", "is_"])
+_WRITE_METHODS = frozenset(["insert", "upsert", "update", "delete"])
+
+
+class _TracedQuery:
+    """supabase 쿼리 빌더 래퍼: 체인 호출을 기록하고 execute() 시간을 잰다."""
+
+    def __init__(self, builder, table, op="select", params=()):
+        self._builder = builder
+        self._table = table
+        self._op = op
+        self._shape = [f"{op}({table})" if op == "rpc" else table]
+        self._params = list(params)
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not _observers:
+            return attr
+        if name == "not_":
+            # 다음 필터를 부정하는 속성 (빌더를 돌려준다)
+            self._builder = attr
+            self._shape.append("not")
+            return self
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if name in _WRITE_METHODS:
+                self._op = name
+                self._shape.append(name)
+            elif name in _FILTER_METHODS and args:
+                self._shape.append(f"{name}({args[0]})")
+                self._params.extend(args[1:])
+            else:
+                self._shape.append(f"{name}({','.join(map(str, args))})")
+            self._builder = result
+            return self
+
+        return call
+
+    def execute(self):
+        if not _observers:
+            return self._builder.execute()
+        start = time.perf_counter()
+        res = self._builder.execute()
+        data = res.data
+        rows = len(data) if isinstance(data, list) else int(data is not None)
+        _emit("supabase", self._table, self._op, ".".join(self._shape), self._params, rows,
+              time.perf_counter() - start)
+        return res
+
+
+_SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+(\w+)", re.IGNORECASE)
+
+
+class _FetchedRows:
+    """계측 중 SELECT 결과를 미리 읽어 둔 커서 대역 (행 수를 세기 위해)."""
+
+    def __init__(self, cur, rows):
+        self.lastrowid = cur.lastrowid
+        self.rowcount = cur.rowcount
+        self.description = cur.description
+        self._rows = rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+
+class _TracedConnection(sqlite3.Connection):
+    def _traced(self, run, sql, params):
+        start = time.perf_counter()
+        cur = run()
+        result, rows = cur, cur.rowcount
+        if cur.description is not None:
+            fetched = cur.fetchall()
+            result, rows = _FetchedRows(cur, fetched), len(fetched)
+        m = _SQL_TABLE.search(sql)
+        _emit("sqlite", m.group(1) if m else None, sql.split(None, 1)[0].lower(), sql, params, rows,
+              time.perf_counter() - start)
+        return result
+
+    def execute(self, sql, params=()):
+        if not _observers or sql.startswith("PRAGMA"):
+            return super().execute(sql, params)
+        return self._traced(lambda: super(_TracedConnection, self).execute(sql, params), sql, params)
+
+    def executemany(self, sql, seq):
+        if not _observers:
+            return super().executemany(sql, seq)
+        seq = list(seq)
+        return self._traced(lambda: super(_TracedConnection, self).executemany(sql, seq), sql, seq)
+
+
+# ──────────────────────────────────────────────
+# Supabase
+# ──────────────────────────────────────────────
+
+class SupabaseStore:
+    name = "supabase"
+
+    def __init__(self, client=None, connect=None):
+        """client: 이미 만든 클라이언트, connect: 클라이언트를 만드는 함수.
+
+        connect 를 주면 처음 쓸 때, 그리고 fork 된 워커마다 클라이언트를 새로
+        만든다 (워커들이 마스터의 HTTP 연결 풀을 나눠 쓰지 않도록).
+        """
+        self._client = client
+        self._connect = connect
+        self._pid = os.getpid() if client is not None else None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._connect is not None and self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._client = self._connect()
+                    self._pid = os.getpid()
+        return self._client
+
+    def table(self, name):
+        return _TracedQuery(self.client.table(name), name)
+
+    # users
+    def find_user(self, username, columns="id"):
+        res = self.table("users").select(columns).eq("username", username).execute()
+        rows = res.data or []
+        return rows[0] if rows else None
+
+    def find_login_user(self, username):
+        """로그인용 사용자 행 + 아바타(avatar 키, 없으면 None)를 한 번에 조회."""
+        res = self.table("users").select("id,password_hash,is_blacklisted,avatars(*)").eq(
+            "username", username
+        ).execute()
+        rows = res.data or []
+        if not rows:
+            return None
+        row = rows[0]
+        embedded = row.pop("avatars", None)
+        if isinstance(embedded, list):
+            embedded = embedded[0] if embedded else None
+        row["avatar"] = embedded
+        return row
+
+    def create_user(self, username, password_hash):
+        ins = self.table("users").insert({
+            "username": username,
+            "password_hash": password_hash,
+        }).execute()
+        return (ins.data or [{}])[0]
+
+    def set_password_hash(self, user_id, password_hash):
+        self.table("users").update({"password_hash": password_hash}).eq("id", user_id).execute()
+
+    def list_members(self, exclude_username, limit, before=None, prefix=None, blacklisted=None):
+        """가입일 역순 회원 limit명. before: (created_at, id) 커서, prefix: 아이디 앞부분"""
+        q = self.table("users").select(_MEMBER_COLUMNS).neq("username", exclude_username)
+        if prefix:
+            q = q.like("username", _like_prefix(prefix))
+        if blacklisted is not None:
+            q = q.eq("is_blacklisted", bool(blacklisted))
+        if before:
+            # 필터 문자열에 그대로 들어가므로 시각 형식으로 다시 만든 값만 쓴다
+            created_at, member_id = cursor_time(before[0]), int(before[1])
+            q = q.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{member_id})')
+        res = q.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        return res.data or []
+
+    def set_blacklisted(self, member_ids, blacklisted, exclude_username):
+        """여러 회원을 UPDATE 한 번으로 지정/해제. 반환: 바뀐 회원 id 목록"""
+        res = self.table("users").update({"is_blacklisted": bool(blacklisted)}).in_(
+            "id", [int(i) for i in member_ids]
+        ).neq("username", exclude_username).execute()
+        return [row["id"] for row in res.data or []]
+
+    # avatars
+    def get_avatar(self, user_id):
+        res = self.table("avatars").select("*").eq("user_id", user_id).execute()
+        return res.data[0] if res.data else None
+
+    def ensure_avatar(self, user_id):
+        self.table("avatars").upsert(
+            {"user_id": user_id}, on_conflict="user_id", ignore_duplicates=True
+        ).execute()
+
+    def update_avatar(self, user_id, fields):
+        self.table("avatars").update({**fields, "updated_at": "now()"}).eq(
+            "user_id", user_id
+        ).execute()
+
+    def award_exp(self, user_id, exp_gained, game=None, record=None):
+        """EXP 부여 + 레벨업 (+ 게임 기록 저장)을 award_exp RPC 한 번으로 처리.
+
+        반환: 갱신된 아바타 dict (leveled_up 포함)
+        """
+        params = {
+            "p_user_id": user_id,
+            "p_exp": exp_gained,
+            "p_record_table": RECORD_TABLES[game] if game else None,
+            "p_record": record,
+        }
+        res = _TracedQuery(self.client.rpc("award_exp", params), "award_exp", "rpc", [params]).execute()
+        data = res.data
+        return data[0] if isinstance(data, list) else data
+
+    def avatar_levels(self, user_ids):
+        if not user_ids:
+            return {}
+        res = self.table("avatars").select("user_id,level").in_("user_id", list(user_ids)).execute()
+        return {av["user_id"]: av.get("level", 1) for av in (res.data or [])}
+
+    def author_rows(self):
+        """(user_id, level, exp, username) 전체"""
+        av_res, users_res = gather(
+            self.table("avatars").select("user_id,level,exp").execute,
+            self.table("users").select("id,username").execute,
+        )
+        username_map = {u["id"]: u.get("username", "") for u in (users_res.data or [])}
+        return [
+            (av["user_id"], av.get("level", 1), av.get("exp", 0), username_map.get(av["user_id"], ""))
+            for av in (av_res.data or [])
+        ]
+
+    # posts
+    def list_posts(self, offset, limit):
+        res = self.table("posts").select(_POST_LIST_COLUMNS).order(
+            "created_at", desc=True
+        ).order("id", desc=True).range(offset, offset + limit - 1).execute()
+        return res.data or []
+
+    def list_posts_before(self, created_at, post_id, limit):
+        """(created_at, id) 가 커서보다 작은 글 limit개 (키셋 페이지네이션)"""
+        # 필터 문자열에 그대로 들어가므로 시각 형식으로 다시 만든 값만 쓴다
+        created_at = cursor_time(created_at)
+        res = self.table("posts").select(_POST_LIST_COLUMNS).or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{int(post_id)})'
+        ).order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        return res.data or []
+
+    def count_posts(self):
+        res = self.table("posts").select("id", count="exact").limit(1).execute()
+        return getattr(res, "count", None) or 0
+
+    def get_post(self, post_id, columns):
+        res = self.table("posts").select(columns).eq("id", post_id).execute()
+        rows = res.data or []
+        return rows[0] if rows else None
+
+    def create_post(self, payload):
+        ins = self.table("posts").insert(payload).execute()
+        return (ins.data or [{}])[0]
+
+    def update_post(self, post_id, fields):
+        self.table("posts").update(fields).eq("id", post_id).execute()
+
+    def delete_post(self, post_id):
+        self.table("posts").delete().eq("id", post_id).execute()
+
+    # post search
+    def index_post(self, post_id, weights):
+        """글 하나의 색인어 교체: 없어진 색인어 삭제 + 나머지 upsert (다시 실행해도 같은 결과)"""
+        stale = self.table("post_terms").delete().eq("post_id", post_id)
+        if weights:
+            stale = stale.not_.in_("term", list(weights))
+        stale.execute()
+        if weights:
+            self.table("post_terms").upsert(
+                [{"term": t, "post_id": post_id, "weight": w} for t, w in weights.items()],
+                on_conflict="term,post_id",
+            ).execute()
+
+    def search_posts(self, terms, limit, offset):
+        """terms 를 모두 가진 글 (점수 순). 반환: (글 목록, 전체 수). search_posts RPC 한 번."""
+        params = {"p_terms": terms, "p_limit": limit, "p_offset": offset}
+        res = _TracedQuery(self.client.rpc("search_posts", params), "search_posts", "rpc", [params]).execute()
+        rows = res.data or []
+        return rows, (rows[0]["total"] if rows else 0)
+
+    # game records
+    def insert_record(self, game, payload):
+        self.table(RECORD_TABLES[game]).insert(payload).execute()
+
+    def insert_records(self, game, rows):
+        for group in _group_by_columns(rows):
+            self.table(RECORD_TABLES[game]).insert(group).execute()
+
+    def minesweeper_top(self, limit):
+        res = self.table("minesweeper_records").select(
+            "id,username,level,created_at"
+        ).order("level", desc=True).order("created_at", desc=True).limit(limit).execute()
+        return res.data or []
+
+    def sachunsung_top(self, limit):
+        res = self.table("sachunsung_records").select(
+            "id,username,stage,clear_time_sec,created_at"
+        ).order("stage", desc=True).order("clear_time_sec", desc=False).limit(limit).execute()
+        return res.data or []
+
+    def timestop_top(self, limit):
+        cols = "username,stop_time,created_at"
+        above, below = gather(
+            self.table("timestop_records").select(cols).gte(
+                "stop_time", TIMESTOP_TARGET
+            ).order("stop_time", desc=False).limit(limit).execute,
+            self.table("timestop_records").select(cols).lt(
+                "stop_time", TIMESTOP_TARGET
+            ).order("stop_time", desc=True).limit(limit).execute,
+        )
+        return _merge_timestop(above.data or [], below.data or [], limit)
+
+    # export
+    def export_rows(self, table, columns, after_id, limit, since=None, until=None):
+        """id 가 after_id 보다 큰 행 limit개 (id 순). since <= created_at < until"""
+        q = self.table(table).select(columns).gt("id", int(after_id))
+        if since:
+            q = q.gte("created_at", since)
+        if until:
+            q = q.lt("created_at", until)
+        res = q.order("id").limit(limit).execute()
+        return res.data or []
+
+    def ping(self):
+        """연결 확인 메시지. 실패 시 예외."""
+        try:
+            self.table("health").select("1").limit(1).execute()
+            return "Supabase 연결 정상"
+        except Exception as e:
+            err = str(e).lower()
+            if any(x in err for x in [
+                "relation", "does not exist", "42p01", "not find",
+                "schema cache", "rgrst205", "could not find"
+            ]):
+                return "Supabase 연결됨 (health 테이블 없음)"
+            raise
+
+
+# ──────────────────────────────────────────────
+# SQLite
+# ──────────────────────────────────────────────
+
+_NOW = "strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')"
+
+_SQLITE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    is_blacklisted INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT ({_NOW})
+);
+CREATE INDEX IF NOT EXISTS idx_users_created_at ON users (created_at);
+CREATE INDEX IF NOT EXISTS idx_users_blacklisted ON users (created_at) WHERE is_blacklisted = 1;
+
+CREATE TABLE IF NOT EXISTS avatars (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES users (id),
+    level INTEGER NOT NULL DEFAULT 1,
+    exp INTEGER NOT NULL DEFAULT 0,
+    stat_points INTEGER NOT NULL DEFAULT 0,
+    str INTEGER NOT NULL DEFAULT 5,
+    con INTEGER NOT NULL DEFAULT 5,
+    dex INTEGER NOT NULL DEFAULT 5,
+    updated_at TEXT NOT NULL DEFAULT ({_NOW})
+);
+CREATE INDEX IF NOT EXISTS idx_avatars_level_exp ON avatars (level DESC, exp DESC);
+
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    author TEXT NOT NULL,
+    password_hash TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL,
+    content TEXT NOT NULL DEFAULT '',
+    user_id INTEGER REFERENCES users (id),
+    created_at TEXT NOT NULL DEFAULT ({_NOW})
+);
+CREATE INDEX IF NOT EXISTS idx_posts_created_at_id ON posts (created_at, id);
+
+CREATE TABLE IF NOT EXISTS post_terms (
+    term TEXT NOT NULL,
+    post_id INTEGER NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+    weight REAL NOT NULL,
+    PRIMARY KEY (term, post_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_post_terms_post_id ON post_terms (post_id);
+
+CREATE TABLE IF NOT EXISTS minesweeper_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users (id),
+    username TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    created_at TEXT NOT NULL DEFAULT ({_NOW})
+);
+CREATE INDEX IF NOT EXISTS idx_minesweeper_records_rank
+    ON minesweeper_records (level DESC, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS sachunsung_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users (id),
+    username TEXT NOT NULL,
+    stage INTEGER NOT NULL,
+    clear_time_sec REAL NOT NULL,
+    created_at TEXT NOT NULL DEFAULT ({_NOW})
+);
+CREATE INDEX IF NOT EXISTS idx_sachunsung_records_rank
+    ON sachunsung_records (stage DESC, clear_time_sec ASC);
+
+CREATE TABLE IF NOT EXISTS timestop_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users (id),
+    username TEXT NOT NULL,
+    stop_time REAL NOT NULL,
+    created_at TEXT NOT NULL DEFAULT ({_NOW})
+);
+CREATE INDEX IF NOT EXISTS idx_timestop_records_stop_time ON timestop_records (stop_time);
+"""
+
+
+def _placeholders(n):
+    return ",".join("?" * n)
+
+
+class SQLiteStore:
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SQLITE_SCHEMA)
+
+    def _conn(self):
+        """스레드별 연결 (sqlite3 연결은 스레드/프로세스 간 공유 불가)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, factory=_TracedConnection)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _all(self, sql, params=()):
+        return [dict(r) for r in self._conn().execute(sql, params).fetchall()]
+
+    def _one(self, sql, params=()):
+        row = self._conn().execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def _write(self, sql, params=()):
+        with self._conn() as conn:
+            return conn.execute(sql, params)
+
+    @staticmethod
+    def _columns(columns):
+        return ", ".join(c.strip() for c in columns.split(","))
+
+    # users
+    def find_user(self, username, columns="id"):
+        row = self._one(f"SELECT {self._columns(columns)} FROM users WHERE username = ?", (username,))
+        if row and "is_blacklisted" in row:
+            row["is_blacklisted"] = bool(row["is_blacklisted"])
+        return row
+
+    def find_login_user(self, username):
+        row = self._one(
+            "SELECT u.id, u.password_hash, u.is_blacklisted, a.user_id AS avatar_user_id, "
+            "a.level, a.exp, a.stat_points, a.str, a.con, a.dex "
+            "FROM users u LEFT JOIN avatars a ON a.user_id = u.id WHERE u.username = ?",
+            (username,),
+        )
+        if not row:
+            return None
+        user = {k: row[k] for k in ("id", "password_hash")}
+        user["is_blacklisted"] = bool(row["is_blacklisted"])
+        user["avatar"] = None
+        if row["avatar_user_id"] is not None:
+            user["avatar"] = {k: row[k] for k in ("level", "exp", "stat_points", "str", "con", "dex")}
+        return user
+
+    def create_user(self, username, password_hash):
+        cur = self._write(
+            "INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, password_hash)
+        )
+        return self._one("SELECT * FROM users WHERE id = ?", (cur.lastrowid,))
+
+    def set_password_hash(self, user_id, password_hash):
+        self._write("UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, user_id))
+
+    def list_members(self, exclude_username, limit, before=None, prefix=None, blacklisted=None):
+        where, params = ["username != ?"], [exclude_username]
+        if prefix:
+            # GLOB 은 대소문자를 구분해서 username 의 UNIQUE 인덱스 범위 검색이 된다
+            where.append("username GLOB ?")
+            params.append(_glob_prefix(prefix))
+        if blacklisted is not None:
+            # 부분 인덱스(idx_users_blacklisted)를 쓰려면 상수로 비교해야 한다
+            where.append(f"is_blacklisted = {int(bool(blacklisted))}")
+        if before:
+            where.append("(created_at, id) < (?, ?)")
+            params.extend((cursor_time(before[0]), int(before[1])))
+        rows = self._all(
+            f"SELECT {self._columns(_MEMBER_COLUMNS)} FROM users WHERE {' AND '.join(where)} "
+            "ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*params, limit),
+        )
+        for row in rows:
+            row["is_blacklisted"] = bool(row["is_blacklisted"])
+        return rows
+
+    def set_blacklisted(self, member_ids, blacklisted, exclude_username):
+        ids = [int(i) for i in member_ids]
+        if not ids:
+            return []
+        with self._conn() as conn:
+            rows = conn.execute(
+                f"UPDATE users SET is_blacklisted = ? WHERE id IN ({', '.join('?' * len(ids))}) "
+                "AND username != ? RETURNING id",
+                (int(bool(blacklisted)), *ids, exclude_username),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # avatars
+    def get_avatar(self, user_id):
+        return self._one("SELECT * FROM avatars WHERE user_id = ?", (user_id,))
+
+    def ensure_avatar(self, user_id):
+        self._write("INSERT OR IGNORE INTO avatars (user_id) VALUES (?)", (user_id,))
+
+    def update_avatar(self, user_id, fields):
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        self._write(
+            f"UPDATE avatars SET {cols}, updated_at = {_NOW} WHERE user_id = ?",
+            (*fields.values(), user_id),
+        )
+
+    def award_exp(self, user_id, exp_gained, game=None, record=None):
+        """EXP 부여 + 레벨업 (+ 게임 기록 저장)을 한 트랜잭션으로 처리."""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if game:
+                self._insert(conn, RECORD_TABLES[game], record)
+            conn.execute("INSERT OR IGNORE INTO avatars (user_id) VALUES (?)", (user_id,))
+            av = dict(conn.execute("SELECT * FROM avatars WHERE user_id = ?", (user_id,)).fetchone())
+            level, exp, stat_points, leveled_up = apply_exp(
+                av["level"], av["exp"], av["stat_points"], exp_gained
+            )
+            conn.execute(
+                f"UPDATE avatars SET level = ?, exp = ?, stat_points = ?, updated_at = {_NOW} "
+                "WHERE user_id = ?",
+                (level, exp, stat_points, user_id),
+            )
+        av.update(level=level, exp=exp, stat_points=stat_points, leveled_up=leveled_up)
+        return av
+
+    def avatar_levels(self, user_ids):
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        rows = self._conn().execute(
+            f"SELECT user_id, level FROM avatars WHERE user_id IN ({_placeholders(len(user_ids))})",
+            user_ids,
+        ).fetchall()
+        return {r["user_id"]: r["level"] for r in rows}
+
+    def author_rows(self):
+        rows = self._conn().execute(
+            "SELECT a.user_id, a.level, a.exp, COALESCE(u.username, '') AS username "
+            "FROM avatars a LEFT JOIN users u ON u.id = a.user_id"
+        ).fetchall()
+        return [tuple(r) for r in rows]
+
+    # posts
+    def list_posts(self, offset, limit):
+        return self._all(
+            f"SELECT {self._columns(_POST_LIST_COLUMNS)} FROM posts "
+            "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset),
+        )
+
+    def list_posts_before(self, created_at, post_id, limit):
+        return self._all(
+            f"SELECT {self._columns(_POST_LIST_COLUMNS)} FROM posts "
+            "WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?",
+            (created_at, post_id, limit),
+        )
+
+    def count_posts(self):
+        return self._conn().execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def get_post(self, post_id, columns):
+        return self._one(f"SELECT {self._columns(columns)} FROM posts WHERE id = ?", (post_id,))
+
+    def create_post(self, payload):
+        with self._conn() as conn:
+            cur = self._insert(conn, "posts", payload)
+        return self._one("SELECT * FROM posts WHERE id = ?", (cur.lastrowid,))
+
+    def update_post(self, post_id, fields):
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        self._write(f"UPDATE posts SET {cols} WHERE id = ?", (*fields.values(), post_id))
+
+    def delete_post(self, post_id):
+        self._write("DELETE FROM posts WHERE id = ?", (post_id,))
+
+    # post search
+    def index_post(self, post_id, weights):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM post_terms WHERE post_id = ?", (post_id,))
+            conn.executemany(
+                "INSERT INTO post_terms (term, post_id, weight) VALUES (?, ?, ?)",
+                [(t, post_id, w) for t, w in weights.items()],
+            )
+
+    def search_posts(self, terms, limit, offset):
+        if not terms:
+            return [], 0
+        marks = _placeholders(len(terms))
+        df = dict(self._conn().execute(
+            f"SELECT term, COUNT(*) FROM post_terms WHERE term IN ({marks}) GROUP BY term", terms
+        ).fetchall())
+        if len(df) < len(terms):
+            # 어느 글에도 없는 색인어가 있으면 결과 없음 (전체를 가진 글만 찾는다)
+            return [], 0
+        # idf 의 전체 글 수는 MAX(id) 로 어림한다 (COUNT(*) 는 posts 전체를 훑는다)
+        n = self._conn().execute("SELECT MAX(id) FROM posts").fetchone()[0] or 1
+        # 가장 드문 색인어의 글에서 출발해 나머지 색인어는 (term, post_id) 기본키로 확인
+        terms = sorted(terms, key=df.get)
+        joins = "".join(
+            f" JOIN post_terms t{i} ON t{i}.term = ? AND t{i}.post_id = t0.post_id"
+            for i in range(1, len(terms))
+        )
+        score = " + ".join(f"t{i}.weight * ?" for i in range(len(terms)))
+        rows = self._all(
+            f"SELECT {', '.join('posts.' + c for c in _POST_LIST_COLUMNS.split(','))}, "
+            f"{score} AS score, COUNT(*) OVER () AS total "
+            f"FROM post_terms t0{joins} JOIN posts ON posts.id = t0.post_id "
+            "WHERE t0.term = ? ORDER BY score DESC, posts.id DESC LIMIT ? OFFSET ?",
+            (*(math.log(1 + n / df[t]) for t in terms), *terms[1:], terms[0], limit, offset),
+        )
+        return rows, (rows[0]["total"] if rows else 0)
+
+    # game records
+    @staticmethod
+    def _insert(conn, table, payload):
+        cols = ", ".join(payload)
+        return conn.execute(
+            f"INSERT INTO {table} ({cols}) VALUES ({_placeholders(len(payload))})",
+            tuple(payload.values()),
+        )
+
+    def insert_record(self, game, payload):
+        with self._conn() as conn:
+            self._insert(conn, RECORD_TABLES[game], payload)
+
+    def insert_records(self, game, rows):
+        with self._conn() as conn:
+            for group in _group_by_columns(rows):
+                cols = list(group[0])
+                conn.executemany(
+                    f"INSERT INTO {RECORD_TABLES[game]} ({', '.join(cols)}) "
+                    f"VALUES ({_placeholders(len(cols))})",
+                    [tuple(row[c] for c in cols) for row in group],
+                )
+
+    def minesweeper_top(self, limit):
+        return self._all(
+            "SELECT id, username, level, created_at FROM minesweeper_records "
+            "ORDER BY level DESC, created_at DESC LIMIT ?",
+            (limit,),
+        )
+
+    def sachunsung_top(self, limit):
+        return self._all(
+            "SELECT id, username, stage, clear_time_sec, created_at FROM sachunsung_records "
+            "ORDER BY stage DESC, clear_time_sec ASC LIMIT ?",
+            (limit,),
+        )
+
+    def timestop_top(self, limit):
+        cols = "username, stop_time, created_at"
+        above = self._all(
+            f"SELECT {cols} FROM timestop_records WHERE stop_time >= ? "
+            "ORDER BY stop_time ASC LIMIT ?",
+            (TIMESTOP_TARGET, limit),
+        )
+        below = self._all(
+            f"SELECT {cols} FROM timestop_records WHERE stop_time < ? "
+            "ORDER BY stop_time DESC LIMIT ?",
+            (TIMESTOP_TARGET, limit),
+        )
+        return _merge_timestop(above, below, limit)
+
+    # export
+    def export_rows(self, table, columns, after_id, limit, since=None, until=None):
+        where, params = ["id > ?"], [int(after_id)]
+        if since:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until:
+            where.append("created_at < ?")
+            params.append(until)
+        rows = self._all(
+            f"SELECT {self._columns(columns)} FROM {table} WHERE {' AND '.join(where)} "
+            "ORDER BY id LIMIT ?",
+            (*params, limit),
+        )
+        if table == "users":
+            for row in rows:
+                row["is_blacklisted"] = bool(row["is_blacklisted"])
+        return rows
+
+    def ping(self):
+        self._conn().execute("SELECT 1").fetchone()
+        return f"SQLite 연결 정상 ({self.path})"
+
+
+def create_store(base_dir):
+    """환경변수 기준 저장소 생성. 설정이 없으면 None.
+
+    Supabase 클라이언트는 여기서 만들지 않고 워커에서 처음 쓸 때 만든다.
+    """
+    backend = os.environ.get("STORAGE_BACKEND", "supabase").lower()
+    if backend == "sqlite":
+        return SQLiteStore(os.environ.get("SQLITE_PATH") or os.path.join(base_dir, "testsvr.db"))
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+    if not (url and key):
+        return None
+
+    def connect():
+        from supabase import create_client
+        return create_client(url, key)
+
+    return SupabaseStore(connect=connect)
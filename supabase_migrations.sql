@@ -0,0 +1,123 @@
+-- TestSvr 추가 스키마 (supabase_init.sql 실행 후 SQL Editor에서 실행)
+
+-- ──────────────────────────────────────────────
+-- 타임스탑 랭킹: 10.00초 기준 양방향 인덱스 조회
+-- ──────────────────────────────────────────────
+CREATE INDEX IF NOT EXISTS idx_timestop_records_stop_time
+    ON timestop_records (stop_time);
+
+-- ──────────────────────────────────────────────
+-- 목록/랭킹 조회 인덱스 (SQLite 백엔드와 동일)
+-- ──────────────────────────────────────────────
+CREATE INDEX IF NOT EXISTS idx_users_created_at ON users (created_at);
+CREATE INDEX IF NOT EXISTS idx_users_created_at_id ON users (created_at DESC, id DESC);
+-- 회원관리: 아이디 앞부분 검색 (LIKE 'abc%' 는 text_pattern_ops 인덱스가 있어야 범위 검색)
+CREATE INDEX IF NOT EXISTS idx_users_username_pattern ON users (username text_pattern_ops);
+-- 회원관리: 블랙리스트 필터 (지정된 회원만 담는 부분 인덱스)
+CREATE INDEX IF NOT EXISTS idx_users_blacklisted
+    ON users (created_at DESC, id DESC) WHERE is_blacklisted;
+CREATE INDEX IF NOT EXISTS idx_posts_created_at_id ON posts (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_avatars_level_exp ON avatars (level DESC, exp DESC);
+CREATE INDEX IF NOT EXISTS idx_minesweeper_records_rank
+    ON minesweeper_records (level DESC, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sachunsung_records_rank
+    ON sachunsung_records (stage DESC, clear_time_sec ASC);
+
+-- ──────────────────────────────────────────────
+-- EXP 부여 RPC: 기록 저장 + EXP/레벨업을 한 트랜잭션으로 처리
+-- (storage.apply_exp 와 같은 레벨업 규칙, avatars.user_id UNIQUE 필요)
+-- ──────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION award_exp(
+    p_user_id BIGINT,
+    p_exp INT,
+    p_record_table TEXT DEFAULT NULL,
+    p_record JSONB DEFAULT NULL
+)
+RETURNS TABLE (
+    user_id BIGINT, level INT, exp INT, stat_points INT,
+    str INT, con INT, dex INT, leveled_up BOOLEAN
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v avatars%ROWTYPE;
+    v_level INT;
+    v_exp INT;
+    v_points INT;
+    v_up BOOLEAN := FALSE;
+BEGIN
+    IF p_record_table IS NOT NULL THEN
+        IF p_record_table NOT IN ('minesweeper_records', 'sachunsung_records', 'timestop_records') THEN
+            RAISE EXCEPTION 'invalid record table: %', p_record_table;
+        END IF;
+        EXECUTE format(
+            'INSERT INTO %1$I (%2$s) SELECT %2$s FROM jsonb_populate_record(NULL::%1$I, $1)',
+            p_record_table,
+            (SELECT string_agg(quote_ident(k), ',') FROM jsonb_object_keys(p_record) AS k)
+        ) USING p_record;
+    END IF;
+
+    INSERT INTO avatars (user_id) VALUES (p_user_id) ON CONFLICT (user_id) DO NOTHING;
+    SELECT * INTO v FROM avatars WHERE avatars.user_id = p_user_id FOR UPDATE;
+
+    v_level := v.level;
+    v_exp := v.exp + p_exp;
+    v_points := v.stat_points;
+    WHILE v_level < 99 AND v_exp >= v_level * 100 LOOP
+        v_exp := v_exp - v_level * 100;
+        v_level := v_level + 1;
+        v_points := v_points + 1;
+        v_up := TRUE;
+    END LOOP;
+
+    UPDATE avatars
+       SET level = v_level, exp = v_exp, stat_points = v_points, updated_at = now()
+     WHERE avatars.user_id = p_user_id;
+
+    RETURN QUERY SELECT p_user_id, v_level, v_exp, v_points, v.str, v.con, v.dex, v_up;
+END;
+$$;
+
+-- ──────────────────────────────────────────────
+-- 게시글 검색: 2-gram 역색인 (search.py, 기존 글은 `python search.py --reindex`)
+-- ──────────────────────────────────────────────
+CREATE TABLE IF NOT EXISTS post_terms (
+    term TEXT NOT NULL,
+    post_id BIGINT NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+    weight REAL NOT NULL,
+    PRIMARY KEY (term, post_id)
+);
+CREATE INDEX IF NOT EXISTS idx_post_terms_post_id ON post_terms (post_id);
+
+-- p_terms 를 모두 가진 글을 점수(가중치 x idf 합) 순으로. total 은 전체 결과 수.
+-- idf 의 전체 글 수는 통계값(reltuples)으로 어림한다 (posts 를 훑지 않음).
+CREATE OR REPLACE FUNCTION search_posts(p_terms TEXT[], p_limit INT, p_offset INT)
+RETURNS TABLE (
+    id BIGINT, author TEXT, title TEXT, created_at TIMESTAMPTZ, user_id BIGINT,
+    score DOUBLE PRECISION, total BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH df AS (
+        SELECT t.term, COUNT(*) AS n
+          FROM post_terms t
+         WHERE t.term = ANY (p_terms)
+         GROUP BY t.term
+    ), idf AS (
+        SELECT df.term,
+               LN(1 + GREATEST((SELECT c.reltuples FROM pg_class c WHERE c.oid = 'posts'::regclass), 1) / df.n) AS w
+          FROM df
+    ), hits AS (
+        SELECT t.post_id, SUM(t.weight * idf.w) AS score
+          FROM post_terms t
+          JOIN idf ON idf.term = t.term
+         GROUP BY t.post_id
+        HAVING COUNT(*) = cardinality(p_terms)
+    )
+    SELECT p.id, p.author, p.title, p.created_at, p.user_id, h.score, COUNT(*) OVER () AS total
+      FROM hits h
+      JOIN posts p ON p.id = h.post_id
+     ORDER BY h.score DESC, p.id DESC
+     LIMIT p_limit OFFSET p_offset;
+$$;
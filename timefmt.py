@@ -0,0 +1,87 @@
+"""created_at(UTC ISO 문자열) -> 한국시간(KST) 표시용 문자열.
+
+한국은 1988년 이후 서머타임이 없으므로 ZoneInfo("Asia/Seoul") 대신 고정 오프셋
+UTC+9 를 쓴다. 같은 값은 반복해서 나오므로(랭킹, 같은 초에 쓴 글 등) 결과를
+메모이즈하고, 목록 전체를 한 번에 변환하는 *_many 함수를 둔다.
+"""
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+KST = timezone(timedelta(hours=9), "KST")
+
+
+def _to_kst(dt_str):
+    dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(KST)
+
+
+@lru_cache(maxsize=8192)
+def fmt_dt(dt_str):
+    """created_at (UTC) -> 한국시간(KST) YYYY-MM-DD HH:mm:ss"""
+    if not dt_str:
+        return ""
+    try:
+        k = _to_kst(dt_str)
+    except Exception:
+        return str(dt_str)
+    return f"{k.year:04d}-{k.month:02d}-{k.day:02d} {k.hour:02d}:{k.minute:02d}:{k.second:02d}"
+
+
+@lru_cache(maxsize=8192)
+def fmt_date_yyyymmdd(dt_str):
+    """created_at -> yyyymmdd (KST)"""
+    if not dt_str:
+        return ""
+    try:
+        k = _to_kst(dt_str)
+    except Exception:
+        return str(dt_str)[:10].replace("-", "")
+    return f"{k.year:04d}{k.month:02d}{k.day:02d}"
+
+
+def _many(fmt, values):
+    seen = {}
+    out = []
+    for v in values:
+        r = seen.get(v)
+        if r is None:
+            r = seen[v] = fmt(v)
+        out.append(r)
+    return out
+
+
+def fmt_dt_many(values):
+    """fmt_dt 를 목록 전체에 적용 (요청 안의 중복 값은 한 번만 변환)."""
+    return _many(fmt_dt, values)
+
+
+def fmt_date_yyyymmdd_many(values):
+    return _many(fmt_date_yyyymmdd, values)
+
+
+def to_utc_iso(value):
+    """조회 조건용 입력(ISO 날짜/시각, 시간대 없으면 KST) -> created_at 과 같은 UTC 형식.
+
+    "2024-05-01" -> "2024-04-30T15:00:00.000+00:00". 잘못된 값이면 ValueError.
+    """
+    dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=KST)
+    u = dt.astimezone(timezone.utc)
+    return f"{u:%Y-%m-%dT%H:%M:%S}.{u.microsecond // 1000:03d}+00:00"
+
+
+def cursor_time(value):
+    """키셋 커서의 created_at -> 같은 시각의 UTC ISO 문자열. 잘못된 값이면 ValueError.
+
+    시간대가 없으면 UTC 로 본다. 밀리초로 떨어지면 created_at 과 같은 밀리초 형식,
+    아니면 마이크로초까지 남겨 커서 행과 정확히 같은 값을 비교한다.
+    """
+    dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    u = dt.astimezone(timezone.utc)
+    frac = f"{u.microsecond // 1000:03d}" if u.microsecond % 1000 == 0 else f"{u.microsecond:06d}"
+    return f"{u:%Y-%m-%dT%H:%M:%S}.{frac}+00:00"
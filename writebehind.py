@@ -0,0 +1,168 @@
+"""게임 기록 write-behind 큐.
+
+기록 저장 요청은 큐에 넣고 바로 응답하며, 백그라운드 스레드가 max_batch 개가
+모이거나 max_delay 초가 지나면 게임별 bulk insert 로 한꺼번에 저장한다.
+DB에 저장하지 못한 배치는 journal_dir 에 JSON Lines 파일로 남겨 두었다가
+다음 flush 때와 워커 기동 때 다시 시도한다. 프로세스 종료 시(atexit) 남은 기록을 비운다.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+log = logging.getLogger(__name__)
+
+
+class RecordQueue:
+    def __init__(self, insert_many, journal_dir, max_batch=100, max_delay=1.0, on_flush=None):
+        """insert_many(game, rows): 한 게임의 기록 여러 개를 한 번에 저장.
+        on_flush(game): 저장에 성공한 뒤 호출 (캐시 무효화 등).
+        """
+        self._insert_many = insert_many
+        self._on_flush = on_flush
+        self.journal_dir = journal_dir
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._queue = []       # [(game, payload)]
+        self._inflight = []
+        self._journaled = {}   # 이 워커가 남긴 journal 파일 -> [(game, payload)]
+        self._first_at = None
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        os.makedirs(journal_dir, exist_ok=True)
+        atexit.register(self.drain)
+
+    def _ensure_thread(self):
+        # fork 이후 워커마다 자기 flush 스레드를 띄운다
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="record-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, game, payload):
+        with self._cond:
+            self._ensure_thread()
+            if not self._queue:
+                self._first_at = time.monotonic()
+            self._queue.append((game, payload))
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._cond.notify()
+
+    def pending(self, game):
+        """아직 DB에 반영되지 않은 이 워커의 기록 (flush 중인 것, 다시 저장을 기다리는 journal 포함)."""
+        with self._cond:
+            # replay 로 저장된 journal 파일은 지워지므로 남아 있는 것만 보탠다
+            for path in [path for path in self._journaled if not os.path.exists(path)]:
+                del self._journaled[path]
+            journaled = [item for items in self._journaled.values() for item in items]
+            # journal 로 넘긴 직후 잠깐은 _inflight 에도 같은 기록이 있다
+            seen = set()
+            out = []
+            for g, p in journaled + self._inflight + self._queue:
+                if g == game and id(p) not in seen:
+                    seen.add(id(p))
+                    out.append(p)
+            return out
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._due():
+                    timeout = None
+                    if self._queue:
+                        timeout = max(0.0, self._first_at + self.max_delay - time.monotonic())
+                    self._cond.wait(timeout)
+                if self._stopping and not self._queue:
+                    return
+            self.flush()
+
+    def _due(self):
+        if self._stopping:
+            return True
+        if not self._queue:
+            return False
+        return (len(self._queue) >= self.max_batch
+                or time.monotonic() - self._first_at >= self.max_delay)
+
+    def flush(self):
+        """큐에 쌓인 기록을 저장. 실패한 배치는 journal 로 보낸다."""
+        with self._cond:
+            batch, self._queue = self._queue, []
+            self._inflight = self._inflight + batch
+        self.replay_journal()
+        by_game = {}
+        for game, payload in batch:
+            by_game.setdefault(game, []).append(payload)
+        for game, rows in by_game.items():
+            try:
+                self._insert_many(game, rows)
+            except Exception:
+                log.exception("record flush failed (%s, %d rows), journaling", game, len(rows))
+                self._journal(game, rows)
+                continue
+            if self._on_flush:
+                self._on_flush(game)
+        with self._cond:
+            done = set(map(id, batch))
+            self._inflight = [item for item in self._inflight if id(item) not in done]
+
+    def _journal(self, game, rows):
+        path = os.path.join(self.journal_dir, f"{game}-{os.getpid()}-{uuid.uuid4().hex}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        with self._cond:
+            self._journaled[path] = [(game, row) for row in rows]
+
+    def replay_journal(self):
+        """journal 파일을 하나씩 선점(rename)해서 다시 저장. 실패하면 되돌린다."""
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, "*.jsonl"))):
+            claimed = f"{path}.{os.getpid()}.claimed"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue  # 다른 워커가 선점
+            game = os.path.basename(path).split("-", 1)[0]
+            try:
+                with open(claimed, encoding="utf-8") as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+                if rows:
+                    self._insert_many(game, rows)
+                os.remove(claimed)
+                if self._on_flush:
+                    self._on_flush(game)
+            except Exception:
+                os.rename(claimed, path)
+                return
+
+    def drain(self, timeout=5.0):
+        """종료 시 남은 기록을 모두 저장 (실패분은 journal).
+
+        flush 스레드가 보내던 배치가 끝나기를 timeout 초까지 기다리고, 그래도 끝나지 않으면
+        보내던 배치와 남은 큐를 journal 로 남긴다 (늦게라도 저장되면 다음 replay 때 중복될 수 있다).
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            thread.join(timeout)
+            if thread.is_alive():
+                with self._cond:
+                    items, self._queue = self._inflight + self._queue, []
+                    self._inflight = []
+                by_game = {}
+                for game, payload in items:
+                    by_game.setdefault(game, []).append(payload)
+                for game, rows in by_game.items():
+                    log.warning("record flush still running at exit (%s, %d rows), journaling", game, len(rows))
+                    self._journal(game, rows)
+                return
+        if self._queue:
+            self.flush()